@@ -0,0 +1,270 @@
+import math
+import random
+
+import numpy as np
+
+from Config.modmatrix import SetState
+
+# Energy of each unit of distance to the goal stats and of objective penalty, high enough to outweigh any mod count
+DISTANCE_WEIGHT = 1000
+
+# Energy of each equipped mod
+MOD_WEIGHT = 1
+
+# Energy of each capacity point, low enough that saving a mod outweighs any capacity difference
+CAPACITY_WEIGHT = 0.001
+
+
+def geometric(start, end, progress):
+    """
+    Returns the temperature of a chain cooling by a constant factor at every move.
+    """
+    return start * (end / start) ** progress
+
+
+def linear(start, end, progress):
+    """
+    Returns the temperature of a chain cooling by a constant amount at every move.
+    """
+    return start + (end - start) * progress
+
+
+def logarithmic(start, end, progress):
+    """
+    Returns the temperature of a chain cooling fast at first and slowly afterwards, never below the end temperature.
+    """
+    return max(end, start / (1 + math.log(1 + 1000 * progress)))
+
+
+# Temperature of a chain from its start and end temperatures and the fraction of its moves already made
+SCHEDULES = {"geometric": geometric, "linear": linear, "logarithmic": logarithmic}
+
+
+class SimulatedAnnealing:
+    """
+    A simulated annealing search over the slots of a single build.
+
+    The state assigns a mod of the pool, or nothing, to every slot of the layout, so each slot has a fixed cost
+    column in the mod matrix. A move puts another mod in a slot, empties it, or exchanges the mods of two slots,
+    and its stat and capacity changes are computed from the mods it touches only, without rebuilding the build.
+
+    Set bonuses are tracked incrementally, so a move only adds the change of the bonus of the sets it touches.
+    The chain keeps the mod matrix, the objective and plain lists of the mod tables but neither the configuration
+    nor the mods, and works on mod ids, so it can be sent to worker processes. With a shared mod matrix, it only
+    sends the handle of the matrix.
+
+    Attributes:
+    - pool (list): The ids of the mods that can be equipped.
+    - slot_types (list): The type of every slot, 0 standard, 1 aura and 2 exilus.
+    - slot_columns (list): The cost table column of every slot.
+    - steps (int): The number of moves of a chain.
+    - schedule (str): The name of the cooling schedule.
+    """
+
+    def __init__(self, config=None, steps=None, schedule=None, start_temperature=None, end_temperature=None, matrix=None):
+        """
+        Precomputes the tables of the mod pool and the slots of the layout.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        - steps: the number of moves of a chain, config.ANNEALING_STEPS by default.
+        - schedule: the name of the cooling schedule, config.ANNEALING_SCHEDULE by default.
+        - start_temperature: the temperature at the start of a chain, config.ANNEALING_START_TEMPERATURE by default.
+        - end_temperature: the temperature at the end of a chain, config.ANNEALING_END_TEMPERATURE by default.
+        - matrix: the mod matrix, such as a shared one, config.MOD_MATRIX by default.
+        """
+        if (schedule or config.ANNEALING_SCHEDULE) not in SCHEDULES:
+            raise ValueError(f"Unknown cooling schedule {schedule or config.ANNEALING_SCHEDULE}, use one of {list(SCHEDULES)}")
+        self.steps = config.ANNEALING_STEPS if steps is None else steps
+        self.schedule = schedule or config.ANNEALING_SCHEDULE
+        self.start_temperature = config.ANNEALING_START_TEMPERATURE if start_temperature is None else start_temperature
+        self.end_temperature = config.ANNEALING_END_TEMPERATURE if end_temperature is None else end_temperature
+        self.max_capacity = config.MAX_CAPACITY
+        self.objective = config.OBJECTIVE
+
+        matrix = matrix if matrix is not None else config.MOD_MATRIX
+        self.pool = [int(mod["id"]) for mod in config.MOD_DATABASE]
+        self.matrix = matrix
+        # The last entries stand for an empty slot, so index -1 reads no mod id and zero costs
+        self.ids = self.pool + [None]
+        self.costs = matrix.costs[self.pool].tolist() + [[0] * len(matrix.columns)]
+        self.families = [int(family) if family >= 0 else None for family in matrix.family_ids[self.pool]] + [None]
+
+        self.slot_types = []
+        self.slot_columns = []
+        for polarity, count in config.POLARITIES[0].items():
+            self.slot_types += [0] * count
+            self.slot_columns += [matrix.columns[polarity]] * count
+        neutral = config.MAX_MODS - sum(config.POLARITIES[0].values())
+        self.slot_types += [0] * neutral
+        self.slot_columns += [matrix.columns[None]] * neutral
+        for slot_type, free in [(1, config.AURA_SLOT_FREE), (2, config.EXILUS_SLOT_FREE)]:
+            if free:
+                self.slot_types.append(slot_type)
+                self.slot_columns.append(matrix.columns.get(matrix.slot_polarity(config.POLARITIES, slot_type), matrix.columns[None]))
+        types = matrix.types[self.pool].tolist()
+        self.type_pool = {slot_type: [index for index, mod_type in enumerate(types) if mod_type == slot_type]
+                          for slot_type in set(self.slot_types)}
+
+    def energy(self, stats, mods, capacity):
+        """
+        Returns the energy of a state, lower is better.
+
+        Args:
+        - stats: the stat vector of the state.
+        - mods: the number of equipped mods.
+        - capacity: the used capacity.
+        """
+        distance, penalty = self.objective.evaluate(stats)
+        return float(distance + penalty) * DISTANCE_WEIGHT + mods * MOD_WEIGHT + capacity * CAPACITY_WEIGHT
+
+    def initial_slots(self, rng, mods=None):
+        """
+        Returns the slots of a starting state, holding the given mods when possible, otherwise random ones.
+
+        Args:
+        - rng: the random generator of the chain.
+        - mods: an optional list of mod ids to start from.
+
+        Returns:
+        - The pool index held by every slot, -1 for an empty slot.
+        """
+        slots = [-1] * len(self.slot_types)
+        indexes = {mod: index for index, mod in enumerate(self.pool)}
+        if mods:
+            families = set()
+            for mod in sorted(mods, key=lambda mod: self.matrix.drains[mod], reverse=True):
+                index = indexes.get(mod)
+                if index is None or index in slots or (self.families[index] is not None and self.families[index] in families):
+                    continue
+                # Prefer the slot where the mod costs the least
+                free = [slot for slot, held in enumerate(slots) if held == -1 and self.slot_types[slot] == self.matrix.types[mod]]
+                if free:
+                    slot = min(free, key=lambda slot: self.costs[index][self.slot_columns[slot]])
+                    slots[slot] = index
+                    families.add(self.families[index])
+        else:
+            for slot, slot_type in enumerate(self.slot_types):
+                options = [index for index in self.type_pool[slot_type] if index not in slots]
+                if options and rng.random() < 0.5:
+                    slots[slot] = rng.choice(options)
+            used = set()
+            for slot, index in enumerate(slots):
+                if index != -1 and self.families[index] is not None:
+                    if self.families[index] in used:
+                        slots[slot] = -1
+                    used.add(self.families[index])
+        if sum(self.costs[index][column] for index, column in zip(slots, self.slot_columns)) > self.max_capacity:
+            slots = [-1] * len(self.slot_types)
+        return slots
+
+    def run(self, seed=0, mods=None):
+        """
+        Runs one annealing chain.
+
+        Args:
+        - seed: the seed of the random generator of the chain.
+        - mods: an optional list of mod ids to start from.
+
+        Returns:
+        - The lowest energy reached and the mod ids of the state reaching it.
+        """
+        rng = random.Random(seed)
+        cool = SCHEDULES[self.schedule]
+        slots = self.initial_slots(rng, mods)
+        position = {index: slot for slot, index in enumerate(slots) if index != -1}
+        families = {}
+        for index in position:
+            if self.families[index] is not None:
+                families[self.families[index]] = families.get(self.families[index], 0) + 1
+        sets = SetState(self.matrix)
+        stats = self.objective.base + self.matrix.set_stats([self.ids[index] for index in position])
+        for index in position:
+            sets.apply(added=self.ids[index])
+        capacity = sum(self.costs[index][column] for index, column in zip(slots, self.slot_columns))
+        count = len(position)
+        energy = self.energy(stats, count, capacity)
+        best_energy, best_slots = energy, slots.copy()
+
+        for step in range(self.steps):
+            temperature = cool(self.start_temperature, self.end_temperature, step / self.steps)
+            slot = rng.randrange(len(slots))
+            column = self.slot_columns[slot]
+            options = self.type_pool[self.slot_types[slot]]
+            new = -1 if not options or rng.random() < 0.2 else rng.choice(options)
+            old = slots[slot]
+            if new == old:
+                continue
+
+            if new in position:
+                # Exchange the mods of two slots of the same type, which only changes the capacity
+                other = position[new]
+                other_column = self.slot_columns[other]
+                delta = (self.costs[new][column] + self.costs[old][other_column]
+                         - self.costs[new][other_column] - self.costs[old][column])
+                if capacity + delta > self.max_capacity:
+                    continue
+                if delta <= 0 or rng.random() < math.exp(-delta * CAPACITY_WEIGHT / temperature):
+                    slots[slot], slots[other] = new, old
+                    position[new] = slot
+                    if old != -1:
+                        position[old] = other
+                    capacity += delta
+                    energy += delta * CAPACITY_WEIGHT
+            else:
+                family = self.families[new]
+                if family is not None and family != self.families[old] and families.get(family):
+                    continue
+                new_capacity = capacity - self.costs[old][column] + self.costs[new][column]
+                if new_capacity > self.max_capacity:
+                    continue
+                new_stats = stats + sets.delta(self.ids[old], self.ids[new])
+                new_count = count + (new != -1) - (old != -1)
+                new_energy = self.energy(new_stats, new_count, new_capacity)
+                delta = new_energy - energy
+                if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                    slots[slot] = new
+                    sets.apply(self.ids[old], self.ids[new])
+                    if old != -1:
+                        del position[old]
+                        if self.families[old] is not None:
+                            families[self.families[old]] -= 1
+                    if new != -1:
+                        position[new] = slot
+                        if family is not None:
+                            families[family] = families.get(family, 0) + 1
+                    stats, capacity, count, energy = new_stats, new_capacity, new_count, new_energy
+
+            if energy < best_energy - 1e-9:
+                best_energy, best_slots = energy, slots.copy()
+
+        return best_energy, [self.pool[index] for index in best_slots if index != -1]
+
+
+# Chain of the current worker process, set once by worker_init instead of being sent with every task
+worker_chain = None
+
+
+def worker_init(annealing):
+    """
+    Initializes a worker process with the chain its tasks run.
+
+    Args:
+    - annealing: the SimulatedAnnealing to run, with a shared mod matrix so it only carries the matrix handle.
+    """
+    global worker_chain
+    worker_chain = annealing
+
+
+def run_worker_chain(seed, mods=None):
+    """
+    Runs one annealing chain of the worker process.
+
+    Args:
+    - seed: the seed of the random generator of the chain.
+    - mods: an optional list of mod ids to start from.
+
+    Returns:
+    - The lowest energy reached and the mod ids of the state reaching it.
+    """
+    return worker_chain.run(seed, mods)
@@ -0,0 +1,103 @@
+import cProfile
+from concurrent.futures import ProcessPoolExecutor
+
+from Config.feasibility import InfeasibleGoalsError, check
+from Genetic.build import Build
+from .annealing import SimulatedAnnealing, run_worker_chain, worker_init
+
+
+class AnnealingCalculator:
+    """
+    A class that calculates the best build for a given configuration using simulated annealing.
+    """
+
+    def __init__(self, loader=None, config=None, store=None):
+        """
+        Initializes a new instance of the AnnealingCalculator class.
+
+        :param loader: An optional loader object.
+        :param config: An optional configuration object.
+        :param store: An optional BuildStore used to reuse and save solved builds.
+        """
+        self.loader = loader
+        self.config = config
+        self.store = store
+
+    def run_chains(self, seeds):
+        """
+        Runs the annealing chains, across processes when more than one is configured.
+
+        The worker processes attach to the mod matrix in shared memory and receive the chain once, so their startup
+        and every task only carry small handles and mod ids, whatever the size of the mod database.
+
+        :param seeds: The mod lists the first chains start from.
+        :return: The (energy, mod ids) result of every chain.
+        """
+        restarts = max(1, self.config.ANNEALING_RESTARTS)
+        starts = [[mod["id"] for mod in seeds[chain]] if chain < len(seeds) else None for chain in range(restarts)]
+        if self.config.ANNEALING_PROCESSES > 1 and restarts > 1:
+            matrix = self.config.MOD_MATRIX.share()
+            try:
+                annealing = SimulatedAnnealing(self.config, matrix=matrix)
+                with ProcessPoolExecutor(min(self.config.ANNEALING_PROCESSES, restarts), initializer=worker_init, initargs=(annealing,)) as pool:
+                    return list(pool.map(run_worker_chain, range(restarts), starts))
+            finally:
+                matrix.release()
+        annealing = SimulatedAnnealing(self.config)
+        return [annealing.run(chain, mods) for chain, mods in enumerate(starts)]
+
+    def find_build(self, seeds=None):
+        """
+        Finds the best build using simulated annealing, unless the same request was already solved.
+
+        :param seeds: An optional list of mod lists the first chains start from, such as greedy builds.
+        :return: The best Build found.
+        :raises InfeasibleGoalsError: If a goal stat is out of reach of every build, checked before searching.
+        """
+        check(self.config)
+        stored_mods = self.store.get(self.config) if self.store else None
+        if stored_mods:
+            mods = stored_mods
+        else:
+            seeds = list(seeds or [])
+            seeds += self.store.near(self.config) if self.store else []
+            results = self.run_chains(seeds)
+            _, ids = min(results, key=lambda result: result[0])
+            mods = [self.config.LOADED_MODS[mod] for mod in ids]
+
+        best_build = Build(self.config)
+        for mod in sorted(mods, key=lambda mod: (mod["type"] == 0, mod["type"] != 1)):
+            best_build.add_mod(mod)
+        if self.store and not stored_mods and best_build.stat_distance < 0.001:
+            self.store.put(self.config, best_build.mods, best_build.modded_stats, best_build.used_capacity, best_build.stat_distance, "annealing")
+        return best_build
+
+    def optimize_build(self):
+        """
+        Optimizes the build using simulated annealing and prints it.
+        """
+        try:
+            best_build = self.find_build()
+        except InfeasibleGoalsError as error:
+            print(error)
+            return None
+        print(f"Used Aura: {best_build.used_aura}, Used Exilus: {best_build.used_exilus}, Used Standard Mods: {best_build.used_mods}")
+        print(f"Modded Stats: {best_build.modded_stats}")
+        print(f"Mods: {[mod['name'] for mod in best_build.mods]}")
+        if self.config.PLACED_MODS:
+            print(f"Required Mods: {[mod['name'] for mod, _, _, _ in self.config.PLACED_MODS]}")
+        if self.config.ARCHON_SHARD_SLOTS:
+            print(f"Archon Shards: {list(self.config.OBJECTIVE.best_offset_name(best_build.stat_vector))}")
+        print(f"Used Capacity: {best_build.used_capacity}")
+
+
+if __name__ == "__main__":
+    from Config import config, loader
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    ac = AnnealingCalculator(loader=loader, config=config)
+    ac.optimize_build()
+    profiler.disable()
+    profiler.print_stats(sort='cumtime')
+    profiler.dump_stats("profile.prof")
@@ -1,4 +1,8 @@
-from . import loader
+from . import dominance, loader
+from .modmatrix import ModMatrix
+from .modpool import ModPool
+from .objective import Objective
+from .shards import shard_combinations
 import numpy as np
 
 # Maximum number of mods that can be equipped
@@ -13,6 +17,80 @@ AURA_SLOT_FREE = True
 # Whether the exilus slot is free or not
 EXILUS_SLOT_FREE = True
 
+# Maximum number of forma the layout search may add to the polarities below
+MAX_FORMA = 4
+
+# Number of genetic algorithm runs the layout search makes to find mod sets reaching the goal stats
+FORMA_COLLECT_ATTEMPTS = 10
+
+# Maximum number of distinct solved builds kept by the genetic algorithm
+ARCHIVE_SIZE = 256
+
+# Number of builds of every generation of the genetic algorithm
+GENETIC_POPULATION_SIZE = 300
+
+# Maximum number of generations of a genetic algorithm run
+GENETIC_MAX_GENERATIONS = 100
+
+# Chance of each mutation step being the last one, every step adding or removing a random mod, so higher rates
+# mutate builds less
+GENETIC_MUTATION_RATE = 0.6
+
+# Generations without a new solved build after which a genetic algorithm run stops
+GENETIC_STALL_GENERATIONS = 15
+
+# Solved builds archived, minus the generations without a new one, after which a genetic algorithm run stops
+GENETIC_ARCHIVE_TARGET = 100
+
+# Path of the file where the genetic calculator checkpoints its runs and resumes them from, None to disable
+GENETIC_CHECKPOINT_PATH = None
+
+# Generations between two checkpoints of a genetic algorithm run
+GENETIC_CHECKPOINT_INTERVAL = 5
+
+# Maximum number of genetic algorithm runs the genetic calculator makes to reach the goal stats, None to run until
+# they are reached. Goals each reachable alone may not be reachable together, so the best build found is returned
+# once the runs are exhausted
+GENETIC_MAX_RESTARTS = 10
+
+# Maximum number of genetic algorithm runs of a service request, so unreachable goals cannot keep a worker busy
+SERVICE_GENETIC_RESTARTS = 3
+
+# Maximum number of build evaluations memoized across the genetic algorithm restarts
+FITNESS_CACHE_SIZE = 20000
+
+# Number of distinct builds the greedy calculator lists, best first. Above 1 they are enumerated with a priority
+# queue over partial builds instead of searching a single build
+TOP_BUILDS = 1
+
+# Number of mods each listed build must have that every other listed build does not, 0 to list any distinct builds
+TOP_BUILDS_MIN_DIFFERENCE = 0
+
+# Path of the SQLite database where solved builds are stored and reused
+STORE_PATH = "builds.db"
+
+# Largest difference in any goal stat for a stored build to seed the search of a new request
+STORE_NEAR_DISTANCE = 0.3
+
+# Number of moves made by each simulated annealing chain
+ANNEALING_STEPS = 200000
+
+# Number of simulated annealing chains, the best of them being kept
+ANNEALING_RESTARTS = 4
+
+# Number of processes the simulated annealing chains are spread across
+ANNEALING_PROCESSES = 4
+
+# Number of processes the rows of a goal sweep are spread across
+SWEEP_PROCESSES = 1
+
+# Cooling schedule of the simulated annealing: "geometric", "linear" or "logarithmic"
+ANNEALING_SCHEDULE = "geometric"
+
+# Temperatures at the start and at the end of each simulated annealing chain
+ANNEALING_START_TEMPERATURE = 2.0
+ANNEALING_END_TEMPERATURE = 0.001
+
 # Stats we want to achieve. Edit this dictionary to set your desired values
 GOAL_STATS = {
     "Range": 2.6,
@@ -22,6 +100,37 @@ GOAL_STATS = {
     "Sprint Speed": 1.0,
 }
 
+# Weight of the shortfall of each goal stat, 1 for the goal stats missing here
+GOAL_WEIGHTS = {}
+
+# Goal stats that do not have to be reached, their shortfall only ranking builds that reach the other goals
+SOFT_GOALS = []
+
+# Weight of each goal stat going above its goal, 0 for the goal stats missing here
+OVERSHOOT_WEIGHTS = {}
+
+# Highest effective value of stats, bonuses above it are wasted
+STAT_CAPS = {"Efficiency": 1.75}
+
+# Lowest effective value of stats, maluses below it are ignored
+STAT_FLOORS = {"Duration": 0.125, "Range": 0.34}
+
+# Mod sets whose bonus raises the stats of their own mods by the modSetValues of the number equipped. The bonuses
+# of the other sets do not change the stats optimized here
+STAT_SCALING_SETS = ["/Lotus/Upgrades/Mods/Sets/Umbra/UmbraSetMod"]
+
+# Number of archon shard slots chosen along with the mods, on top of BASE_STATS. 0 leaves the shards out of the
+# search, for BASE_STATS that already account for them
+ARCHON_SHARD_SLOTS = 0
+
+# Stat bonus of each archon shard option, in the same units as the stats of the mods
+ARCHON_SHARD_OPTIONS = {
+    "Crimson Strength": {"Strength": 0.10},
+    "Crimson Duration": {"Duration": 0.10},
+    "Tauforged Crimson Strength": {"Strength": 0.15},
+    "Tauforged Crimson Duration": {"Duration": 0.15},
+}
+
 # Polarities of the mod slots
 POLARITIES = {
     0: {
@@ -64,20 +173,59 @@ BASE_STATS = {
     "Mobility": 1.0
 }
 
+# Path of the mods file the mod database is loaded from
+MODS_PATH = "Mods.json"
+
+# Seconds between checks of the mods file by long-running processes, which reload it when it changes
+SNAPSHOT_RELOAD_INTERVAL = 5.0
+
 # Mods are in a dictionary format, the calculations will be performed in numpy.
-MOD_DATABASE = loader.get_mods()
+LOADED_MODS = loader.get_mods(MODS_PATH)
+
+# Owned mods and their rank, keyed by mod name, None for the max rank. None when every mod is owned at max rank
+INVENTORY = None
+
+# Mods every build must use. They are placed before the search, which only runs over the slots and capacity left
+REQUIRED_MODS = []
+
+# Mods no build may use
+FORBIDDEN_MODS = []
+
+# Mods placed before the search, as (mod, slot type, slot polarity, cost), set when the inventory is applied
+PLACED_MODS = []
 
-# Remove mods that do not have any of the goal stats
-MOD_DATABASE = [mod for mod in MOD_DATABASE if any(mod[stat] > 0.0 for stat in GOAL_STATS) or mod["type"] == 1]
+# Version of the mod database, solved builds are only reused with the same version
+MOD_DATABASE_VERSION = loader.get_version(LOADED_MODS)
+
+# List of unique mod names
+UNIQUE_MOD_NAMES = ["Continuity", "Flow", "Stretch", "Vitality", "Vigor", "Fiber", "Intensify", "Anguish", "Hatred"]
+
+# Also remove the mods that another mod of the same type and polarity beats for the goal stats
+PRUNE_DOMINATED_MODS = True
+
+# Remove mods that do not have any of the goal stats, along with the dominated mods, recorded as (mod, dominated by)
+SELECTED_MODS, PRUNED_MODS = dominance.select_mods(LOADED_MODS, GOAL_STATS, UNIQUE_MOD_NAMES, STAT_SCALING_SETS, OVERSHOOT_WEIGHTS, PRUNE_DOMINATED_MODS,
+                                                 MAX_MODS)
+
+# Mod database frozen so every build shares views into it
+MOD_POOL = ModPool(SELECTED_MODS, GOAL_STATS)
+MOD_DATABASE = MOD_POOL.mods
+
+# Capacity cost on every slot polarity, stat bonuses, set bonuses and uniqueness family of every loaded mod
+MOD_MATRIX = ModMatrix(LOADED_MODS, POLARITIES[0], loader.STAT_KEYS, STAT_SCALING_SETS, UNIQUE_MOD_NAMES)
+
+# Distinct archon shard combinations and the stats they add, enumerated once for every build
+SHARD_COMBINATIONS, SHARD_OFFSETS = shard_combinations(ARCHON_SHARD_OPTIONS, list(MOD_MATRIX.stat_columns), ARCHON_SHARD_SLOTS)
+
+# Objective every engine scores builds with, over the stat columns of the mod matrix
+OBJECTIVE = Objective(list(MOD_MATRIX.stat_columns), GOAL_STATS, BASE_STATS, GOAL_WEIGHTS, STAT_CAPS, STAT_FLOORS, OVERSHOOT_WEIGHTS, SOFT_GOALS,
+                      SHARD_OFFSETS, SHARD_COMBINATIONS)
 
 # Minimum needed goal stats.
 MIN_GOAL_STATS = {
     stat: max(GOAL_STATS[stat], BASE_STATS[stat]) for stat in GOAL_STATS
 }
 
-# List of unique mod names
-UNIQUE_MOD_NAMES = ["Continuity", "Flow", "Stretch", "Vitality", "Vigor", "Fiber", "Intensify", "Anguish", "Hatred"]
-
 def calculate_mod_stats(mods):
     """
     Calculates the stats of the given mods.
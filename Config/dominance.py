@@ -0,0 +1,94 @@
+import numpy as np
+
+from . import loader
+
+
+def mod_families(mod, unique_names):
+    """
+    Returns the uniqueness families of a mod, the unique names in its name.
+
+    Args:
+        mod (dict): A processed mod.
+        unique_names (list): The names shared by mods that cannot be equipped together.
+
+    Returns:
+        set: The unique names of the mod.
+    """
+    return {word.capitalize() for word in mod["name"].split(" ") if word.capitalize() in unique_names}
+
+
+def prune_dominated(mods, goal_stats, unique_names, scaling_sets=(), exact_stats=(), max_mods=8):
+    """
+    Removes the mods that other mods of the same type and polarity make useless for the goal stats.
+
+    A mod is dominated by another mod that is no worse in any goal stat, drains no more capacity and belongs to no
+    uniqueness family the first mod is not in. Mods equal in all of these are dominated by the first of them. A
+    build may already hold the mods dominating a mod, so a mod is only pruned when it is dominated by at least as
+    many mods as there are slots of its type: one of them is then always left to replace it in a build. Mods of
+    scaling sets are kept, as their stats depend on the rest of the build.
+
+    Args:
+        mods (list): The processed mods.
+        goal_stats (dict): The stats we want to achieve.
+        unique_names (list): The names shared by mods that cannot be equipped together.
+        scaling_sets (list): The mod sets whose bonus raises the stats of their own mods.
+        exact_stats (list): The goal stats where going higher is not always better, which must be equal instead.
+        max_mods (int): The number of standard mod slots, the aura and exilus slots being single.
+
+    Returns:
+        tuple: The kept mods, in their original order, and a list of (pruned mod name, dominating mod name) pairs.
+    """
+    stats = list(goal_stats)
+    values = np.array([[mod[stat] for stat in stats] for mod in mods], dtype=np.float64).reshape(len(mods), len(stats))
+    exact = np.array([stat in exact_stats for stat in stats], dtype=bool)
+    drains = np.array([mod["actualDrain"] for mod in mods], dtype=np.float64)
+    families = [mod_families(mod, unique_names) for mod in mods]
+    groups = [(mod["type"], mod["polarity"]) for mod in mods]
+    fixed = [mod.get("modSet") in scaling_sets for mod in mods]
+
+    # dominated[a, b] is True when mod b can replace mod a in any build
+    dominated = np.zeros((len(mods), len(mods)), dtype=bool)
+    for a in range(len(mods)):
+        if fixed[a]:
+            continue
+        for b in range(len(mods)):
+            if a == b or fixed[b] or groups[a] != groups[b] or drains[b] > drains[a] or not families[b] <= families[a]:
+                continue
+            if (values[b] < values[a]).any() or (values[b] != values[a])[exact].any():
+                continue
+            better = (values[b] > values[a]).any() or drains[b] < drains[a] or families[b] < families[a]
+            dominated[a, b] = better or b < a
+
+    slots = {0: max_mods, 1: 1, 2: 1}
+    removed = dominated.sum(axis=1) >= np.array([max(1, slots.get(group[0], 1)) for group in groups])
+    kept, pruned = [], []
+    for a, mod in enumerate(mods):
+        if not removed[a]:
+            kept.append(mod)
+            continue
+        # Dominance is transitive, so a pruned mod is also dominated by enough kept mods, such as this one
+        by = next(b for b in np.flatnonzero(dominated[a]) if not removed[b])
+        pruned.append((mod["name"], mods[by]["name"]))
+    return kept, pruned
+
+
+def select_mods(mods, goal_stats, unique_names, scaling_sets=(), exact_stats=(), prune=True, max_mods=8):
+    """
+    Returns the mods worth considering for the goal stats and the dominated mods pruned from them.
+
+    Args:
+        mods (list): The processed mods.
+        goal_stats (dict): The stats we want to achieve.
+        unique_names (list): The names shared by mods that cannot be equipped together.
+        scaling_sets (list): The mod sets whose bonus raises the stats of their own mods.
+        exact_stats (list): The goal stats where going higher is not always better.
+        prune (bool): Whether to prune the dominated mods.
+        max_mods (int): The number of standard mod slots.
+
+    Returns:
+        tuple: The selected mods and a list of (pruned mod name, dominating mod name) pairs.
+    """
+    selected = loader.select_mods(mods, goal_stats)
+    if not prune:
+        return selected, []
+    return prune_dominated(selected, goal_stats, unique_names, scaling_sets, exact_stats, max_mods)
@@ -0,0 +1,134 @@
+import numpy as np
+
+
+class InfeasibleGoalsError(ValueError):
+    """
+    Raised when some hard goal stats are above the highest value any build can reach.
+
+    Attributes:
+    - shortfalls (dict): How far each unreachable goal stat is above its highest reachable value.
+    - bounds (dict): The highest reachable value of every goal stat.
+    """
+
+    def __init__(self, shortfalls, bounds):
+        self.shortfalls = shortfalls
+        self.bounds = bounds
+        report = ", ".join(f"{stat} at most {bounds[stat]:.3f}, {shortfall:.3f} short" for stat, shortfall in shortfalls.items())
+        super().__init__(f"Unreachable goal stats: {report}")
+
+
+def knapsack(groups, slots, capacity):
+    """
+    Returns the highest total value of items picked at most one per group, in at most a number of slots, for every
+    capacity budget.
+
+    Parameters:
+    - groups (list): The (cost, value) items of each group, with non-negative integer costs.
+    - slots (int): The highest number of items picked.
+    - capacity (int): The highest budget.
+
+    Returns:
+    - best (np.ndarray): The highest total value within each budget from 0 to capacity.
+    """
+    # table[k, c] is the highest value of at most k items costing at most c, so the empty pick fills it with zeros
+    table = np.zeros((slots + 1, capacity + 1), dtype=np.float64)
+    for items in groups:
+        updated = table.copy()
+        for cost, value in items:
+            if cost <= capacity:
+                np.maximum(updated[1:, cost:], table[:-1, :capacity + 1 - cost] + value, out=updated[1:, cost:])
+        table = updated
+    return table[slots]
+
+
+def stat_bounds(config):
+    """
+    Returns an upper bound of the value of each goal stat that a build can reach, ignoring the other goals.
+
+    Each stat is maximized over the standard slots, the aura slot and the exilus slot, within MAX_CAPACITY and
+    picking at most one mod of every uniqueness family, with a knapsack table over integer capacity. Standard mods
+    cost their cheapest drain on any standard slot of the layout and set mods count their full set bonus, so the
+    bound may be above the best build but never below it. The best archon shard offset, caps and floors are applied.
+
+    Parameters:
+    - config: a configuration object with the build parameters.
+
+    Returns:
+    - bounds (dict): The highest reachable effective value of each goal stat.
+    """
+    matrix = config.MOD_MATRIX
+    objective = config.OBJECTIVE
+    polarized = [polarity for polarity, count in config.POLARITIES[0].items() if count]
+    columns = [matrix.columns[polarity] for polarity in polarized]
+    if config.MAX_MODS > sum(config.POLARITIES[0].values()) or not columns:
+        columns.append(matrix.columns[None])
+
+    standard, auras, exilus = [], [(0, None)], [(0, None)]
+    for mod in config.MOD_DATABASE:
+        if mod["type"] == 0:
+            standard.append(mod)
+        elif mod["type"] == 1 and config.AURA_SLOT_FREE:
+            auras.append((matrix.slot_cost(mod, matrix.slot_polarity(config.POLARITIES, 1)), mod))
+        elif mod["type"] == 2 and config.EXILUS_SLOT_FREE:
+            exilus.append((matrix.slot_cost(mod, matrix.slot_polarity(config.POLARITIES, 2)), mod))
+    costs = {mod["id"]: int(matrix.costs[mod["id"], columns].min()) for mod in standard}
+    largest = max(0, config.MAX_CAPACITY - min(cost for cost, _ in auras))
+
+    full_sets = 1 + matrix.set_values.max(axis=1) if len(matrix.set_names) else np.zeros(0)
+    offsets = objective.offsets.max(axis=0) if objective.offsets is not None else np.zeros(len(objective.stats))
+    unique_names = set(config.UNIQUE_MOD_NAMES)
+
+    def value(mod, column):
+        stat = matrix.stats[mod["id"], column]
+        set_id = matrix.set_ids[mod["id"]]
+        return stat * full_sets[set_id] if set_id >= 0 and stat > 0 else stat
+
+    bounds = {}
+    for stat in config.GOAL_STATS:
+        column = matrix.stat_columns[stat]
+        groups = {}
+        for mod in standard:
+            gain = value(mod, column)
+            if gain > 0:
+                family = next((word.capitalize() for word in mod["name"].split(" ") if word.capitalize() in unique_names), mod["name"])
+                groups.setdefault(family, []).append((costs[mod["id"]], gain))
+        best = knapsack(list(groups.values()), config.MAX_MODS, largest)
+
+        reachable = -np.inf
+        for aura_cost, aura in auras:
+            for exilus_cost, exilus_mod in exilus:
+                budget = config.MAX_CAPACITY - aura_cost - exilus_cost
+                if budget < 0:
+                    continue
+                total = best[min(budget, largest)]
+                total += max(0.0, value(aura, column)) if aura else 0.0
+                total += max(0.0, value(exilus_mod, column)) if exilus_mod else 0.0
+                reachable = max(reachable, total)
+        position = objective.stats.index(stat)
+        reachable += objective.base[position] + offsets[position]
+        bounds[stat] = float(np.clip(reachable, objective.floors[position], objective.caps[position]))
+    return bounds
+
+
+def check(config):
+    """
+    Checks that every hard goal stat is below its upper bound, before any search starts.
+
+    Parameters:
+    - config: a configuration object with the build parameters.
+
+    Returns:
+    - bounds (dict): The highest reachable effective value of each goal stat.
+
+    Raises:
+    - InfeasibleGoalsError: if some hard goal stats are out of reach, with how far.
+    """
+    bounds = stat_bounds(config)
+    objective = config.OBJECTIVE
+    shortfalls = {}
+    for stat, goal in config.GOAL_STATS.items():
+        if objective.hard_weights[objective.stats.index(stat)] > 0 and goal > bounds[stat] + 1e-9:
+            shortfalls[stat] = goal - bounds[stat]
+    if shortfalls:
+        raise InfeasibleGoalsError(shortfalls, bounds)
+    return bounds
@@ -0,0 +1,167 @@
+from . import loader, request
+from .dominance import mod_families
+from .modmatrix import ModMatrix
+
+
+def rank_mod(mod, rank):
+    """
+    Returns a mod at a lower rank than the max rank it is loaded at.
+
+    Mod stats grow linearly with the rank, the max rank giving fusionLimit + 1 times the stats of rank 0, and every
+    rank drains one more capacity point, or gives one more for aura mods.
+
+    Args:
+        mod (dict): A processed mod, at max rank.
+        rank (int): The rank, between 0 and the fusionLimit of the mod, None for the max rank.
+
+    Returns:
+        dict: The mod at that rank, the same mod at max rank.
+
+    Raises:
+        ValueError: If the rank is out of range.
+    """
+    max_rank = int(mod["fusionLimit"])
+    rank = max_rank if rank is None else rank
+    if not 0 <= rank <= max_rank:
+        raise ValueError(f"{mod['name']} ranks go from 0 to {max_rank}, not {rank}")
+    if rank == max_rank:
+        return mod
+    ranked = dict(mod)
+    for stat in loader.STAT_KEYS:
+        ranked[stat] = mod[stat] * (rank + 1) / (max_rank + 1)
+    ranked["actualDrain"] = mod["actualDrain"] - (max_rank - rank) if mod["actualDrain"] >= 0 else mod["actualDrain"] + (max_rank - rank)
+    return ranked
+
+
+def compile_mods(mods, owned=None, required=(), forbidden=(), unique_names=(), scaling_sets=()):
+    """
+    Compiles the candidate mods of an inventory: the owned mods at their rank, without the forbidden mods, the
+    required mods and the mods sharing a uniqueness family with a required mod. Candidates are renumbered so their
+    ids index a mod matrix of their own.
+
+    Args:
+        mods (list): The processed mods of the database, at max rank.
+        owned (dict): The rank of every owned mod, keyed by name, None for the max rank, or None when every mod is
+            owned at max rank. Mods that are not in the database are ignored.
+        required (list): The names of the mods every build must use.
+        forbidden (list): The names of the mods no build may use.
+        unique_names (list): The names shared by mods that cannot be equipped together.
+        scaling_sets (list): The mod sets whose bonus scales the stats of their own mods.
+
+    Returns:
+        tuple: The candidate mods, and the required mods at their rank.
+
+    Raises:
+        ValueError: If a required or forbidden mod is not in the database, a required mod is not owned, is also
+            forbidden, shares a uniqueness family with another required mod or belongs to a scaling set.
+    """
+    names = {mod["name"] for mod in mods}
+    unknown = [name for name in list(required) + list(forbidden) if name not in names]
+    if unknown:
+        raise ValueError(f"Unknown mods: {unknown}")
+    if owned is not None and any(name not in owned for name in required):
+        raise ValueError(f"Required mods that are not owned: {[name for name in required if name not in owned]}")
+    if set(required) & set(forbidden):
+        raise ValueError(f"Mods both required and forbidden: {sorted(set(required) & set(forbidden))}")
+
+    required_mods = []
+    families = set()
+    for mod in mods:
+        if mod["name"] not in required:
+            continue
+        if mod.get("modSet") in scaling_sets:
+            raise ValueError(f"{mod['name']} belongs to a set scaling its stats, so it cannot be placed before the search")
+        if mod_families(mod, unique_names) & families:
+            raise ValueError(f"{mod['name']} cannot be equipped with the other required mods")
+        families |= mod_families(mod, unique_names)
+        required_mods.append(rank_mod(mod, owned[mod["name"]]) if owned is not None else mod)
+
+    candidates = []
+    for mod in mods:
+        if mod["name"] in required or mod["name"] in forbidden or mod_families(mod, unique_names) & families:
+            continue
+        if owned is not None:
+            if mod["name"] not in owned:
+                continue
+            mod = rank_mod(mod, owned[mod["name"]])
+        candidates.append(dict(mod, id=len(candidates)))
+    return candidates, required_mods
+
+
+def place(config, mods):
+    """
+    Places the required mods before the search, on the slots costing them the least, and returns the configuration
+    values left to the search: the other slots, the capacity they leave, and the base stats with their stats added.
+
+    Aura and exilus mods take their slot, and standard mods are assigned to the standard slots at the lowest total
+    cost by ModMatrix.place, on a cost table of their own as they may be ranked down.
+
+    Args:
+        config: The configuration the mods are placed on.
+        mods (list): The required mods.
+
+    Returns:
+        dict: The POLARITIES, MAX_MODS, MAX_CAPACITY, AURA_SLOT_FREE, EXILUS_SLOT_FREE and BASE_STATS left, and the
+            PLACED_MODS, as (mod, slot type, slot polarity, cost).
+
+    Raises:
+        ValueError: If the mods need more slots or capacity than the configuration has.
+    """
+    polarities = {slot_type: counts.copy() for slot_type, counts in config.POLARITIES.items()}
+    free = {1: config.AURA_SLOT_FREE, 2: config.EXILUS_SLOT_FREE}
+    for mod in mods:
+        if mod["type"]:
+            if not free[mod["type"]]:
+                raise ValueError(f"{mod['name']} needs a free {'aura' if mod['type'] == 1 else 'exilus'} slot")
+            free[mod["type"]] = False
+    max_mods = config.MAX_MODS - sum(1 for mod in mods if not mod["type"])
+    if max_mods < 0:
+        raise ValueError("The required mods need more slots than the build has")
+
+    numbered = [dict(mod, id=position) for position, mod in enumerate(mods)]
+    matrix = ModMatrix(numbered, config.POLARITIES[0])
+    capacity = config.MAX_CAPACITY
+    base_stats = config.BASE_STATS.copy()
+    placed = []
+    for mod, slot_type, polarity in matrix.place(numbered, config.POLARITIES, config.MAX_MODS):
+        if not slot_type and polarity:
+            polarities[0][polarity] -= 1
+        cost = matrix.slot_cost(mod, polarity)
+        capacity -= cost
+        placed.append((mods[mod["id"]], slot_type, polarity, cost))
+        for stat in base_stats:
+            base_stats[stat] += mod[stat]
+    if capacity < 0:
+        raise ValueError("The required mods need more capacity than the build has")
+    return {"POLARITIES": polarities, "MAX_MODS": max_mods, "MAX_CAPACITY": capacity, "AURA_SLOT_FREE": free[1],
+            "EXILUS_SLOT_FREE": free[2], "BASE_STATS": base_stats, "PLACED_MODS": placed}
+
+
+def apply(config, owned=None, required=None, forbidden=None):
+    """
+    Returns the configuration of an inventory: searching only the candidate mods, over the slots and capacity the
+    required mods leave. Applying it again to the returned configuration changes nothing.
+
+    Args:
+        config: The configuration to apply the inventory to, over the whole mod database.
+        owned (dict): The rank of every owned mod, keyed by name, config.INVENTORY by default.
+        required (list): The names of the mods every build must use, config.REQUIRED_MODS by default.
+        forbidden (list): The names of the mods no build may use, config.FORBIDDEN_MODS by default.
+
+    Returns:
+        The derived configuration, or config itself without an inventory, required or forbidden mods.
+
+    Raises:
+        ValueError: If the inventory cannot be applied, see compile_mods and place.
+    """
+    owned = config.INVENTORY if owned is None else owned
+    required = config.REQUIRED_MODS if required is None else required
+    forbidden = config.FORBIDDEN_MODS if forbidden is None else forbidden
+    if owned is None and not required and not forbidden:
+        return config
+    candidates, required_mods = compile_mods(config.LOADED_MODS, owned, required, forbidden, config.UNIQUE_MOD_NAMES,
+                                             config.STAT_SCALING_SETS)
+    placement = place(config, required_mods)
+    matrix = ModMatrix(candidates, config.POLARITIES[0], loader.STAT_KEYS, config.STAT_SCALING_SETS, config.UNIQUE_MOD_NAMES)
+    return request.derive(config, LOADED_MODS=candidates, MOD_MATRIX=matrix, MOD_DATABASE_VERSION=loader.get_version(candidates),
+                          INVENTORY=None, REQUIRED_MODS=[], FORBIDDEN_MODS=[], **placement)
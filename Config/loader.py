@@ -1,4 +1,5 @@
 import json
+import hashlib
 import pandas as pd
 import warnings
 from pandas.errors import SettingWithCopyWarning
@@ -12,17 +13,20 @@ warnings.simplefilter(action="ignore", category=SettingWithCopyWarning)
 ONLY_MAX_LEVEL = True
 STAT_KEYS = ["Range", "Duration", "Efficiency", "Strength", "Health", "Shield", "Armor", "Energy", "Sprint Speed", "Mobility"]
 
-def load_mods() -> list:
+def load_mods(path: str = "Mods.json") -> list:
     """
     Load the Warframe mods from Mods.json and return them as a list of dictionaries.
 
     This function reads the Mods.json file and filters the mods that are compatible with the WARFRAME or Aura categories.
     It also filters the mods that have levelStats. Then, it removes duplicates based on the mod name and returns the filtered mods.
 
+    Args:
+        path (str): The path of the mods file.
+
     Returns:
         list: A list of dictionaries containing the filtered mods.
     """
-    with open("Mods.json", "r") as mods_file:
+    with open(path, "r") as mods_file:
         mods = json.load(mods_file)
 
     # Filter mods by compatibility and levelStats
@@ -64,8 +68,11 @@ def process_mods(mods: list) -> pd.DataFrame:
     # Add a new type column to the mods DataFrame called type, if it's of compatName WARFRAME, type is 0, compatName AURA, type is 1, isExilus, type is 2
     mods["type"] = mods.apply(lambda row: 2 if row["isExilus"] else 1 if row["compatName"] == "AURA" else 0 if row["compatName"] == "WARFRAME" else 3, axis=1)
     mods["actualDrain"] = mods.apply(lambda row: row["drain"] + row["fusionLimit"] if row["drain"] >= 0 else row["drain"] - row["fusionLimit"], axis=1)
-    # Drop the columns compatName, isExilus, fusionLimit, drain
-    mods = mods.drop(columns=["compatName", "isExilus", "fusionLimit", "drain"])
+    # Drop the columns compatName, isExilus, drain, keeping fusionLimit as the max rank of the mod
+    mods = mods.drop(columns=["compatName", "isExilus", "drain"])
+
+    # Give every mod an id matching its position, used to index the precomputed mod tables
+    mods["id"] = range(len(mods))
 
     # Convert to dictionary
     mods = mods.to_dict(orient="records")
@@ -140,14 +147,44 @@ def extract_stats(text: str) -> dict:
                     continue  # If there's an error, skip to the next iteration
     return stats  # Return the extracted stats dictionary
 
-def get_mods() -> list:
+def get_mods(path: str = "Mods.json") -> list:
     """
     Returns a list of Warframe mods with relevant information.
 
+    Args:
+        path (str): The path of the mods file.
+
     Returns:
         list: A list of dictionaries containing the filtered mods.
     """
-    return process_mods(load_mods())
+    return process_mods(load_mods(path))
+
+def select_mods(mods: list, goal_stats: dict) -> list:
+    """
+    Returns the mods that improve at least one of the goal stats, along with every aura mod.
+
+    Args:
+        mods (list): A list of processed mods.
+        goal_stats (dict): The stats we want to achieve.
+
+    Returns:
+        list: The mods worth considering for the goal stats.
+    """
+    return [mod for mod in mods if any(mod[stat] > 0.0 for stat in goal_stats) or mod["type"] == 1]
+
+def get_version(mods: list) -> str:
+    """
+    Returns a short hash identifying the content of a processed list of mods, so results computed with one
+    version of Mods.json are not reused with another.
+
+    Args:
+        mods (list): A list of processed mods.
+
+    Returns:
+        str: The version of the mods.
+    """
+    content = json.dumps(mods, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode()).hexdigest()[:16]
 
 if __name__ == "__main__":
     process_mods(load_mods())
\ No newline at end of file
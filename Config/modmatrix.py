@@ -0,0 +1,445 @@
+import math
+import numpy as np
+
+from .shared import SharedArrays
+
+# Drain multiplier of standard and exilus mods on a slot matching their polarity, rounded up
+MATCHING_DRAIN = 0.5
+
+# Drain multiplier of standard and exilus mods on a slot of another polarity, rounded up
+MISMATCHED_DRAIN = 1.5
+
+# Capacity bonus multiplier of aura mods on a slot matching their polarity
+MATCHING_AURA_BONUS = 2
+
+# Capacity bonus multiplier of aura mods on a slot of another polarity, rounded towards a smaller bonus
+MISMATCHED_AURA_BONUS = 0.5
+
+# Maximum number of standard mod assignments memoized by a mod matrix
+MAX_PLACEMENTS = 100000
+
+# Arrays of a mod matrix placed in shared memory, its other attributes being rebuilt from the handle
+SHARED_ARRAYS = ["costs", "min_costs", "stats", "set_ids", "set_values", "drains", "polarity_codes", "types", "family_ids"]
+
+# Mod matrices this process attached to, keyed by the path of their shared arrays
+attached = {}
+
+
+def attach(handle):
+    """
+    Returns the mod matrix of a shared handle, mapping its arrays once per process.
+
+    Parameters:
+    - handle (tuple): The handle of a shared mod matrix, from ModMatrix.handle.
+
+    Returns:
+    - matrix (ModMatrix): The mod matrix, whose arrays are read-only views of the shared memory.
+    """
+    names, arrays = handle
+    matrix = attached.get(arrays[0])
+    if matrix is None:
+        matrix = ModMatrix.__new__(ModMatrix)
+        matrix.polarities, stats, matrix.set_names, matrix.family_names = [list(values) for values in names]
+        matrix.columns = {polarity: column for column, polarity in enumerate(matrix.polarities)}
+        matrix.columns[None] = len(matrix.polarities)
+        matrix.stat_columns = {stat: column for column, stat in enumerate(stats)}
+        matrix.shared = SharedArrays.attach(arrays)
+        matrix.placements = {}
+        for name in SHARED_ARRAYS:
+            setattr(matrix, name, matrix.shared.arrays[name])
+        attached[arrays[0]] = matrix
+    return matrix
+
+
+class ModMatrix:
+    """
+    The capacity model and stat table shared by every engine.
+
+    The cost of each loaded mod on a slot of every polarity, and on an unpolarized slot, is computed once at load
+    time into an integer table, so the capacity of a build is a table gather plus a sum. The stats of the mods are
+    kept in a float table with the same rows, so the stats of many builds can be computed as array operations, and
+    the bonuses of the sets scaling their own mods are kept in a table indexed by set and equipped count.
+
+    The tables can be placed in shared memory with share, after which the matrix pickles as a small handle and
+    worker processes attach to the same memory instead of receiving a copy of every table.
+
+    Attributes:
+    - polarities (list): The polarity names a slot can have, one table column each.
+    - columns (dict): The table column of each polarity, None being the unpolarized column.
+    - costs (np.ndarray): The cost of each mod on each slot polarity, indexed by mod id and column.
+    - min_costs (np.ndarray): The lowest cost of each mod on any slot.
+    - stat_columns (dict): The stats table column of each stat name.
+    - stats (np.ndarray): The stat bonuses of each mod, indexed by mod id and stat column.
+    - set_names (list): The mod sets whose bonus scales the stats of their own mods.
+    - set_ids (np.ndarray): The index in set_names of the set of each mod, -1 for mods outside those sets.
+    - set_values (np.ndarray): The bonus multiplier of each set, indexed by set and number of equipped set mods.
+    - drains (np.ndarray): The actualDrain of each mod.
+    - polarity_codes (np.ndarray): The index in polarities of the polarity of each mod, -1 for none.
+    - types (np.ndarray): The type of each mod, 0 standard, 1 aura and 2 exilus.
+    - family_names (list): The unique names of which only one mod can be equipped.
+    - family_ids (np.ndarray): The index in family_names of the family of each mod, -1 for mods without one.
+    - shared (SharedArrays): The shared memory holding the tables, None if they are not shared.
+    - placements (dict): The cheapest slot polarities and their cost for every multiset of standard mods already
+      placed on a layout.
+    """
+
+    def __init__(self, mods, polarities, stats=(), scaling_sets=(), unique_names=()):
+        """
+        Precomputes the cost table of the mods.
+
+        Parameters:
+        - mods (list): The loaded mods, each with an id matching its position in the list.
+        - polarities (list): The polarity names a slot can have.
+        - stats (list): The stat names of the stats table.
+        - scaling_sets (list): The mod sets whose bonus scales the stats of their own mods, by the modSetValues of
+          the number of set mods equipped.
+        - unique_names (list): The unique names of which only one mod can be equipped.
+        """
+        self.polarities = list(polarities)
+        self.columns = {polarity: column for column, polarity in enumerate(self.polarities)}
+        self.columns[None] = len(self.polarities)
+        self.costs = np.zeros((len(mods), len(self.columns)), dtype=np.int32)
+        for mod in mods:
+            for polarity, column in self.columns.items():
+                self.costs[mod["id"], column] = self.drain(mod, polarity)
+        self.min_costs = self.costs.min(axis=1) if len(mods) else np.zeros(0, dtype=np.int32)
+        self.stat_columns = {stat: column for column, stat in enumerate(stats)}
+        self.stats = np.array([[mod[stat] for stat in stats] for mod in mods], dtype=np.float64).reshape(len(mods), len(stats))
+
+        # The value of a set for n equipped mods is modSetValues[n - 1], the last value past the end of the list
+        set_mods = [mod for mod in mods if mod.get("modSet") in scaling_sets and isinstance(mod.get("modSetValues"), list)]
+        self.set_names = sorted({mod["modSet"] for mod in set_mods})
+        self.set_ids = np.full(len(mods), -1, dtype=np.int64)
+        size = max([len(mod["modSetValues"]) for mod in set_mods], default=0) + 2
+        self.set_values = np.zeros((len(self.set_names), size), dtype=np.float64)
+        for mod in set_mods:
+            set_id = self.set_names.index(mod["modSet"])
+            self.set_ids[mod["id"]] = set_id
+            values = mod["modSetValues"]
+            self.set_values[set_id, 1:] = [values[min(count, len(values) - 1)] for count in range(size - 1)]
+
+        self.drains = np.array([mod["actualDrain"] for mod in mods], dtype=np.int32)
+        self.polarity_codes = np.array([self.polarities.index(mod["polarity"]) if mod["polarity"] in self.polarities else -1
+                                        for mod in mods], dtype=np.int8)
+        self.types = np.array([mod["type"] for mod in mods], dtype=np.int8)
+        self.family_names = list(unique_names)
+        self.family_ids = np.array([next((self.family_names.index(word.capitalize()) for word in mod["name"].split(" ")
+                                          if word.capitalize() in self.family_names), -1) for mod in mods], dtype=np.int16)
+        self.shared = None
+        self.placements = {}
+
+    @property
+    def handle(self):
+        """
+        The picklable handle other processes attach to a shared matrix with, None if it is not shared.
+        """
+        if self.shared is None:
+            return None
+        names = (self.polarities, list(self.stat_columns), self.set_names, self.family_names)
+        return names, self.shared.handle
+
+    def share(self, directory=None):
+        """
+        Places the tables in shared memory.
+
+        Parameters:
+        - directory (str): The directory of the memory-mapped file, the temporary directory by default.
+
+        Returns:
+        - matrix (ModMatrix): A matrix reading the shared tables, which pickles as its handle. Its release method
+          frees the shared memory once the processes using it are done.
+        """
+        shared = SharedArrays.create({name: getattr(self, name) for name in SHARED_ARRAYS}, directory)
+        matrix = ModMatrix.__new__(ModMatrix)
+        matrix.__dict__.update(self.__dict__)
+        matrix.shared = shared
+        for name in SHARED_ARRAYS:
+            setattr(matrix, name, shared.arrays[name])
+        return matrix
+
+    def release(self):
+        """
+        Frees the shared memory of a matrix returned by share.
+        """
+        if self.shared is not None:
+            attached.pop(self.shared.path, None)
+            self.shared.release()
+            self.shared = None
+
+    def __reduce_ex__(self, protocol):
+        if self.shared is not None:
+            return attach, (self.handle,)
+        return super().__reduce_ex__(protocol)
+
+    def set_value(self, set_ids, counts):
+        """
+        Returns the bonus multiplier of sets with the given numbers of equipped mods.
+        """
+        return self.set_values[set_ids, np.minimum(counts, self.set_values.shape[1] - 1)]
+
+    def set_stats(self, ids):
+        """
+        Calculates from scratch the summed stats of mods, set bonuses included.
+
+        Parameters:
+        - ids (list): The ids of the mods.
+
+        Returns:
+        - stats (np.ndarray): The summed stat vector of the mods.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        stats = self.stats[ids]
+        total = stats.sum(axis=0)
+        sets = self.set_ids[ids]
+        for set_id in np.unique(sets[sets >= 0]):
+            members = stats[sets == set_id]
+            total += members.sum(axis=0) * self.set_value(set_id, len(members))
+        return total
+
+    def drain(self, mod, polarity):
+        """
+        Calculates the capacity cost of a mod on a slot.
+
+        Parameters:
+        - mod (dict): The mod to cost.
+        - polarity (str): The polarity of the slot, None if unpolarized.
+
+        Returns:
+        - cost (int): The capacity cost, negative for the bonus of aura mods.
+        """
+        drain = mod["actualDrain"]
+        if polarity is None:
+            return drain
+        if mod["type"] == 1:
+            return drain * MATCHING_AURA_BONUS if polarity == mod["polarity"] else math.ceil(drain * MISMATCHED_AURA_BONUS)
+        return math.ceil(drain * (MATCHING_DRAIN if polarity == mod["polarity"] else MISMATCHED_DRAIN))
+
+    def slot_cost(self, mod, polarity):
+        """
+        Returns the capacity cost of a mod on a slot of the given polarity, None if unpolarized.
+        """
+        return int(self.costs[mod["id"], self.columns.get(polarity, self.columns[None])])
+
+    def slot_polarity(self, polarities, slot_type):
+        """
+        Returns the polarity of the aura or exilus slot of a layout.
+
+        Parameters:
+        - polarities (dict): The slot polarities, in the config POLARITIES format.
+        - slot_type (int): 1 for the aura slot, 2 for the exilus slot.
+
+        Returns:
+        - polarity (str): The polarity of the slot, None if unpolarized.
+        """
+        return next((polarity for polarity in polarities[slot_type] if polarities[slot_type][polarity]), None)
+
+    def place(self, mods, polarities, max_mods):
+        """
+        Assigns mods to the slots of a layout at the lowest capacity. Aura and exilus mods take their slot, and
+        standard mods are assigned to the standard slots by assign.
+
+        Parameters:
+        - mods (list): The mods to place.
+        - polarities (dict): The slot polarities, in the config POLARITIES format.
+        - max_mods (int): The number of standard slots.
+
+        Returns:
+        - placement (list): The (mod, slot type, slot polarity) of every mod.
+        """
+        placement = []
+        standard = []
+        for mod in mods:
+            if mod["type"]:
+                placement.append((mod, mod["type"], self.slot_polarity(polarities, mod["type"])))
+            else:
+                standard.append(mod)
+        standard.sort(key=lambda mod: (str(mod["polarity"]), mod["actualDrain"]))
+        assignment, _ = self.assign(standard, polarities[0], max_mods)
+        for mod, polarity in zip(standard, assignment):
+            placement.append((mod, 0, polarity))
+        return placement
+
+    def assign(self, mods, polarities, max_mods):
+        """
+        Finds the slot polarities of standard mods with the lowest total cost, an exact assignment solved by dynamic
+        programming over the slots left of each polarity.
+
+        The cost of a mod on a slot only depends on its polarity, drain and type, so assignments are memoized by the
+        multiset of those and the layout, and every build holding the same multiset reuses the same assignment. Mods
+        beyond the number of standard slots are placed on unpolarized slots.
+
+        Parameters:
+        - mods (list): The standard mods, sorted by polarity and drain.
+        - polarities (dict): The number of standard slots of each polarity.
+        - max_mods (int): The number of standard slots.
+
+        Returns:
+        - polarities (tuple): The slot polarity of each mod, None if unpolarized.
+        - cost (int): The capacity cost of the mods on these slots.
+        """
+        key = (tuple((mod["polarity"], mod["actualDrain"], mod["type"]) for mod in mods), tuple(polarities.items()), max_mods)
+        placed = self.placements.get(key)
+        if placed is not None:
+            return placed
+
+        slots = [polarity for polarity in polarities if polarities[polarity]] + [None]
+        counts = [polarities[polarity] for polarity in slots[:-1]]
+        counts.append(max(0, max_mods - sum(counts)) + max(0, len(mods) - max(max_mods, sum(counts))))
+        columns = [self.columns.get(polarity, self.columns[None]) for polarity in slots]
+        # Lowest cost and slot choices of the mods placed so far, keyed by the slots left of each polarity
+        states = {tuple(counts): (0, ())}
+        for mod in mods:
+            costs = self.costs[mod["id"], columns].tolist()
+            placed = {}
+            for left, (cost, choices) in states.items():
+                for slot, count in enumerate(left):
+                    if not count:
+                        continue
+                    state = left[:slot] + (count - 1,) + left[slot + 1:]
+                    if state not in placed or cost + costs[slot] < placed[state][0]:
+                        placed[state] = (cost + costs[slot], choices + (slot,))
+            states = placed
+        cost, choices = min(states.values())
+        placed = tuple(slots[slot] for slot in choices), cost
+        if len(self.placements) >= MAX_PLACEMENTS:
+            self.placements.clear()
+        self.placements[key] = placed
+        return placed
+
+    def capacity(self, mods, polarities, max_mods):
+        """
+        Calculates the capacity used by mods placed on a layout.
+
+        Parameters:
+        - mods (list): The mods to place.
+        - polarities (dict): The slot polarities, in the config POLARITIES format.
+        - max_mods (int): The number of standard slots.
+
+        Returns:
+        - capacity (int): The capacity used by the mods.
+        """
+        capacity = 0
+        standard = []
+        for mod in mods:
+            if mod["type"]:
+                capacity += int(self.costs[mod["id"], self.columns.get(self.slot_polarity(polarities, mod["type"]), self.columns[None])])
+            else:
+                standard.append(mod)
+        standard.sort(key=lambda mod: (str(mod["polarity"]), mod["actualDrain"]))
+        return capacity + self.assign(standard, polarities[0], max_mods)[1]
+
+    def cost(self, placement):
+        """
+        Calculates the capacity used by placed mods.
+
+        Parameters:
+        - placement (list): The (mod, slot type, slot polarity) of every mod, as returned by place.
+
+        Returns:
+        - capacity (int): The capacity used by the mods.
+        """
+        if not placement:
+            return 0
+        ids = [mod["id"] for mod, _, _ in placement]
+        columns = [self.columns.get(polarity, self.columns[None]) for _, _, polarity in placement]
+        return int(self.costs[ids, columns].sum())
+
+
+class SetState:
+    """
+    The equipped mods of every stat-scaling set of a build, tracked incrementally.
+
+    A set with n equipped mods adds set_values[n] times the summed stats of those mods, so adding or removing one mod
+    changes the stats by its own bonuses plus the new bonus of its set minus the old one, whatever the build holds.
+
+    Attributes:
+    - matrix (ModMatrix): The mod matrix holding the set tables.
+    - counts (np.ndarray): The number of equipped mods of each set.
+    - totals (np.ndarray): The summed stats of the equipped mods of each set.
+    """
+
+    def __init__(self, matrix):
+        """
+        Initializes the state of a build without mods.
+
+        Parameters:
+        - matrix (ModMatrix): The mod matrix holding the set tables.
+        """
+        self.matrix = matrix
+        self.counts = np.zeros(len(matrix.set_names), dtype=np.int64)
+        self.totals = np.zeros((len(matrix.set_names), matrix.stats.shape[1]), dtype=np.float64)
+
+    def copy(self):
+        """
+        Returns an independent copy of the state.
+        """
+        state = SetState.__new__(SetState)
+        state.matrix, state.counts, state.totals = self.matrix, self.counts.copy(), self.totals.copy()
+        return state
+
+    def delta(self, removed=None, added=None):
+        """
+        Calculates the change of the stats of a build when a mod is removed and another one added.
+
+        Parameters:
+        - removed (int): The id of the removed mod, None if no mod is removed.
+        - added (int): The id of the added mod, None if no mod is added.
+
+        Returns:
+        - delta (np.ndarray): The change of the stat vector, set bonuses included.
+        """
+        matrix = self.matrix
+        delta = np.zeros(matrix.stats.shape[1], dtype=np.float64)
+        if removed is not None:
+            delta -= matrix.stats[removed]
+        if added is not None:
+            delta += matrix.stats[added]
+        for set_id in {matrix.set_ids[mod] for mod in (removed, added) if mod is not None} - {-1}:
+            count, total = self.counts[set_id], self.totals[set_id]
+            new_count, new_total = count, total
+            if removed is not None and matrix.set_ids[removed] == set_id:
+                new_count, new_total = new_count - 1, new_total - matrix.stats[removed]
+            if added is not None and matrix.set_ids[added] == set_id:
+                new_count, new_total = new_count + 1, new_total + matrix.stats[added]
+            delta += new_total * matrix.set_value(set_id, new_count) - total * matrix.set_value(set_id, count)
+        return delta
+
+    def apply(self, removed=None, added=None):
+        """
+        Updates the state when a mod is removed and another one added.
+
+        Parameters:
+        - removed (int): The id of the removed mod, None if no mod is removed.
+        - added (int): The id of the added mod, None if no mod is added.
+
+        Returns:
+        - delta (np.ndarray): The change of the stat vector, set bonuses included.
+        """
+        delta = self.delta(removed, added)
+        for mod, sign in [(removed, -1), (added, 1)]:
+            if mod is not None and self.matrix.set_ids[mod] != -1:
+                self.counts[self.matrix.set_ids[mod]] += sign
+                self.totals[self.matrix.set_ids[mod]] += sign * self.matrix.stats[mod]
+        return delta
+
+    def deltas(self, ids):
+        """
+        Calculates the change of the stats of a build for each of many mods added alone, in one call.
+
+        Parameters:
+        - ids (np.ndarray): The ids of the mods, none of them equipped.
+
+        Returns:
+        - deltas (np.ndarray): The change of the stat vector for each mod, one row per mod.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        deltas = self.matrix.stats[ids]
+        sets = self.matrix.set_ids[ids]
+        members = sets >= 0
+        if members.any():
+            sets = sets[members]
+            counts, totals = self.counts[sets], self.totals[sets]
+            new_values = self.matrix.set_value(sets, counts + 1)[:, None]
+            old_values = self.matrix.set_value(sets, counts)[:, None]
+            deltas[members] += (totals + deltas[members]) * new_values - totals * old_values
+        return deltas
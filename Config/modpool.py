@@ -0,0 +1,81 @@
+class ModPool:
+    """
+    The mod database of a configuration, frozen at load time.
+
+    The mods are kept in an immutable tuple and every subset of them is a bitmask over their positions, so builds
+    only hold an integer instead of their own list of mods. The tuple of mods of a bitmask is built once and shared
+    by every build holding it.
+
+    Attributes:
+    - mods (tuple): The mods of the database.
+    - positions (dict): The position of each mod in the tuple, keyed by unique name.
+    - full_mask (int): The bitmask of every mod.
+    - type_masks (dict): The bitmask of the mods of each type.
+    - stat_masks (dict): The bitmask of the mods changing each goal stat, along with every aura mod.
+    - views (dict): The shared tuple of mods of every bitmask already viewed.
+    """
+
+    def __init__(self, mods, goal_stats, max_views=100000):
+        """
+        Freezes the mods and precomputes their bitmasks.
+
+        Parameters:
+        - mods (list): The mods of the database.
+        - goal_stats (dict): The stats we want to achieve.
+        - max_views (int): The maximum number of bitmask views kept.
+        """
+        self.mods = tuple(mods)
+        self.positions = {mod["uniqueName"]: position for position, mod in enumerate(self.mods)}
+        self.full_mask = (1 << len(self.mods)) - 1
+        self.type_masks = {}
+        for position, mod in enumerate(self.mods):
+            self.type_masks[mod["type"]] = self.type_masks.get(mod["type"], 0) | 1 << position
+        self.stat_masks = {
+            stat: sum(1 << position for position, mod in enumerate(self.mods) if mod[stat] != 0.0 or mod["type"] == 1)
+            for stat in goal_stats
+        }
+        self.max_views = max_views
+        self.views = {}
+
+    def __len__(self):
+        return len(self.mods)
+
+    def __iter__(self):
+        return iter(self.mods)
+
+    def __getitem__(self, position):
+        return self.mods[position]
+
+    def bit(self, mod):
+        """
+        Returns the bit of a mod, 0 if it is not in the database.
+        """
+        position = self.positions.get(mod["uniqueName"])
+        return 0 if position is None else 1 << position
+
+    def mask(self, mods):
+        """
+        Returns the bitmask of a list of mods.
+        """
+        mask = 0
+        for mod in mods:
+            mask |= self.bit(mod)
+        return mask
+
+    def view(self, mask):
+        """
+        Returns the mods of a bitmask, in database order.
+
+        Parameters:
+        - mask (int): The bitmask of the mods.
+
+        Returns:
+        - mods (tuple): The mods, shared with every other view of the same bitmask.
+        """
+        mods = self.views.get(mask)
+        if mods is None:
+            if len(self.views) >= self.max_views:
+                self.views.clear()
+            mods = tuple(mod for position, mod in enumerate(self.mods) if mask >> position & 1)
+            self.views[mask] = mods
+        return mods
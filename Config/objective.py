@@ -0,0 +1,136 @@
+import numpy as np
+
+
+class Objective:
+    """
+    The objective every engine scores builds with, compiled once into NumPy arrays.
+
+    Stats are first clamped to their in-game caps and floors. The distance is the weighted shortfall of the hard
+    goal stats, and a build reaches the goals when it is zero. The penalty is the weighted shortfall of the soft goal
+    stats plus the weighted overshoot of the goal stats, and only ranks builds reaching the same distance. Both are
+    computed for a whole matrix of stat vectors in one call.
+
+    With stat offsets, such as the archon shard combinations, every stat vector is scored once per offset added to
+    it and keeps the score of its best offset, the lowest distance and then the lowest penalty, so the mods and the
+    offsets are chosen together in a single evaluation.
+
+    Attributes:
+    - stats (list): The stat names, in the column order of the stat vectors.
+    - base (np.ndarray): The base stats, the stat vector of a build without mods.
+    - targets (np.ndarray): The goal of each stat, 0 for stats without a goal.
+    - hard_weights (np.ndarray): The weight of the shortfall of each hard goal stat, 0 for the other stats.
+    - soft_weights (np.ndarray): The weight of the shortfall of each soft goal stat, 0 for the other stats.
+    - overshoot_weights (np.ndarray): The weight of the overshoot of each goal stat, 0 for the other stats.
+    - floors (np.ndarray): The lowest effective value of each stat.
+    - caps (np.ndarray): The highest effective value of each stat.
+    - offsets (np.ndarray): The stat offsets to choose from, one per row, or None to score the stats as they are.
+    - offset_names (list): The name of each offset.
+    """
+
+    def __init__(self, stats, goal_stats, base_stats, weights=None, caps=None, floors=None, overshoot=None, soft=(), offsets=None, offset_names=()):
+        """
+        Compiles an objective spec.
+
+        Parameters:
+        - stats (list): The stat names, in the column order of the stat vectors.
+        - goal_stats (dict): The stats we want to achieve.
+        - base_stats (dict): The stats of the frame without mods.
+        - weights (dict): The weight of the shortfall of goal stats, 1 when missing.
+        - caps (dict): The highest effective value of stats, bonuses above it being wasted.
+        - floors (dict): The lowest effective value of stats.
+        - overshoot (dict): The weight of each goal stat going above its goal, 0 when missing.
+        - soft (list): The goal stats that only weigh on the penalty instead of having to be reached.
+        - offsets (np.ndarray): The stat offsets to choose from, one per row, or None.
+        - offset_names (list): The name of each offset.
+
+        Raises:
+        - ValueError: if the spec names stats that are not in stats, or weighs the overshoot of stats without goal.
+        """
+        weights, caps, floors, overshoot = weights or {}, caps or {}, floors or {}, overshoot or {}
+        self.stats = list(stats)
+        unknown = [stat for spec in [goal_stats, weights, caps, floors, overshoot, soft] for stat in spec if stat not in self.stats]
+        if unknown:
+            raise ValueError(f"Unknown stats in the objective: {unknown}")
+        if any(stat not in goal_stats for spec in [weights, overshoot, soft] for stat in spec):
+            raise ValueError("Weights, overshoot weights and soft goals only apply to goal stats")
+
+        self.base = np.array([base_stats.get(stat, 0.0) for stat in self.stats], dtype=np.float64)
+        self.targets = np.array([goal_stats.get(stat, 0.0) for stat in self.stats], dtype=np.float64)
+        goal_weights = np.array([weights.get(stat, 1.0) if stat in goal_stats else 0.0 for stat in self.stats], dtype=np.float64)
+        soft_mask = np.array([stat in soft for stat in self.stats], dtype=bool)
+        self.hard_weights = np.where(soft_mask, 0.0, goal_weights)
+        self.soft_weights = np.where(soft_mask, goal_weights, 0.0)
+        self.overshoot_weights = np.array([overshoot.get(stat, 0.0) for stat in self.stats], dtype=np.float64)
+        self.floors = np.array([floors.get(stat, -np.inf) for stat in self.stats], dtype=np.float64)
+        self.caps = np.array([caps.get(stat, np.inf) for stat in self.stats], dtype=np.float64)
+        self.offsets = None if offsets is None else np.asarray(offsets, dtype=np.float64)
+        self.offset_names = list(offset_names)
+        if self.offsets is not None and not self.overshoot_weights.any():
+            # Without overshoot weights more stats never score worse, so offsets below another one are never chosen
+            dominated = ((self.offsets[:, None, :] <= self.offsets[None, :, :]).all(axis=2)
+                         & (self.offsets[:, None, :] < self.offsets[None, :, :]).any(axis=2)).any(axis=1)
+            self.offset_names = [name for name, removed in zip(self.offset_names, dominated) if not removed]
+            self.offsets = self.offsets[~dominated]
+
+    def evaluate(self, stats):
+        """
+        Scores stat vectors.
+
+        Parameters:
+        - stats (np.ndarray): A stat vector, or a matrix with one stat vector per row.
+
+        Returns:
+        - distance (np.ndarray): The distance of each vector to the hard goals.
+        - penalty (np.ndarray): The penalty of each vector.
+        """
+        if self.offsets is None:
+            return self.score(stats)
+        distance, penalty = self.score(np.asarray(stats)[..., None, :] + self.offsets)
+        best = self.best_offsets(distance, penalty)[..., None]
+        return np.take_along_axis(distance, best, -1)[..., 0], np.take_along_axis(penalty, best, -1)[..., 0]
+
+    def score(self, stats):
+        """
+        Scores stat vectors as they are, without offsets.
+        """
+        effective = np.clip(stats, self.floors, self.caps)
+        shortfall = np.maximum(0.0, self.targets - effective)
+        overshoot = np.maximum(0.0, effective - self.targets)
+        return shortfall @ self.hard_weights, shortfall @ self.soft_weights + overshoot @ self.overshoot_weights
+
+    def best_offsets(self, distance, penalty):
+        """
+        Returns the index of the best offset of each stat vector from their scores with every offset, in the last axis.
+        """
+        lowest = distance.min(axis=-1, keepdims=True)
+        return np.argmin(np.where(distance <= lowest, penalty, np.inf), axis=-1)
+
+    def best_offset(self, stats):
+        """
+        Returns the index of the best offset of a stat vector, None without offsets.
+        """
+        if self.offsets is None:
+            return None
+        return int(self.best_offsets(*self.score(np.asarray(stats) + self.offsets)))
+
+    def best_offset_name(self, stats):
+        """
+        Returns the name of the best offset of a stat vector, None without offsets.
+        """
+        best = self.best_offset(stats)
+        return None if best is None else self.offset_names[best]
+
+    def offset_stats(self, stats):
+        """
+        Returns a stat vector with its best offset added.
+        """
+        best = self.best_offset(stats)
+        return stats if best is None else stats + self.offsets[best]
+
+    def unmet(self, stats):
+        """
+        Returns the names of the goal stats a stat vector does not reach yet, hard or soft, with its best offset.
+        """
+        stats = self.offset_stats(stats)
+        shortfall = (self.targets - np.clip(stats, self.floors, self.caps)) * (self.hard_weights + self.soft_weights)
+        return [self.stats[column] for column in np.flatnonzero(shortfall > 0)]
@@ -0,0 +1,141 @@
+from types import SimpleNamespace
+
+from . import dominance, inventory
+from .modpool import ModPool
+from .objective import Objective
+from .shards import shard_combinations
+
+# Request fields that can override the configuration, with the configuration value they replace
+REQUEST_FIELDS = {
+    "goal_stats": "GOAL_STATS",
+    "base_stats": "BASE_STATS",
+    "polarities": "POLARITIES",
+    "max_capacity": "MAX_CAPACITY",
+    "max_mods": "MAX_MODS",
+    "aura_slot_free": "AURA_SLOT_FREE",
+    "exilus_slot_free": "EXILUS_SLOT_FREE",
+    "goal_weights": "GOAL_WEIGHTS",
+    "soft_goals": "SOFT_GOALS",
+    "overshoot_weights": "OVERSHOOT_WEIGHTS",
+    "stat_caps": "STAT_CAPS",
+    "stat_floors": "STAT_FLOORS",
+    "archon_shard_slots": "ARCHON_SHARD_SLOTS",
+    "inventory": "INVENTORY",
+    "required_mods": "REQUIRED_MODS",
+    "forbidden_mods": "FORBIDDEN_MODS",
+}
+
+
+def derive(base, **overrides):
+    """
+    Returns a copy of a configuration with some values replaced and the values depending on them recomputed.
+
+    Args:
+        base: The configuration module or object to copy.
+        **overrides: The configuration values to replace, such as GOAL_STATS or MAX_CAPACITY.
+
+    Returns:
+        SimpleNamespace: The derived configuration, usable wherever the config module is.
+    """
+    settings = {name: getattr(base, name) for name in dir(base) if name.isupper()}
+    settings.update(overrides)
+    config = SimpleNamespace(**settings)
+    config.POLARITY_NUMBER = sum(config.POLARITIES[0].values())
+    config.SELECTED_MODS, config.PRUNED_MODS = dominance.select_mods(config.LOADED_MODS, config.GOAL_STATS, config.UNIQUE_MOD_NAMES,
+                                                                      config.STAT_SCALING_SETS, config.OVERSHOOT_WEIGHTS,
+                                                                      config.PRUNE_DOMINATED_MODS, config.MAX_MODS)
+    config.MOD_POOL = ModPool(config.SELECTED_MODS, config.GOAL_STATS)
+    config.MOD_DATABASE = config.MOD_POOL.mods
+    config.MIN_GOAL_STATS = {stat: max(config.GOAL_STATS[stat], config.BASE_STATS[stat]) for stat in config.GOAL_STATS}
+    config.SHARD_COMBINATIONS, config.SHARD_OFFSETS = shard_combinations(config.ARCHON_SHARD_OPTIONS, list(config.MOD_MATRIX.stat_columns),
+                                                                         config.ARCHON_SHARD_SLOTS)
+    config.OBJECTIVE = Objective(list(config.MOD_MATRIX.stat_columns), config.GOAL_STATS, config.BASE_STATS, config.GOAL_WEIGHTS,
+                                 config.STAT_CAPS, config.STAT_FLOORS, config.OVERSHOOT_WEIGHTS, config.SOFT_GOALS,
+                                 config.SHARD_OFFSETS, config.SHARD_COMBINATIONS)
+    return config
+
+
+def parse_request(base, request):
+    """
+    Validates the fields of a JSON request and returns the configuration values they replace.
+
+    Args:
+        base: The configuration the request fields are applied to.
+        request (dict): The request, with any of the REQUEST_FIELDS keys.
+
+    Returns:
+        dict: The configuration values to replace, as accepted by derive.
+
+    Raises:
+        ValueError: If the request has unknown fields or invalid values.
+    """
+    unknown = [field for field in request if field not in REQUEST_FIELDS and field != "engine"]
+    if unknown:
+        raise ValueError(f"Unknown request fields: {unknown}")
+
+    overrides = {}
+    for field, name in REQUEST_FIELDS.items():
+        if field in request:
+            overrides[name] = request[field]
+
+    for name in ["GOAL_STATS", "BASE_STATS", "GOAL_WEIGHTS", "OVERSHOOT_WEIGHTS", "STAT_CAPS", "STAT_FLOORS"]:
+        if name in overrides:
+            stats = overrides[name]
+            if not isinstance(stats, dict) or any(stat not in base.BASE_STATS for stat in stats):
+                raise ValueError(f"{name} must map stats among {list(base.BASE_STATS)} to numbers")
+            overrides[name] = {stat: float(value) for stat, value in stats.items()}
+    if "SOFT_GOALS" in overrides:
+        if not isinstance(overrides["SOFT_GOALS"], list) or any(stat not in base.BASE_STATS for stat in overrides["SOFT_GOALS"]):
+            raise ValueError(f"SOFT_GOALS must list stats among {list(base.BASE_STATS)}")
+    if "BASE_STATS" in overrides:
+        overrides["BASE_STATS"] = {**base.BASE_STATS, **overrides["BASE_STATS"]}
+
+    if "POLARITIES" in overrides:
+        polarities = {int(slot_type): counts for slot_type, counts in overrides["POLARITIES"].items()}
+        if sorted(polarities) != sorted(base.POLARITIES):
+            raise ValueError(f"POLARITIES must have the slot types {sorted(base.POLARITIES)}")
+        for slot_type, counts in polarities.items():
+            if any(polarity not in base.POLARITIES[slot_type] or int(count) < 0 for polarity, count in counts.items()):
+                raise ValueError(f"Invalid polarities for slot type {slot_type}: {counts}")
+            polarities[slot_type] = {polarity: int(counts.get(polarity, 0)) for polarity in base.POLARITIES[slot_type]}
+        overrides["POLARITIES"] = polarities
+
+    for name in ["MAX_CAPACITY", "MAX_MODS", "ARCHON_SHARD_SLOTS"]:
+        if name in overrides:
+            overrides[name] = int(overrides[name])
+            if overrides[name] < 0:
+                raise ValueError(f"{name} must not be negative")
+    for name in ["AURA_SLOT_FREE", "EXILUS_SLOT_FREE"]:
+        if name in overrides:
+            overrides[name] = bool(overrides[name])
+
+    if "INVENTORY" in overrides:
+        owned = overrides["INVENTORY"]
+        if isinstance(owned, list):
+            owned = {name: None for name in owned}
+        if not isinstance(owned, dict) or any(rank is not None and (not isinstance(rank, int) or isinstance(rank, bool)) for rank in owned.values()):
+            raise ValueError("INVENTORY must list mod names or map them to ranks")
+        overrides["INVENTORY"] = owned
+    for name in ["REQUIRED_MODS", "FORBIDDEN_MODS"]:
+        if name in overrides:
+            if not isinstance(overrides[name], list) or not all(isinstance(mod, str) for mod in overrides[name]):
+                raise ValueError(f"{name} must list mod names")
+    return overrides
+
+
+def from_request(base, request):
+    """
+    Returns the configuration of a JSON request, validating its fields. Its inventory, required and forbidden
+    mods are applied to it, so it only searches the mods they leave.
+
+    Args:
+        base: The configuration the request fields are applied to.
+        request (dict): The request, with any of the REQUEST_FIELDS keys.
+
+    Returns:
+        SimpleNamespace: The configuration of the request.
+
+    Raises:
+        ValueError: If the request has unknown fields or invalid values, including an invalid objective or inventory.
+    """
+    return inventory.apply(derive(base, **parse_request(base, request)))
@@ -0,0 +1,55 @@
+import itertools
+
+import numpy as np
+
+
+def shard_table(options, stats):
+    """
+    Returns the contribution matrix of the archon shard options.
+
+    Args:
+        options (dict): The stat bonuses of each shard option, keyed by option name.
+        stats (list): The stat names, in the column order of the stat vectors.
+
+    Returns:
+        tuple: The option names and a matrix with the stat vector of each option, one row per option.
+
+    Raises:
+        ValueError: If an option gives a stat that is not in stats.
+    """
+    names = list(options)
+    table = np.zeros((len(names), len(stats)), dtype=np.float64)
+    for row, name in enumerate(names):
+        for stat, value in options[name].items():
+            if stat not in stats:
+                raise ValueError(f"Unknown stat {stat} in archon shard option {name}")
+            table[row, stats.index(stat)] = value
+    return names, table
+
+
+def shard_combinations(options, stats, slots):
+    """
+    Enumerates the distinct ways of filling the archon shard slots, as stat offsets added to the base stats.
+
+    Shards are interchangeable between slots, so combinations are enumerated as multisets of options, and
+    combinations adding the same stats are kept once.
+
+    Args:
+        options (dict): The stat bonuses of each shard option, keyed by option name.
+        stats (list): The stat names, in the column order of the stat vectors.
+        slots (int): The number of shard slots, some of which may stay empty.
+
+    Returns:
+        tuple: The option names of each combination and a matrix with its stat offset, one row per combination,
+        or ([], None) without slots or options.
+    """
+    if slots <= 0 or not options:
+        return [], None
+    names, table = shard_table(options, stats)
+    combinations = {}
+    for count in range(slots + 1):
+        for combination in itertools.combinations_with_replacement(range(len(names)), count):
+            offset = table[list(combination)].sum(axis=0)
+            combinations.setdefault(tuple(np.round(offset, 9)), (tuple(names[row] for row in combination), offset))
+    combinations = list(combinations.values())
+    return [names for names, _ in combinations], np.array([offset for _, offset in combinations])
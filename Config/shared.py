@@ -0,0 +1,104 @@
+import os
+import tempfile
+
+import numpy as np
+
+# Byte alignment of every array in the file
+ALIGNMENT = 64
+
+
+class SharedArrays:
+    """
+    NumPy arrays written once to a memory-mapped file, which other processes attach to by name without copying.
+
+    The creating process owns the file and removes it on release. Attached processes map the same pages read-only,
+    so attaching costs the same whatever the size of the arrays, and the handle sent to them is a path and a short
+    list of fields.
+
+    Attributes:
+    - path (str): The path of the file, the name processes attach by.
+    - fields (list): The (name, dtype, shape, offset) of every array in the file.
+    - owner (bool): Whether this process created the file and removes it on release.
+    - arrays (dict): The read-only arrays, keyed by name.
+    """
+
+    def __init__(self, path, fields, owner=False):
+        """
+        Maps the arrays of a file, use create or attach instead.
+
+        Parameters:
+        - path (str): The path of the file.
+        - fields (list): The (name, dtype, shape, offset) of every array in the file.
+        - owner (bool): Whether this process created the file.
+        """
+        self.path = path
+        self.fields = fields
+        self.owner = owner
+        self.arrays = {}
+        for name, dtype, shape, offset in fields:
+            if np.prod(shape, dtype=np.int64) == 0:
+                self.arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                self.arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=tuple(shape))
+
+    @classmethod
+    def create(cls, arrays, directory=None):
+        """
+        Writes arrays to a new memory-mapped file.
+
+        Parameters:
+        - arrays (dict): The arrays to share, keyed by name.
+        - directory (str): The directory of the file, the temporary directory by default.
+
+        Returns:
+        - shared (SharedArrays): The shared arrays, owned by this process.
+        """
+        descriptor, path = tempfile.mkstemp(prefix="shared-", suffix=".bin", dir=directory)
+        fields = []
+        offset = 0
+        with os.fdopen(descriptor, "wb") as file:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                padding = -offset % ALIGNMENT
+                file.write(b"\0" * padding)
+                offset += padding
+                file.write(array.tobytes())
+                fields.append((name, array.dtype.str, array.shape, offset))
+                offset += array.nbytes
+        return cls(path, fields, owner=True)
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Maps the arrays created by another process.
+
+        Parameters:
+        - handle (tuple): The handle of the shared arrays.
+
+        Returns:
+        - shared (SharedArrays): The shared arrays, not owned by this process.
+        """
+        path, fields = handle
+        return cls(path, fields)
+
+    @property
+    def handle(self):
+        """
+        The picklable handle other processes attach with.
+        """
+        return self.path, self.fields
+
+    def release(self):
+        """
+        Unmaps the arrays, and removes the file if this process owns it.
+        """
+        self.arrays = {}
+        if self.owner and os.path.exists(self.path):
+            os.remove(self.path)
+        self.owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.release()
@@ -0,0 +1,171 @@
+import numbers
+import os
+import threading
+import time
+
+from . import loader, request
+from .modmatrix import ModMatrix
+
+# Keys every processed mod must have, along with the stat keys
+MOD_KEYS = ["id", "name", "uniqueName", "type", "polarity", "actualDrain"]
+
+
+def validate(mods):
+    """
+    Checks that processed mods form a usable mod database.
+
+    Parameters:
+    - mods (list): The processed mods.
+
+    Raises:
+    - ValueError: if there are no mods, a mod misses a key or has an invalid value, or two mods share a unique name.
+    """
+    if not mods:
+        raise ValueError("The mod database is empty")
+    names = set()
+    for position, mod in enumerate(mods):
+        missing = [key for key in MOD_KEYS + loader.STAT_KEYS if key not in mod]
+        if missing:
+            raise ValueError(f"Mod {mod.get('name', position)} misses {missing}")
+        if mod["id"] != position or mod["type"] not in (0, 1, 2):
+            raise ValueError(f"Mod {mod['name']} has an invalid id or type")
+        if not all(isinstance(mod[key], numbers.Real) for key in loader.STAT_KEYS + ["actualDrain"]):
+            raise ValueError(f"Mod {mod['name']} has non-numeric stats or drain")
+        if mod["uniqueName"] in names:
+            raise ValueError(f"Mod {mod['uniqueName']} is duplicated")
+        names.add(mod["uniqueName"])
+
+
+class Snapshot:
+    """
+    An immutable version of the mod database, along with the configuration precomputed from it.
+
+    A solve uses the configuration of the snapshot current when it starts until it ends, so replacing the current
+    snapshot never changes the mods under a running solve. Everything built from a snapshot configuration, such as
+    its mod pool views, fitness caches, stored builds and request fingerprints, is keyed by its version.
+
+    Attributes:
+    - version (str): The version of the mods, a hash of their content.
+    - mods (tuple): The processed mods.
+    - config: The configuration using these mods, derived from the base configuration.
+    - loaded (float): The time the snapshot was loaded at.
+    """
+
+    def __init__(self, base, mods, matrix=None, version=None):
+        """
+        Freezes a mod database and derives its configuration.
+
+        Parameters:
+        - base: the configuration the snapshot configuration is derived from.
+        - mods (list): The processed mods.
+        - matrix (ModMatrix): The mod matrix of the mods, computed when missing.
+        - version (str): The version of the mods, computed when missing.
+        """
+        self.mods = tuple(mods)
+        self.version = version or loader.get_version(mods)
+        if matrix is None:
+            matrix = ModMatrix(mods, base.POLARITIES[0], loader.STAT_KEYS, base.STAT_SCALING_SETS, base.UNIQUE_MOD_NAMES)
+        self.config = request.derive(base, LOADED_MODS=list(self.mods), MOD_DATABASE_VERSION=self.version, MOD_MATRIX=matrix)
+        self.loaded = time.time()
+
+
+class SnapshotManager:
+    """
+    Publishes the current snapshot of the mods file and reloads it in the background when the file changes.
+
+    A changed file is only published once it loads and validates, and publishing is a single reference swap, so a
+    broken or half-written file keeps the previous snapshot in use.
+
+    Attributes:
+    - base: the configuration snapshots are derived from.
+    - path (str): The path of the mods file.
+    - interval (float): The seconds between two checks of the file.
+    - current (Snapshot): The snapshot new solves use.
+    - signature (tuple): The modification time and size of the file when last checked.
+    - error (str): The reason the last changed file was not published, None if it was.
+    """
+
+    def __init__(self, base, path=None, interval=None):
+        """
+        Publishes the mods already loaded by the base configuration as the first snapshot.
+
+        Parameters:
+        - base: the configuration snapshots are derived from.
+        - path (str): The path of the mods file, MODS_PATH by default.
+        - interval (float): The seconds between two checks of the file, SNAPSHOT_RELOAD_INTERVAL by default.
+        """
+        self.base = base
+        self.path = path or base.MODS_PATH
+        self.interval = interval if interval is not None else base.SNAPSHOT_RELOAD_INTERVAL
+        self.current = Snapshot(base, base.LOADED_MODS, base.MOD_MATRIX, base.MOD_DATABASE_VERSION)
+        self.signature = self.file_signature()
+        self.error = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def file_signature(self):
+        """
+        Returns the modification time and size of the mods file, None if it is missing.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """
+        Reloads the mods file if it changed since the last check.
+
+        Returns:
+        - published (bool): Whether a new snapshot was published.
+        """
+        signature = self.file_signature()
+        if signature is None or signature == self.signature:
+            return False
+        self.signature = signature
+        return self.reload()
+
+    def reload(self):
+        """
+        Loads and validates the mods file, and publishes it if its version is new.
+
+        Returns:
+        - published (bool): Whether a new snapshot was published.
+        """
+        try:
+            mods = loader.get_mods(self.path)
+            validate(mods)
+        except Exception as error:
+            self.error = f"{type(error).__name__}: {error}"
+            return False
+        self.error = None
+        if loader.get_version(mods) == self.current.version:
+            return False
+        self.current = Snapshot(self.base, mods)
+        return True
+
+    def start(self):
+        """
+        Starts checking the mods file in a background thread.
+        """
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.watch, daemon=True)
+            self.thread.start()
+
+    def watch(self):
+        """
+        Checks the mods file every interval until stopped.
+        """
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        """
+        Stops the background thread.
+        """
+        if self.thread is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,251 @@
+import argparse
+
+from Config import request
+from Genetic.genetics import GeneticAlgorithm
+
+
+class FormaSearch:
+    """
+    Searches where to put forma, jointly with the mods, so the goal stats fit within the capacity.
+
+    Mod sets reaching the goal stats do not depend on the polarities, only their capacity does. The search
+    collects such sets once with the genetic algorithm, then walks the layouts reachable with one more forma at a
+    time, costing every collected set on each layout through the shared capacity model of the config. The cost of a set only
+    depends on the slots matching its own polarities, so it is memoized on that projection of the layout and reused
+    by every layout differing in other slots. A new inner solve only runs when no collected set fits any layout
+    of a forma count.
+
+    Attributes:
+    - config: the configuration object, whose POLARITIES are the polarities the frame already has.
+    - max_forma: the maximum number of forma to use.
+    - beam_width: the number of layouts expanded for each forma count.
+    - candidates: the mod sets reaching the goal stats, keyed by canonical genome.
+    - cost_cache: the memoized capacity of mod sets, keyed by genome and layout projection.
+    """
+
+    def __init__(self, config=None, max_forma=None, beam_width=8):
+        """
+        Initializes the search.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        - max_forma: the maximum number of forma to use, config.MAX_FORMA by default.
+        - beam_width: the number of layouts expanded for each forma count.
+        """
+        self.config = config
+        self.max_forma = config.MAX_FORMA if max_forma is None else max_forma
+        self.beam_width = beam_width
+        self.polarity_names = list(config.POLARITIES[0])
+        self.candidates = {}
+        self.cost_cache = {}
+        self.cost_lookups = 0
+        self.inner_solves = 0
+
+    def layout_key(self, layout):
+        """
+        Returns a hashable key of a layout.
+        """
+        return tuple((slot_type, tuple(sorted(layout[slot_type].items()))) for slot_type in sorted(layout))
+
+    def forma_count(self, layout):
+        """
+        Returns the number of forma needed to turn the polarities of the frame into a layout.
+
+        Args:
+        - layout: the target polarities, in the POLARITIES format.
+
+        Returns:
+        - The number of slots whose polarity must change.
+        """
+        base = self.config.POLARITIES
+        kept = sum(min(base[0][polarity], layout[0][polarity]) for polarity in self.polarity_names)
+        kept += min(self.config.MAX_MODS - sum(base[0].values()), self.config.MAX_MODS - sum(layout[0].values()))
+        forma = self.config.MAX_MODS - kept
+        for slot_type in [1, 2]:
+            if any(layout[slot_type][polarity] and not base[slot_type][polarity] for polarity in self.polarity_names):
+                forma += 1
+        return forma
+
+    def neighbors(self, layout):
+        """
+        Returns the layouts that differ from a layout by the polarity of one slot.
+
+        Args:
+        - layout: the layout to change.
+
+        Returns:
+        - A list of layouts.
+        """
+        layouts = []
+        neutral = self.config.MAX_MODS - sum(layout[0].values())
+        sources = [polarity for polarity in self.polarity_names if layout[0][polarity]] + ([None] if neutral else [])
+        for source in sources:
+            for target in self.polarity_names:
+                if target == source:
+                    continue
+                changed = {slot_type: layout[slot_type].copy() for slot_type in layout}
+                if source:
+                    changed[0][source] -= 1
+                changed[0][target] += 1
+                layouts.append(changed)
+
+        for slot_type, free in [(1, self.config.AURA_SLOT_FREE), (2, self.config.EXILUS_SLOT_FREE)]:
+            if not free:
+                continue
+            for target in self.polarity_names:
+                if layout[slot_type][target]:
+                    continue
+                changed = {slot_type: layout[slot_type].copy() for slot_type in layout}
+                changed[slot_type] = {polarity: int(polarity == target) for polarity in self.polarity_names}
+                layouts.append(changed)
+        return layouts
+
+    def set_capacity(self, genome, mods, layout):
+        """
+        Calculates the capacity used by a mod set on a layout with the capacity model of the config.
+
+        Args:
+        - genome: the canonical genome of the mod set.
+        - mods: the mods of the set.
+        - layout: the polarities of the slots.
+
+        Returns:
+        - The capacity used by the mod set.
+        """
+        standard = [mod for mod in mods if mod["type"] == 0]
+        used_polarities = sorted({mod["polarity"] for mod in standard if mod["polarity"] in layout[0]})
+        aura = next((mod for mod in mods if mod["type"] == 1), None)
+        exilus = next((mod for mod in mods if mod["type"] == 2), None)
+        aura_polarity = next((polarity for polarity in layout[1] if layout[1][polarity]), None)
+        exilus_polarity = next((polarity for polarity in layout[2] if layout[2][polarity]), None)
+        neutral = self.config.MAX_MODS - sum(layout[0].values())
+
+        # The cost only depends on the slots the mods of the set can match, and on whether the aura and exilus
+        # slots are unpolarized, matching or mismatching
+        key = (genome, tuple(layout[0][polarity] for polarity in used_polarities), neutral,
+               None if aura is None or aura_polarity is None else aura["polarity"] == aura_polarity,
+               None if exilus is None or exilus_polarity is None else exilus["polarity"] == exilus_polarity)
+        self.cost_lookups += 1
+        if key in self.cost_cache:
+            return self.cost_cache[key]
+
+        capacity = self.config.MOD_MATRIX.capacity(mods, layout, self.config.MAX_MODS)
+        self.cost_cache[key] = capacity
+        return capacity
+
+    def rank(self, layouts):
+        """
+        Ranks layouts by the capacity of the best collected mod set on each.
+
+        Args:
+        - layouts: the layouts to rank.
+
+        Returns:
+        - A list of (capacity, layout, mods) entries, from the lowest capacity to the highest.
+        """
+        ranked = []
+        for layout in layouts:
+            capacity, mods = self.evaluate(layout)
+            ranked.append((capacity, layout, mods))
+        return sorted(ranked, key=lambda entry: entry[0])
+
+    def evaluate(self, layout):
+        """
+        Finds the collected mod set using the least capacity on a layout.
+
+        Args:
+        - layout: the polarities of the slots.
+
+        Returns:
+        - The capacity and the mods of the best set, or (None, None) without candidates.
+        """
+        best_capacity, best_mods = None, None
+        for genome, mods in self.candidates.items():
+            capacity = self.set_capacity(genome, mods, layout)
+            if best_capacity is None or capacity < best_capacity:
+                best_capacity, best_mods = capacity, mods
+        return best_capacity, best_mods
+
+    def collect(self, layout, max_capacity):
+        """
+        Runs the genetic algorithm once on a layout and keeps the mod sets it solved.
+
+        Args:
+        - layout: the polarities of the slots.
+        - max_capacity: the capacity limit of the inner solve.
+        """
+        self.inner_solves += 1
+        inner_config = request.derive(self.config, POLARITIES=layout, MAX_CAPACITY=max_capacity)
+        genetic_algorithm = GeneticAlgorithm(inner_config, seeds=list(self.candidates.values()))
+        genetic_algorithm.run_genetic_algorithm()
+        for build in genetic_algorithm.best_builds:
+            self.candidates.setdefault(build.genome(), tuple(build.mods))
+
+    def search(self):
+        """
+        Searches the layout with the fewest forma where a build reaches the goal stats within the capacity.
+
+        Returns:
+        - The forma count, the layout, the capacity and the mods of the best build found, or None if no layout
+          within the forma limit works.
+        """
+        base = {slot_type: self.config.POLARITIES[slot_type].copy() for slot_type in self.config.POLARITIES}
+
+        # Mod sets reaching the goals regardless of capacity are the candidates for every layout
+        for _ in range(self.config.FORMA_COLLECT_ATTEMPTS):
+            self.collect(base, self.config.MAX_CAPACITY * 10)
+            if self.candidates:
+                break
+        if not self.candidates:
+            return None
+
+        frontier = [base]
+        visited = {self.layout_key(base)}
+        for forma in range(self.max_forma + 1):
+            ranked = self.rank(frontier)
+            if ranked and ranked[0][0] > self.config.MAX_CAPACITY:
+                # No known set fits, solve the most promising layout with the real capacity limit
+                self.collect(ranked[0][1], self.config.MAX_CAPACITY)
+                ranked = self.rank(frontier)
+
+            if ranked and ranked[0][0] <= self.config.MAX_CAPACITY:
+                capacity, layout, mods = ranked[0]
+                return forma, layout, capacity, mods
+
+            frontier = []
+            for _, layout, _ in ranked[:self.beam_width]:
+                for neighbor in self.neighbors(layout):
+                    key = self.layout_key(neighbor)
+                    if key not in visited and self.forma_count(neighbor) == forma + 1:
+                        visited.add(key)
+                        frontier.append(neighbor)
+        return None
+
+    def optimize_layout(self):
+        """
+        Searches the best layout and prints it along with its build.
+        """
+        result = self.search()
+        print(f"Evaluated {self.cost_lookups} layout costs, {len(self.cost_cache)} computed, {self.inner_solves} inner solves")
+        if not result:
+            print(f"No layout with up to {self.max_forma} forma reaches the goal stats within the capacity.")
+            return None
+
+        forma, layout, capacity, mods = result
+        print(f"Forma needed: {forma}")
+        for slot_type, name in [(1, "Aura"), (2, "Exilus"), (0, "Standard")]:
+            polarities = [f"{polarity} x{count}" for polarity, count in layout[slot_type].items() if count]
+            print(f"  {name} slot polarities: {', '.join(polarities) if polarities else 'none'}")
+        print(f"Mods: {[mod['name'] for mod in mods]}")
+        print(f"Used Capacity: {capacity}")
+        return result
+
+
+if __name__ == "__main__":
+    from Config import config, inventory
+
+    parser = argparse.ArgumentParser(description="Searches where to put forma so the goal stats fit within the capacity.")
+    parser.add_argument("--max-forma", type=int, default=None, help="maximum number of forma, config.MAX_FORMA by default")
+    parser.add_argument("--beam-width", type=int, default=8)
+    arguments = parser.parse_args()
+    FormaSearch(inventory.apply(config), arguments.max_forma, arguments.beam_width).optimize_layout()
@@ -0,0 +1,94 @@
+import heapq
+
+
+class EliteArchive:
+    """
+    A bounded archive of the distinct solved builds found by the genetic algorithm.
+
+    Builds are indexed by their canonical genome, so two builds holding the same mods in a different order are
+    stored only once and lookups are O(1). A heap ordered by (used mods, used capacity) keeps the worst stored
+    build on top, which is evicted whenever a better build arrives and the archive is full.
+
+    Attributes:
+    - size (int): The maximum number of builds kept.
+    - builds (dict): The stored builds, keyed by their canonical genome.
+    - heap (list): A max-heap of (-used mods, -used capacity, -insertion order, genome) entries.
+    - additions (int): The number of distinct builds accepted since the archive was created.
+    - minimum_used_mods (int): The lowest number of mods used by any stored build.
+    """
+
+    def __init__(self, size=256):
+        """
+        Initializes an empty archive.
+
+        Parameters:
+        - size (int): The maximum number of builds kept.
+        """
+        self.size = size
+        self.builds = {}
+        self.heap = []
+        self.additions = 0
+        self.minimum_used_mods = None
+
+    def __len__(self):
+        return len(self.builds)
+
+    def __iter__(self):
+        return iter(self.builds.values())
+
+    def __contains__(self, build):
+        return build.genome() in self.builds
+
+    def rank(self, build):
+        """
+        Returns the key used to order builds, lower is better.
+
+        Parameters:
+        - build (Build): The build to rank.
+
+        Returns:
+        - rank (tuple): The number of used mods and the used capacity of the build.
+        """
+        return build.total_used_mods, build.used_capacity
+
+    def add(self, build):
+        """
+        Stores a build if it is not already archived and it is better than the worst stored build when full.
+
+        Parameters:
+        - build (Build): The build to store.
+
+        Returns:
+        - added (bool): Whether the build was stored.
+        """
+        genome = build.genome()
+        if genome in self.builds:
+            return False
+
+        used_mods, used_capacity = self.rank(build)
+        entry = (-used_mods, -used_capacity, -self.additions, genome)
+        if len(self.builds) >= self.size:
+            worst = self.heap[0]
+            if (-worst[0], -worst[1]) <= (used_mods, used_capacity):
+                return False
+            del self.builds[heapq.heapreplace(self.heap, entry)[3]]
+        else:
+            heapq.heappush(self.heap, entry)
+
+        self.builds[genome] = build
+        self.additions += 1
+        if self.minimum_used_mods is None or used_mods < self.minimum_used_mods:
+            self.minimum_used_mods = used_mods
+        return True
+
+    def top(self, count):
+        """
+        Returns the best stored builds.
+
+        Parameters:
+        - count (int): The number of builds to return.
+
+        Returns:
+        - builds (list): Up to count builds, sorted from best to worst.
+        """
+        return heapq.nsmallest(count, self.builds.values(), key=self.rank)
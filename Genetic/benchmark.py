@@ -0,0 +1,78 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from .genetics import GeneticAlgorithm
+
+
+class GCTimer:
+    """
+    Measures the time spent in garbage collections through the gc callbacks.
+
+    Attributes:
+    - seconds (float): The time spent collecting.
+    - collections (int): The number of collections.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.collections = 0
+        self.started = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.started = time.perf_counter()
+        elif self.started is not None:
+            self.seconds += time.perf_counter() - self.started
+            self.collections += 1
+            self.started = None
+
+
+def run(config, runs=5, seed=0):
+    """
+    Runs the genetic algorithm several times with fixed seeds and measures its time, peak memory and garbage
+    collection time.
+
+    Args:
+    - config: a configuration object with the build parameters.
+    - runs: the number of genetic algorithm runs.
+    - seed: the seed of the random generators.
+
+    Returns:
+    - A dictionary with the wall time in seconds, the peak traced memory in bytes, the garbage collection time in
+      seconds and the number of collections.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    timer = GCTimer()
+    gc.collect()
+    gc.callbacks.append(timer)
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for _ in range(runs):
+            GeneticAlgorithm(config).run_genetic_algorithm()
+    finally:
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.callbacks.remove(timer)
+    return {"seconds": seconds, "peak_memory": peak, "gc_seconds": timer.seconds, "gc_collections": timer.collections}
+
+
+if __name__ == "__main__":
+    from Config import config
+
+    parser = argparse.ArgumentParser(description="Measures the time, peak memory and GC time of genetic algorithm runs.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    result = run(config, arguments.runs, arguments.seed)
+    print(f"Runs: {arguments.runs}")
+    print(f"Time: {result['seconds']:.2f}s")
+    print(f"Peak memory: {result['peak_memory'] / 2 ** 20:.1f} MiB")
+    print(f"GC time: {result['gc_seconds']:.3f}s in {result['gc_collections']} collections")
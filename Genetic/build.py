@@ -1,7 +1,5 @@
-import math
+from Config.modmatrix import SetState
 
-capacity_cache = {}
-pool_cache = {}
 
 class Build:
     """
@@ -13,19 +11,24 @@ class Build:
     - used_aura (bool): Whether an aura mod has been used in the build.
     - used_exilus (bool): Whether an exilus mod has been used in the build.
     - mods (list): A list of mods used in the build.
-    - mod_pool (list): A list of mods that can still be used in the build.
+    - pool_mask (int): The bitmask of the mods that can still be used in the build, in the MOD_POOL of the config.
+    - mod_pool (tuple): The mods that can still be used in the build, a view shared with other builds.
     - aura (dict): The aura mod used in the build.
     - exilus (dict): The exilus mod used in the build.
-    - modded_stats (dict): The stats of the Warframe after applying mods.
-    - stat_distance (int): The difference between the modded stats and the goal stats.
+    - stat_vector (np.ndarray): The stats of the Warframe after applying mods, in the column order of the objective.
+    - modded_stats (dict): The stats of the Warframe after applying mods, keyed by stat name.
+    - stat_distance (float): The distance of the modded stats to the hard goals of the objective.
+    - stat_penalty (float): The penalty of the modded stats in the objective, for soft goals and overshoot.
+    - sets (SetState): The equipped mods of every stat-scaling mod set, updated on every add and remove.
+    - fitness_cache (FitnessCache): An optional cache of evaluations shared with other builds.
     """
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, fitness_cache=None):
         """
         Initializes a new Build object with default values.
         """
         self.mods = []
-        self.mod_pool = config.MOD_DATABASE.copy()
+        self.pool_mask = config.MOD_POOL.full_mask
         self.unique_mod_names = {key: False for key in config.UNIQUE_MOD_NAMES}
         
         self.used_mods = 0
@@ -33,30 +36,55 @@ class Build:
         self.used_aura = not config.AURA_SLOT_FREE
         self.used_exilus = not config.EXILUS_SLOT_FREE
         self.used_capacity = 0
-        self.modded_stats = {}
+        self.stat_vector = None
         self.stat_distance = 99999
+        self.stat_penalty = 0.0
+        self.sets = SetState(config.MOD_MATRIX)
         self.config = config
+        self.fitness_cache = fitness_cache
+
+    @property
+    def mod_pool(self):
+        return self.config.MOD_POOL.view(self.pool_mask)
+
+    @property
+    def modded_stats(self):
+        if self.stat_vector is None:
+            return {}
+        return dict(zip(self.config.OBJECTIVE.stats, self.stat_vector.tolist()))
     
-    def update_modded_stats(self):
+    def update_modded_stats(self, delta):
         """
-        Updates the modded stats of the Warframe after applying mods.
+        Updates the modded stats of the Warframe after adding or removing a mod.
+
+        Parameters:
+        - delta (np.ndarray): The change of the stats, set bonuses included.
 
         Returns:
-        - modded_stats (dict): The updated modded stats of the Warframe.
+        - stat_vector (np.ndarray): The updated modded stats of the Warframe.
         """
-        modded_stats = {stat: self.config.BASE_STATS[stat] for stat in self.config.BASE_STATS}
-        for mod in self.mods:
-            modded_stats = {stat: modded_stats[stat] + mod[stat] for stat in self.config.BASE_STATS}
-        return modded_stats
+        previous = self.config.OBJECTIVE.base if self.stat_vector is None else self.stat_vector
+        return previous + delta
     
     def evaluate_stats(self):
         """
-        Evaluates the difference between the modded stats and the goal stats.
+        Evaluates the modded stats with the objective.
+
+        Returns:
+        - stat_distance (float): The distance of the modded stats to the hard goals.
+        - stat_penalty (float): The penalty of the modded stats.
+        """
+        distance, penalty = self.config.OBJECTIVE.evaluate(self.stat_vector)
+        return float(distance), float(penalty)
+
+    def genome(self):
+        """
+        Returns the canonical genome of the build, which does not depend on the order the mods were added in.
 
         Returns:
-        - stat_distance (int): The difference between the modded stats and the goal stats.
+        - genome (tuple): The sorted unique names of the mods used in the build.
         """
-        return sum([max(0, self.config.GOAL_STATS[stat] - self.modded_stats[stat]) for stat in self.config.GOAL_STATS])
+        return tuple(sorted(mod["uniqueName"] for mod in self.mods))
     
     def add_mod(self, mod):
         """
@@ -72,7 +100,7 @@ class Build:
             return
         elif mod["type"] == 2 and self.used_exilus:
             return
-        elif self.used_mods == self.config.MAX_MODS:
+        elif mod["type"] == 0 and self.used_mods == self.config.MAX_MODS:
             return        
         if any(modx["uniqueName"] == mod["uniqueName"] for modx in self.mods):
             return
@@ -83,7 +111,9 @@ class Build:
                 else: 
                     self.unique_mod_names[word.capitalize()] = True
                     
-        capacity = self.calculate_capacity(mod)
+        genome = tuple(sorted(self.genome() + (mod["uniqueName"],)))
+        fitness = self.fitness_cache.get(genome) if self.fitness_cache is not None else None
+        capacity = fitness[0] if fitness else self.calculate_capacity(mod)
         if capacity > self.config.MAX_CAPACITY:
             return
     
@@ -96,8 +126,7 @@ class Build:
             
         self.mods.append(mod)
         self.used_capacity = capacity
-        self.modded_stats = self.update_modded_stats()
-        self.stat_distance = self.evaluate_stats()
+        self.update_fitness(genome, fitness, self.sets.apply(added=mod["id"]))
         self.total_used_mods = len(self.mods)
         self.update_mod_pool()
     
@@ -112,7 +141,7 @@ class Build:
         - None
         """
         if mod["type"] == 1:
-            cp = mod["actualDrain"] * 2 if self.config.POLARITIES[1][mod["polarity"]] else mod["actualDrain"]
+            cp = self.config.MOD_MATRIX.slot_cost(mod, self.config.MOD_MATRIX.slot_polarity(self.config.POLARITIES, 1))
             if self.used_capacity - cp > self.config.MAX_CAPACITY:
                 return
             self.used_aura = False
@@ -122,11 +151,32 @@ class Build:
             self.used_mods -= 1
         
         self.mods = [modx for modx in self.mods if modx["uniqueName"] != mod["uniqueName"]]
-        self.used_capacity = self.calculate_capacity(mod)
-        self.modded_stats = self.update_modded_stats()
-        self.stat_distance = self.evaluate_stats()
+        genome = self.genome()
+        fitness = self.fitness_cache.get(genome) if self.fitness_cache is not None else None
+        self.used_capacity = fitness[0] if fitness else self.calculate_capacity()
+        self.update_fitness(genome, fitness, self.sets.apply(removed=mod["id"]))
         self.total_used_mods = len(self.mods)
         self.update_mod_pool()
+
+    def update_fitness(self, genome, fitness=None, delta=None):
+        """
+        Updates the modded stats and stat distance of the build, reusing a cached evaluation when available.
+
+        Parameters:
+        - genome (tuple): The canonical genome of the build.
+        - fitness (tuple): The cached (used capacity, stat vector, stat distance, stat penalty) of the genome, if any.
+        - delta (np.ndarray): The change of the stats since the last update, set bonuses included.
+
+        Returns:
+        - None
+        """
+        if fitness:
+            self.stat_vector, self.stat_distance, self.stat_penalty = fitness[1], fitness[2], fitness[3]
+            return
+        self.stat_vector = self.update_modded_stats(delta)
+        self.stat_distance, self.stat_penalty = self.evaluate_stats()
+        if self.fitness_cache is not None:
+            self.fitness_cache.put(genome, (self.used_capacity, self.stat_vector, self.stat_distance, self.stat_penalty))
     
     def update_mod_pool(self):
         """
@@ -135,82 +185,29 @@ class Build:
         Returns:
         - None
         """
-        
-        global pool_cache
-        
-        if tuple([hash(mod["name"]) for mod in self.mods]) in pool_cache:
-            self.mod_pool = pool_cache[tuple([hash(mod["name"]) for mod in self.mods])].copy()
-            return
-        
-        total_mods = self.config.MOD_DATABASE.copy()
-        self.mod_pool = []
-        
+        pool = self.config.MOD_POOL
+        mask = 0
+
         # based on the stats we want to achieve, remove all mods that are no longer useful (for example if a goal stat has already been achieved)
-        for stat in self.config.GOAL_STATS:
-            if self.modded_stats[stat] < self.config.GOAL_STATS[stat]:
-                self.mod_pool.extend([mod for mod in total_mods if mod[stat] != 0.0 or mod["type"] == 1])
-                
+        for stat in self.config.OBJECTIVE.unmet(self.stat_vector):
+            mask |= pool.stat_masks[stat]
+
         # remove mods that are already in the build
-        for mod in self.mods:
-            self.mod_pool = [m for m in self.mod_pool if m["uniqueName"] != mod["uniqueName"]]
+        mask &= ~pool.mask(self.mods)
         if self.used_aura:
-            self.mod_pool = [m for m in self.mod_pool if m["type"] != 1]
-            
-        pool_cache[tuple([hash(mod["name"]) for mod in self.mods])] = self.mod_pool.copy()
-        
+            mask &= ~pool.type_masks.get(1, 0)
+
+        self.pool_mask = mask
  
-    def calculate_capacity(self, mod):
+    def calculate_capacity(self, mod=None):
         """
-        Calculates the capacity cost of a mod, considering the polarities of the build.
+        Calculates the capacity cost of the build with a mod added, considering the polarities of the build.
 
         Parameters:
-        - mod (dict): The mod whose capacity cost is to be calculated within the build.
+        - mod (dict): The mod whose capacity cost is to be calculated within the build, None for the build alone.
 
         Returns:
-        - capacity_cost (int): The capacity cost of the mod.
+        - capacity_cost (int): The capacity cost of the build.
         """
-        global capacity_cache
-        
-        if tuple([hash(mod["name"]) for mod in self.mods]) in capacity_cache:
-            return capacity_cache[tuple([hash(mod["name"]) for mod in self.mods])]
-        
-        
-        # Iterate through each polarity in the build and get the most expensive mod that matches the polarity
-        capacity_cost = 0
-        mod_list = self.mods.copy()
-        mod_list.append(mod)
-        mod_list.sort(key=lambda mod: mod["actualDrain"], reverse=True)
-        mod_list_cp = mod_list.copy()
-        build_polarities = {1: self.config.POLARITIES[1].copy(), 2: self.config.POLARITIES[2].copy(), 0: self.config.POLARITIES[0].copy()}
-        polarities = self.config.POLARITY_NUMBER
-        used_sd = 0
-        
-        if len(mod_list) > 5:
-            pass
-        
-        for mod in mod_list:
-            if build_polarities[mod["type"]][mod["polarity"]]:
-                build_polarities[mod["type"]][mod["polarity"]] -= 1
-                polarities -= 1
-                capacity_cost += math.ceil(mod["actualDrain"] / 2) if mod["type"] != 1 else math.ceil(mod["actualDrain"] * 2)
-                mod_list_cp.remove(mod)
-                if not mod["type"]: used_sd += 1
-            elif mod["type"]:
-                capacity_cost += mod["actualDrain"]
-                mod_list_cp.remove(mod)
-                
-        free = self.config.MAX_MODS - used_sd - polarities
-        
-        # for standard mods that do not match any polarity
-        for mod in mod_list_cp:
-            if free == 0:
-                capacity_cost += math.ceil(mod["actualDrain"] * 1.5)
-            else:
-                capacity_cost += mod["actualDrain"]
-                free-=1
-                
-        # update the capacity cache dictionary with the names of the mods in the build + the parameter mod along with the capacity cost
-        capacity_cache[tuple([hash(mod["name"]) for mod in mod_list])] = capacity_cost
-        return capacity_cost
-            
-            
\ No newline at end of file
+        mod_list = self.mods + [mod] if mod else self.mods
+        return self.config.MOD_MATRIX.capacity(mod_list, self.config.POLARITIES, self.config.MAX_MODS)
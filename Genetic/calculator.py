@@ -1,8 +1,12 @@
 import cProfile
+import os
 import warnings
 
+from Config.feasibility import InfeasibleGoalsError, check
+
 from .genetics import GeneticAlgorithm
 from .build import Build
+from .fitness import FitnessCache
 
 
 class GeneticCalculator:
@@ -10,29 +14,84 @@ class GeneticCalculator:
     A class that represents a genetic calculator for optimizing builds in a game.
     """
 
-    def __init__(self, loader=None, config=None):
+    def __init__(self, loader=None, config=None, store=None, fitness_cache=None):
         """
         Initializes a new instance of the GeneticCalculator class.
 
         :param loader: An optional loader object.
         :param config: An optional configuration object.
+        :param store: An optional BuildStore used to reuse and save solved builds.
+        :param fitness_cache: An optional FitnessCache shared with other calculators, a new one by default.
         """
         self.loader = loader
         self.config = config
+        self.store = store
+        self.fitness_cache = fitness_cache if fitness_cache is not None else FitnessCache(self.config.FITNESS_CACHE_SIZE)
+        self.generations = 0
+        self.population = []
 
-    def optimize_build(self):
+    def find_build(self, seeds=None, max_restarts=None):
         """
-        Optimizes the build using a genetic algorithm.
+        Finds the best build using a genetic algorithm, unless the same request was already solved. The algorithm
+        is run again until a build is close to the goal stats, at most max_restarts times.
+
+        With config.GENETIC_CHECKPOINT_PATH set, the runs are checkpointed there, a run interrupted before is resumed
+        from its checkpoint first, and the checkpoint is removed once the build is found.
+
+        :param seeds: An optional list of mod lists placed in the initial population, such as greedy builds.
+        :param max_restarts: The maximum number of runs, config.GENETIC_MAX_RESTARTS by default, None to run until a
+            build is close to the goal stats.
+        :return: The best Build found, which may not reach the goal stats once the runs are exhausted.
+        :raises InfeasibleGoalsError: If a goal stat is out of reach of every build, checked before searching.
         """
+        check(self.config)
+        stored_mods = self.store.get(self.config) if self.store else None
+        seeds = list(seeds or [])
+        seeds += self.store.near(self.config) if self.store and not stored_mods else []
         best_build = Build(self.config)
-        while best_build.stat_distance > 0.1:
-            genetic_algorithm = GeneticAlgorithm(self.config)
-            best_build = genetic_algorithm.run_genetic_algorithm()
+        if stored_mods:
+            for mod in stored_mods:
+                best_build.add_mod(mod)
+        checkpoint_path = self.config.GENETIC_CHECKPOINT_PATH
+        resume_path = checkpoint_path if checkpoint_path and os.path.exists(checkpoint_path) else None
+        max_restarts = max_restarts if max_restarts is not None else self.config.GENETIC_MAX_RESTARTS
+        restarts = 0
+        while best_build.stat_distance > 0.1 and (max_restarts is None or restarts < max_restarts):
+            genetic_algorithm = GeneticAlgorithm(self.config, self.fitness_cache, seeds, checkpoint_path=resume_path)
+            resume_path = None
+            build = genetic_algorithm.run_genetic_algorithm(checkpoint_path)
+            restarts += 1
+            if (build.stat_distance, build.stat_penalty) < (best_build.stat_distance, best_build.stat_penalty):
+                best_build = build
+            self.generations += genetic_algorithm.generations
+            self.population = [tuple(build.mods) for build in genetic_algorithm.best_builds]
+            self.population += [tuple(build.mods) for build in genetic_algorithm.population if build.mods]
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        if self.store and not stored_mods and best_build.stat_distance <= 0.1:
+            self.store.put(self.config, best_build.mods, best_build.modded_stats, best_build.used_capacity, best_build.stat_distance, "genetic")
+        return best_build
 
+    def optimize_build(self):
+        """
+        Optimizes the build using a genetic algorithm and prints it.
+        """
+        try:
+            best_build = self.find_build()
+        except InfeasibleGoalsError as error:
+            print(error)
+            return None
+        if best_build.stat_distance > 0.1:
+            print(f"Unable to find a build with the desired stats, here is the best build I could find:")
         print(f"Used Aura: {best_build.used_aura}, Used Exilus: {best_build.used_exilus}, Used Standard Mods: {best_build.used_mods}")
         print(f"Modded Stats: {best_build.modded_stats}")
         print(f"Mods: {[mod['name'] for mod in best_build.mods]}")
+        if self.config.PLACED_MODS:
+            print(f"Required Mods: {[mod['name'] for mod, _, _, _ in self.config.PLACED_MODS]}")
+        if self.config.ARCHON_SHARD_SLOTS:
+            print(f"Archon Shards: {list(self.config.OBJECTIVE.best_offset_name(best_build.stat_vector))}")
         print(f"Used Capacity: {best_build.used_capacity}")
+        print(f"Fitness cache hit rate: {self.fitness_cache.hit_rate():.1%}")
 
 if __name__ == "__main__":
     profiler = cProfile.Profile()
@@ -0,0 +1,93 @@
+import json
+import os
+import random
+import tempfile
+
+import numpy as np
+
+
+def pack_genomes(genomes):
+    """
+    Packs mod id lists of any length into two flat arrays.
+
+    Args:
+    - genomes: a list of mod id lists, in the order the mods were added.
+
+    Returns:
+    - The concatenated ids and the offset where each list starts, with the total length last.
+    """
+    lengths = [len(genome) for genome in genomes]
+    offsets = np.zeros(len(genomes) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(lengths)
+    ids = np.fromiter((mod for genome in genomes for mod in genome), dtype=np.int32, count=int(offsets[-1]))
+    return ids, offsets
+
+
+def unpack_genomes(ids, offsets):
+    """
+    Unpacks the mod id lists packed by pack_genomes.
+    """
+    return [ids[start:end].tolist() for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def random_state():
+    """
+    Returns the state of the random and NumPy random generators as arrays.
+    """
+    version, internal, gauss = random.getstate()
+    name, keys, position, has_gauss, cached = np.random.get_state()
+    return {
+        "python_random": np.array(internal, dtype=np.uint32),
+        "python_gauss": np.array([] if gauss is None else [gauss], dtype=np.float64),
+        "numpy_keys": np.array(keys, dtype=np.uint32),
+        "numpy_position": np.array([position, has_gauss], dtype=np.int64),
+        "numpy_gauss": np.array([cached], dtype=np.float64),
+    }
+
+
+def set_random_state(arrays):
+    """
+    Restores the state of the random and NumPy random generators saved by random_state.
+    """
+    gauss = arrays["python_gauss"]
+    random.setstate((3, tuple(arrays["python_random"].tolist()), float(gauss[0]) if len(gauss) else None))
+    position, has_gauss = arrays["numpy_position"].tolist()
+    np.random.set_state(("MT19937", arrays["numpy_keys"], position, has_gauss, float(arrays["numpy_gauss"][0])))
+
+
+def save(path, metadata, arrays):
+    """
+    Writes a checkpoint atomically: to a temporary file next to it, then renamed over it, so a run killed while
+    writing leaves the previous checkpoint intact.
+
+    Args:
+    - path: the path of the checkpoint file.
+    - metadata: a JSON-serializable dictionary.
+    - arrays: a dictionary of NumPy arrays.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".checkpoint-", suffix=".npz")
+    try:
+        with os.fdopen(descriptor, "wb") as checkpoint_file:
+            np.savez(checkpoint_file, metadata=np.array(json.dumps(metadata)), **arrays)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load(path):
+    """
+    Reads a checkpoint written by save.
+
+    Args:
+    - path: the path of the checkpoint file.
+
+    Returns:
+    - The metadata dictionary and a dictionary of the arrays.
+    """
+    with np.load(path, allow_pickle=False) as checkpoint_file:
+        arrays = {name: checkpoint_file[name] for name in checkpoint_file.files}
+    return json.loads(str(arrays.pop("metadata"))), arrays
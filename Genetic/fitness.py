@@ -0,0 +1,112 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class FitnessCache:
+    """
+    A bounded least-recently-used cache of build evaluations, keyed by canonical genome.
+
+    Each entry holds the used capacity, the stat vector, the stat distance and the stat penalty of a mod set, so a
+    build that is assembled again in a later generation or restart does not replay its capacity and stat
+    calculations. Entries are plain tuples, so a cache can be exported to worker processes with snapshot and folded
+    back with merge.
+
+    Attributes:
+    - size (int): The maximum number of entries kept.
+    - entries (OrderedDict): The cached evaluations, from least to most recently used.
+    - hits (int): The number of lookups answered by the cache.
+    - misses (int): The number of lookups that had to be computed.
+    """
+
+    def __init__(self, size=20000):
+        """
+        Initializes an empty cache.
+
+        Parameters:
+        - size (int): The maximum number of entries kept.
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, genome):
+        """
+        Looks up the evaluation of a genome.
+
+        Parameters:
+        - genome (tuple): The canonical genome of the mod set.
+
+        Returns:
+        - fitness (tuple): The (used capacity, stat vector, stat distance, stat penalty) of the mod set, or None if
+          not cached.
+        """
+        fitness = self.entries.get(genome)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(genome)
+        self.hits += 1
+        return fitness
+
+    def put(self, genome, fitness):
+        """
+        Stores the evaluation of a genome, evicting the least recently used entry when full.
+
+        Parameters:
+        - genome (tuple): The canonical genome of the mod set.
+        - fitness (tuple): The (used capacity, stat vector, stat distance, stat penalty) of the mod set.
+        """
+        self.entries[genome] = fitness
+        self.entries.move_to_end(genome)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        """
+        Returns the fraction of lookups answered by the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def snapshot(self):
+        """
+        Returns a picklable copy of the cached entries, to seed the cache of a worker process.
+        """
+        return dict(self.entries)
+
+    def merge(self, entries):
+        """
+        Adds the entries evaluated elsewhere, such as by a worker process, to this cache.
+
+        Parameters:
+        - entries (dict): The entries to add, keyed by genome.
+        """
+        for genome, fitness in entries.items():
+            self.put(genome, fitness)
+
+    def rescore(self, objective, shift=None, chunk=4096):
+        """
+        Re-evaluates every entry with a new objective, after the goals or the base stats changed.
+
+        The capacity of a mod set does not depend on the goals or the base stats, and its stats only move by the change
+        of the base stats, so the entries are kept and only their distance and penalty are computed again.
+
+        Parameters:
+        - objective (Objective): The objective to score the entries with.
+        - shift (np.ndarray): The change of the base stats, added to every cached stat vector.
+        - chunk (int): The number of entries scored in each vectorized call.
+        """
+        genomes = list(self.entries)
+        for start in range(0, len(genomes), chunk):
+            batch = genomes[start:start + chunk]
+            vectors = np.array([self.entries[genome][1] for genome in batch])
+            if shift is not None:
+                vectors = vectors + shift
+            distances, penalties = objective.evaluate(vectors)
+            for genome, vector, distance, penalty in zip(batch, vectors, distances.tolist(), penalties.tolist()):
+                self.entries[genome] = (self.entries[genome][0], vector, distance, penalty)
@@ -1,29 +1,69 @@
+import heapq
 import random
 import numpy as np
+from Store.store import fingerprint
+from . import checkpoint
 from .build import Build
+from .archive import EliteArchive
 
 class GeneticAlgorithm:
     """
     A class that implements a genetic algorithm to find the best build for a given Warframe and weapon.
     """
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, fitness_cache=None, seeds=None, population_size=None, max_generations=None,
+                 mutation_rate=None, stall_generations=None, archive_target=None, checkpoint_path=None):
         """
-        Initializes the GeneticAlgorithm class by generating a population of random builds.
+        Initializes the GeneticAlgorithm class by generating a population of seeded and random builds.
 
         Args:
         config: A configuration object that contains the necessary information for the algorithm to run.
+        fitness_cache: An optional FitnessCache shared by every build evaluated, and by other runs using it.
+        seeds: An optional list of mod lists, such as previously solved builds, placed in the initial population.
+        population_size: The number of builds of every generation, config.GENETIC_POPULATION_SIZE by default.
+        max_generations: The maximum number of generations, config.GENETIC_MAX_GENERATIONS by default.
+        mutation_rate: The chance of each mutation step being the last one, config.GENETIC_MUTATION_RATE by default.
+        stall_generations: The generations without a new solved build after which the run stops,
+        config.GENETIC_STALL_GENERATIONS by default.
+        archive_target: The solved builds, minus the generations without a new one, after which the run stops,
+        config.GENETIC_ARCHIVE_TARGET by default.
+        checkpoint_path: An optional checkpoint file to resume a run from, instead of generating a population.
         """
         self.config = config
-        self.population_size = 300
-        self.max_generations = 100
-        self.mutation_rate = 0.6
+        self.fitness_cache = fitness_cache
+        self.population_size = config.GENETIC_POPULATION_SIZE if population_size is None else population_size
+        self.max_generations = config.GENETIC_MAX_GENERATIONS if max_generations is None else max_generations
+        self.mutation_rate = config.GENETIC_MUTATION_RATE if mutation_rate is None else mutation_rate
+        self.stall_generations = config.GENETIC_STALL_GENERATIONS if stall_generations is None else stall_generations
+        self.archive_target = config.GENETIC_ARCHIVE_TARGET if archive_target is None else archive_target
+        self.generations = 0
+        self.stuck_counter = 0
+        self.previous_score = 0
         self.max_standard_mods = config.MAX_MODS
         self.max_aura_mods = config.AURA_SLOT_FREE
         self.max_exilus_mods = config.EXILUS_SLOT_FREE
         self.minimum_used_mods = config.MAX_MODS
-        self.best_builds = []
-        self.population = [self.generate_random_build() for _ in range(self.population_size)]
+        self.best_builds = EliteArchive(config.ARCHIVE_SIZE)
+        if checkpoint_path:
+            self.resume(checkpoint_path)
+            return
+        self.population = [self.generate_seeded_build(mods) for mods in (seeds or [])][:self.population_size]
+        self.population += [self.generate_random_build() for _ in range(self.population_size - len(self.population))]
+
+    def generate_seeded_build(self, mods):
+        """
+        Generates a build from a given list of mods.
+
+        Args:
+        mods: A list of mods to add to the build, in order.
+
+        Returns:
+        A Build object with every mod that fits added.
+        """
+        build = Build(self.config, self.fitness_cache)
+        for mod in mods:
+            build.add_mod(mod)
+        return build
     
     def generate_random_build(self):
         """
@@ -32,7 +72,7 @@ class GeneticAlgorithm:
         Returns:
         A Build object representing the randomly generated build.
         """
-        build = Build(self.config)
+        build = Build(self.config, self.fitness_cache)
         available_mods = [mod for mod in self.config.MOD_DATABASE if not mod["type"] or mod["type"] == 1]
         goal_norm = {stat: self.config.GOAL_STATS[stat] - 1 for stat in self.config.GOAL_STATS}
 
@@ -71,7 +111,10 @@ class GeneticAlgorithm:
         if total_multiplier_sum == 0:
             return []
 
-        multiplier_probs = [min(multiplier_sum / total_multiplier_sum, 0.1) for multiplier_sum in multiplier_sums]
+        # Mods lowering the goal stats have negative sums, and are never picked
+        multiplier_probs = [max(0.0, min(multiplier_sum / total_multiplier_sum, 0.1)) for multiplier_sum in multiplier_sums]
+        if not any(multiplier_probs):
+            return []
         return random.choices(available_mods, weights=multiplier_probs, k=self.minimum_used_mods)
 
 
@@ -119,9 +162,9 @@ class GeneticAlgorithm:
         build: A Build object representing the build to be evaluated.
 
         Returns:
-        The distance between the build's stats and the goal stats.
+        The distance between the build's stats and the goal stats, plus the penalty of the objective.
         """
-        return build.stat_distance
+        return build.stat_distance + build.stat_penalty
 
     def crossover(self, parent1, parent2):
         """
@@ -134,8 +177,8 @@ class GeneticAlgorithm:
         Returns:
         Two Build objects representing the children generated from the crossover.
         """
-        child1 = Build(self.config)
-        child2 = Build(self.config)
+        child1 = Build(self.config, self.fitness_cache)
+        child2 = Build(self.config, self.fitness_cache)
         parent1_mods = parent1.mods
         parent2_mods = parent2.mods
 
@@ -200,42 +243,42 @@ class GeneticAlgorithm:
     
     def update_best_builds(self):
         """
-        Updates the list of best builds found so far.
+        Updates the archive of best builds found so far.
         """
-        self.best_builds.extend([build for build in self.population if build.stat_distance < 0.001])
-
-        # Remove duplicates of the best builds where ALL the mods used are the same
-        unique_builds = []
-        for build in self.best_builds:
-            if not any(build.mods == b.mods for b in unique_builds):
-                unique_builds.append(build)
-
-        self.best_builds = unique_builds
+        for build in self.population:
+            if build.stat_distance < 0.001:
+                self.best_builds.add(build)
 
         # Update the minimum number of used mods
         if self.best_builds:
-            self.minimum_used_mods = min([build.total_used_mods for build in self.best_builds])
+            self.minimum_used_mods = self.best_builds.minimum_used_mods
 
-    def run_genetic_algorithm(self):
+    def run_genetic_algorithm(self, checkpoint_path=None, checkpoint_interval=None):
         """
-        Runs the genetic algorithm to find the best build for the given Warframe and weapon.
+        Runs the genetic algorithm to find the best build for the given Warframe and weapon, from the generation it
+        was resumed at if it was.
+
+        Args:
+        checkpoint_path: An optional path where the run is checkpointed every checkpoint_interval generations.
+        checkpoint_interval: The generations between two checkpoints, config.GENETIC_CHECKPOINT_INTERVAL by default.
 
         Returns:
         The best build found by the genetic algorithm.
         """
-        stuck_counter = 0
-        previous_score = 0
-        
-        for gen in range(self.max_generations):
+        checkpoint_interval = checkpoint_interval or self.config.GENETIC_CHECKPOINT_INTERVAL
+        for gen in range(self.generations, self.max_generations):
+            self.generations = gen + 1
             fitness_scores = self.evaluate_population_fitness()
             self.update_best_builds()
             parents = self.select_parents(fitness_scores)
             new_population = self.create_new_population(parents)
             self.population = new_population
             self.update_best_builds()
-            stuck_counter, previous_score = self.update_stuck_counter(stuck_counter, previous_score)
-            if (len(self.best_builds) - stuck_counter) > 100 or stuck_counter > 15:
+            self.stuck_counter, self.previous_score = self.update_stuck_counter(self.stuck_counter, self.previous_score)
+            if (len(self.best_builds) - self.stuck_counter) > self.archive_target or self.stuck_counter > self.stall_generations:
                 break
+            if checkpoint_path and self.generations % checkpoint_interval == 0:
+                self.save_checkpoint(checkpoint_path)
         
         best_builds = self.get_best_builds()
         best_build = self.get_best_build(best_builds)
@@ -249,11 +292,10 @@ class GeneticAlgorithm:
         A list of the best Build objects found so far.
         """
         # Get the best 10 builds with the lowest number of used mods
-        builds_len = min(len(self.best_builds), 10)
-        best_builds = sorted(self.best_builds, key=lambda build: build.total_used_mods)[:builds_len]
+        best_builds = self.best_builds.top(10)
         
         # Sort the builds by penalizing them for having stats below the base stats and used capacity
-        best_builds = sorted(best_builds, key=lambda build: (build.used_capacity, sum([max(0, self.config.BASE_STATS[stat] - build.modded_stats.get(stat, 0)) for stat in self.config.BASE_STATS])))
+        best_builds = sorted(best_builds, key=lambda build: (build.stat_penalty, build.used_capacity, sum([max(0, self.config.BASE_STATS[stat] - build.modded_stats.get(stat, 0)) for stat in self.config.BASE_STATS])))
         
         return best_builds
 
@@ -270,7 +312,7 @@ class GeneticAlgorithm:
         if best_builds:
             best_build = best_builds[0]
         else:
-            best_build = Build(self.config)
+            best_build = Build(self.config, self.fitness_cache)
         return best_build
 
     def evaluate_population_fitness(self):
@@ -305,11 +347,131 @@ class GeneticAlgorithm:
 
         Args:
         stuck_counter: An integer representing the current value of the stuck counter.
-        previous_score: An integer representing the number of best builds found in the previous generation.
+        previous_score: An integer representing the number of best builds archived up to the previous generation.
 
         Returns:
         A tuple containing the updated values of the stuck counter and previous score.
         """
-        stuck_counter = stuck_counter + 1 if len(self.best_builds) == previous_score else 0
-        previous_score = len(self.best_builds)
-        return stuck_counter, previous_score
\ No newline at end of file
+        stuck_counter = stuck_counter + 1 if self.best_builds.additions == previous_score else 0
+        previous_score = self.best_builds.additions
+        return stuck_counter, previous_score
+
+    def save_checkpoint(self, path):
+        """
+        Writes the state of the run to a checkpoint file, from which resume continues it: the genome of every build
+        of the population and of the archive as mod id arrays, their stats, the random generator states and the
+        generation counters.
+
+        Args:
+        path: The path of the checkpoint file, replaced atomically.
+        """
+        archive = self.archive_entries()
+        builds = self.population + [build for _, _, _, build in archive]
+        population_ids, population_offsets = checkpoint.pack_genomes([[mod["id"] for mod in build.mods] for build in self.population])
+        archive_ids, archive_offsets = checkpoint.pack_genomes([[mod["id"] for mod in build.mods] for _, _, _, build in archive])
+        families = list(self.config.UNIQUE_MOD_NAMES)
+        metadata = {
+            "fingerprint": fingerprint(self.config),
+            "version": self.config.MOD_DATABASE_VERSION,
+            "parameters": [self.population_size, self.max_generations, self.mutation_rate, self.stall_generations, self.archive_target],
+            "generations": self.generations,
+            "stuck_counter": self.stuck_counter,
+            "previous_score": self.previous_score,
+            "minimum_used_mods": self.minimum_used_mods,
+            "archive_additions": self.best_builds.additions,
+            "archive_minimum_used_mods": self.best_builds.minimum_used_mods,
+            "used_families": [[family for family in families if build.unique_mod_names[family]] for build in builds],
+        }
+        stat_vectors = np.array([np.full(len(self.config.OBJECTIVE.stats), np.nan) if build.stat_vector is None else build.stat_vector
+                                 for build in builds]).reshape(len(builds), len(self.config.OBJECTIVE.stats))
+        checkpoint.save(path, metadata, {
+            "population_ids": population_ids,
+            "population_offsets": population_offsets,
+            "archive_ids": archive_ids,
+            "archive_offsets": archive_offsets,
+            "archive_orders": np.array([order for _, _, order, _ in archive], dtype=np.int64),
+            "stat_vectors": stat_vectors,
+            "stat_scores": np.array([[build.stat_distance, build.stat_penalty] for build in builds], dtype=np.float64).reshape(len(builds), 2),
+            **checkpoint.random_state(),
+        })
+
+    def archive_entries(self):
+        """
+        Returns the heap entries of the archive, as (negated used mods, negated capacity, negated order, build), in
+        the order the archive holds its builds.
+        """
+        entries = {entry[3]: entry for entry in self.best_builds.heap}
+        return [entries[genome][:3] + (build,) for genome, build in self.best_builds.builds.items()]
+
+    def restore_build(self, mods, used_families, stat_vector, stat_distance, stat_penalty):
+        """
+        Rebuilds a checkpointed build as it was, without checking again that its mods fit.
+
+        Args:
+        mods: The mods of the build, in the order they were added.
+        used_families: The unique mod names the build marked as used.
+        stat_vector: The modded stats of the build, NaN for a build that was never modified.
+        stat_distance: The stat distance of the build.
+        stat_penalty: The stat penalty of the build.
+
+        Returns:
+        The Build object.
+        """
+        build = Build(self.config, self.fitness_cache)
+        for mod in mods:
+            if mod["type"] == 1:
+                build.used_aura = True
+            elif mod["type"] == 2:
+                build.used_exilus = True
+            else:
+                build.used_mods += 1
+            build.mods.append(mod)
+            build.sets.apply(added=mod["id"])
+        build.total_used_mods = len(build.mods)
+        build.used_capacity = build.calculate_capacity()
+        for family in used_families:
+            build.unique_mod_names[family] = True
+        if not np.isnan(stat_vector).all():
+            build.stat_vector = stat_vector.copy()
+            build.stat_distance, build.stat_penalty = float(stat_distance), float(stat_penalty)
+            build.update_mod_pool()
+        return build
+
+    def resume(self, path):
+        """
+        Restores the state of a run from a checkpoint file, so that run_genetic_algorithm continues it from the
+        generation it was saved at, with the same random generator states.
+
+        Args:
+        path: The path of the checkpoint file.
+
+        Raises:
+        ValueError: If the checkpoint was saved for another request, mod database or algorithm parameters.
+        """
+        metadata, arrays = checkpoint.load(path)
+        parameters = [self.population_size, self.max_generations, self.mutation_rate, self.stall_generations, self.archive_target]
+        if metadata["fingerprint"] != fingerprint(self.config) or metadata["version"] != self.config.MOD_DATABASE_VERSION:
+            raise ValueError(f"The checkpoint {path} was saved for another request or mod database")
+        if metadata["parameters"] != parameters:
+            raise ValueError(f"The checkpoint {path} was saved with the parameters {metadata['parameters']}, not {parameters}")
+
+        genomes = checkpoint.unpack_genomes(arrays["population_ids"], arrays["population_offsets"])
+        genomes += checkpoint.unpack_genomes(arrays["archive_ids"], arrays["archive_offsets"])
+        builds = [self.restore_build([self.config.LOADED_MODS[mod] for mod in genome], families, stat_vector, distance, penalty)
+                  for genome, families, stat_vector, (distance, penalty)
+                  in zip(genomes, metadata["used_families"], arrays["stat_vectors"], arrays["stat_scores"])]
+        self.population = builds[:len(arrays["population_offsets"]) - 1]
+        self.best_builds = EliteArchive(self.config.ARCHIVE_SIZE)
+        for build, order in zip(builds[len(self.population):], arrays["archive_orders"].tolist()):
+            genome = build.genome()
+            self.best_builds.builds[genome] = build
+            self.best_builds.heap.append((-build.total_used_mods, -build.used_capacity, order, genome))
+        heapq.heapify(self.best_builds.heap)
+        self.best_builds.additions = metadata["archive_additions"]
+        self.best_builds.minimum_used_mods = metadata["archive_minimum_used_mods"]
+        self.generations = metadata["generations"]
+        self.stuck_counter = metadata["stuck_counter"]
+        self.previous_score = metadata["previous_score"]
+        self.minimum_used_mods = metadata["minimum_used_mods"]
+        checkpoint.set_random_state(arrays)
+
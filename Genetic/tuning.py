@@ -0,0 +1,142 @@
+import argparse
+import itertools
+import math
+import random
+import statistics
+import time
+
+import numpy as np
+
+from Config import feasibility, request
+from .genetics import GeneticAlgorithm
+
+
+def parameter_grid(**values):
+    """
+    Builds every combination of genetic algorithm parameters.
+
+    Args:
+    - values: the values to try for each GeneticAlgorithm parameter, such as population_size=[150, 300].
+
+    Returns:
+    - A list of parameter dictionaries, one per combination.
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def goal_profiles(config, scales=(0.9, 1.0, 1.1)):
+    """
+    Builds a corpus of goal profiles around the goal stats of a configuration, dropping the unreachable ones.
+
+    Args:
+    - config: a configuration object with the build parameters.
+    - scales: how far each profile moves the goals away from the base stats, 1 keeping the configured goals.
+
+    Returns:
+    - A list of (name, configuration) pairs, one per reachable profile.
+    """
+    profiles = []
+    for scale in scales:
+        goals = {stat: config.BASE_STATS[stat] + (goal - config.BASE_STATS[stat]) * scale
+                 for stat, goal in config.GOAL_STATS.items()}
+        profile = request.derive(config, GOAL_STATS=goals)
+        try:
+            feasibility.check(profile)
+        except feasibility.InfeasibleGoalsError:
+            continue
+        profiles.append((f"goals x{scale:g}", profile))
+    return profiles
+
+
+def time_to_solution(config, parameters, seed):
+    """
+    Runs the genetic algorithm once with fixed seeds and measures how long it takes to return a solved build.
+
+    Args:
+    - config: a configuration object with the build parameters.
+    - parameters: the GeneticAlgorithm parameters to run with.
+    - seed: the seed of the random generators.
+
+    Returns:
+    - The wall time of the run in seconds, or infinity if the best build does not reach the goals.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    start = time.perf_counter()
+    best_build = GeneticAlgorithm(config, **parameters).run_genetic_algorithm()
+    seconds = time.perf_counter() - start
+    return seconds if best_build.stat_distance < 0.001 else math.inf
+
+
+def ranking(times):
+    """
+    Returns the sort key of the times to solution of a parameter set: the median, then the most solved instances,
+    then the mean time of the solved ones.
+    """
+    solved = [seconds for seconds in times if seconds < math.inf]
+    return statistics.median(times), -len(solved), statistics.mean(solved) if solved else math.inf
+
+
+def race(profiles, parameter_sets, seeds=(0, 1, 2), minimum_instances=3, ratio=1.5, log=None):
+    """
+    Races parameter sets over every goal profile and seed, dropping the losing sets as soon as the evidence allows.
+
+    Every surviving set runs the same instances in the same order. Once they ran minimum_instances instances, the
+    sets whose median time to solution is more than ratio times the best median are dropped, so the remaining
+    instances are only spent on competitive sets.
+
+    Args:
+    - profiles: a list of (name, configuration) pairs, as returned by goal_profiles.
+    - parameter_sets: a list of GeneticAlgorithm parameter dictionaries, as returned by parameter_grid.
+    - seeds: the seeds every parameter set runs each profile with.
+    - minimum_instances: the number of instances every set runs before any is dropped.
+    - ratio: how much slower than the best median a set's median may be before it is dropped.
+    - log: an optional function called with a message whenever a set is dropped.
+
+    Returns:
+    - A list of (parameters, times) pairs of the surviving sets, from the best ranking to the worst.
+    """
+    times = {index: [] for index in range(len(parameter_sets))}
+    instances = [(name, profile, seed) for name, profile in profiles for seed in seeds]
+    for count, (name, profile, seed) in enumerate(instances, 1):
+        for index in times:
+            times[index].append(time_to_solution(profile, parameter_sets[index], seed))
+        if count < minimum_instances or len(times) == 1:
+            continue
+        medians = {index: statistics.median(results) for index, results in times.items()}
+        best = min(medians.values())
+        for index, median in medians.items():
+            if median > best * ratio or median == math.inf and best < math.inf:
+                del times[index]
+                if log:
+                    log(f"Dropped {parameter_sets[index]} after {count} instances, median {median:.3f}s")
+    survivors = sorted(times, key=lambda index: ranking(times[index]))
+    return [(parameter_sets[index], times[index]) for index in survivors]
+
+
+if __name__ == "__main__":
+    from Config import config
+
+    parser = argparse.ArgumentParser(description="Races genetic algorithm parameter sets on a corpus of goal profiles.")
+    parser.add_argument("--population-size", type=int, nargs="+", default=[config.GENETIC_POPULATION_SIZE])
+    parser.add_argument("--max-generations", type=int, nargs="+", default=[config.GENETIC_MAX_GENERATIONS])
+    parser.add_argument("--mutation-rate", type=float, nargs="+", default=[config.GENETIC_MUTATION_RATE])
+    parser.add_argument("--stall-generations", type=int, nargs="+", default=[config.GENETIC_STALL_GENERATIONS])
+    parser.add_argument("--archive-target", type=int, nargs="+", default=[config.GENETIC_ARCHIVE_TARGET])
+    parser.add_argument("--scales", type=float, nargs="+", default=[0.9, 1.0, 1.1])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--minimum-instances", type=int, default=3)
+    parser.add_argument("--ratio", type=float, default=1.5)
+    arguments = parser.parse_args()
+    profiles = goal_profiles(config, arguments.scales)
+    if not profiles:
+        raise SystemExit("No reachable goal profile to race on")
+    parameter_sets = parameter_grid(population_size=arguments.population_size, max_generations=arguments.max_generations,
+                                    mutation_rate=arguments.mutation_rate, stall_generations=arguments.stall_generations,
+                                    archive_target=arguments.archive_target)
+    print(f"Racing {len(parameter_sets)} parameter sets on {len(profiles)} goal profiles with {len(arguments.seeds)} seeds")
+    results = race(profiles, parameter_sets, arguments.seeds, arguments.minimum_instances, arguments.ratio, print)
+    for parameters, times in results:
+        print(f"{parameters}: median {statistics.median(times):.3f}s, solved {sum(t < math.inf for t in times)}/{len(times)}")
+    print(f"Best parameters: {results[0][0]}")
@@ -0,0 +1,112 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from .greedybuild import GreedyBuild
+
+
+class BuildEnumerator:
+    """
+    Enumerates the best distinct builds of a configuration, best first, by partitioning the builds with a priority
+    queue over partial solutions.
+
+    A partial solution holds the mods every build of it uses, in order, and the mods none of them may use. Its
+    build is completed greedily and the queue is ordered by the score of that build. Popping a partial solution
+    yields its build and splits its other builds into disjoint partial solutions, the i-th one keeping the first i
+    mods of the build and banning the next one. No build is ever found twice, and every further build only costs
+    the completions of the partial solutions split off the previous one.
+
+    Attributes:
+    - config: the configuration object with the build parameters.
+    - mods (list): the mods the builds are made of.
+    - ids (list): the mod matrix row of each mod.
+    - drains (np.ndarray): the drain of each mod.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initializes the enumerator with the mod database of a configuration.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        """
+        self.config = config
+        self.mods = list(config.MOD_DATABASE)
+        self.ids = [mod["id"] for mod in self.mods]
+        self.drains = np.array([mod["actualDrain"] for mod in self.mods], dtype=np.float64)
+
+    def complete(self, required, banned):
+        """
+        Completes a partial solution greedily, adding the mod that lowers the objective the most until none does.
+
+        Args:
+        - required: the mods of the build, added first and in order.
+        - banned: the names of the mods the build may not use.
+
+        Returns:
+        - The completed GreedyBuild.
+        """
+        objective = self.config.OBJECTIVE
+        build = GreedyBuild(config=self.config)
+        for mod in required:
+            build.add_mod(mod)
+        candidates = [index for index, mod in enumerate(self.mods) if mod["name"] not in banned and mod["name"] not in build.mod_names]
+        while candidates:
+            distance, penalty = objective.evaluate(build.stat_vector)
+            distances, penalties = objective.evaluate(build.stat_vector + build.sets.deltas([self.ids[index] for index in candidates]))
+            gains = distance + penalty - distances - penalties - self.drains[candidates] * 0.005
+            added = None
+            for position in np.argsort(-gains, kind="stable").tolist():
+                if gains[position] <= 0:
+                    break
+                used = len(build.used_mods)
+                build.add_mod(self.mods[candidates[position]])
+                if len(build.used_mods) > used:
+                    added = position
+                    break
+            if added is None:
+                break
+            candidates.pop(added)
+        return build
+
+    def rank(self, build):
+        """
+        Returns the sort key of a build: its distance to the goals, its penalty and its capacity.
+        """
+        distance, penalty = self.config.OBJECTIVE.evaluate(build.stat_vector)
+        return float(distance), float(penalty), build.capacity
+
+    def enumerate(self, k, min_difference=0, banned=()):
+        """
+        Finds the k best distinct builds.
+
+        Args:
+        - k: the number of builds to find.
+        - min_difference: the number of mods every build must have that another build found does not, and the
+          other way around. 0 keeps every distinct build.
+        - banned: the names of the mods no build may use.
+
+        Returns:
+        - Up to k GreedyBuild objects, from the best to the worst.
+        """
+        counter = itertools.count()
+        queue = []
+
+        def push(required, banned):
+            build = self.complete(required, banned)
+            heapq.heappush(queue, (self.rank(build), next(counter), build, len(required), banned))
+
+        push([], frozenset(banned))
+        builds = []
+        while queue and len(builds) < k:
+            key, _, build, fixed, banned = heapq.heappop(queue)
+            names = set(build.mod_names)
+            if all(len(names - set(other.mod_names)) >= min_difference and len(set(other.mod_names) - names) >= min_difference
+                   for _, other in builds):
+                builds.append((key, build))
+            if len(builds) == k:
+                break
+            for index in range(fixed, len(build.used_mods)):
+                push(build.used_mods[:index], banned | {build.used_mods[index]["name"]})
+        return [build for _, build in sorted(builds, key=lambda item: item[0])]
@@ -1,6 +1,11 @@
+import heapq
 import random
+import numpy as np
 from .greedybuild import GreedyBuild
 
+# Number of candidates scored again at once when the top of the candidate heap is stale
+RESCORE_BATCH = 8
+
 class GreedyAlgorithm:
     """
     A class that implements the greedy algorithm for Warframe mod builds.
@@ -16,7 +21,14 @@ class GreedyAlgorithm:
 
     def backtrack(self, current_build, remaining_mods, remaining_capacity, highest_score, best_builds, min_score):
         """
-        Recursively searches for the best mod build.
+        Searches for the best mod build by adding the best scored remaining mod that fits, one at a time, until no
+        mod or capacity is left.
+
+        The candidates are kept in a heap by score, along with the move they were scored at. Adding a mod lowers the
+        score of most others, so after a move only the candidates at the top of the heap are scored again, a batch at
+        a time, until the best of them is scored against the current build. The candidates whose score may rise
+        instead, as returned by risen_candidates, are all scored again after the move, so the mod added is always the
+        one the scores of every candidate would pick.
 
         Args:
         - current_build: the current build being evaluated.
@@ -29,30 +41,106 @@ class GreedyAlgorithm:
         Returns:
         - A tuple containing the best build found, the highest score found and a list of the best builds found.
         """
-        score = current_build.calculate_score()
-        if score > highest_score:
-            highest_score = score
-            if self.is_build_valid(current_build):
-                best_builds.append(current_build)
+        remaining_mods = list(remaining_mods)
+        ids = np.array([mod["id"] for mod in remaining_mods], dtype=np.int64)
+        scores = self.score_mods(current_build, remaining_mods)
+        candidates = [(-score, index, 0) for index, score in enumerate(scores.tolist())]
+        heapq.heapify(candidates)
+        move = 0
+        while True:
+            score = current_build.calculate_score()
+            if score > highest_score:
+                highest_score = score
+                if self.is_build_valid(current_build):
+                    best_builds.append(current_build)
+            if not candidates or remaining_capacity == 0:
+                return current_build, highest_score, best_builds
+
+            new_build = self.add_best_mod(current_build, remaining_mods, candidates, move)
+            if new_build is None:
+                return current_build, highest_score, best_builds
+            risen = self.risen_candidates(current_build, new_build.used_mods[-1], ids)
+            current_build = new_build
+            remaining_capacity = self.config.MAX_CAPACITY - current_build.capacity
+            move += 1
+            self.rescore_candidates(current_build, remaining_mods, candidates, move, risen)
+
+    def risen_candidates(self, build, added, ids):
+        """
+        Finds the candidates whose score may rise when a mod is added to a build: the mods of the set of the added
+        mod, whose set bonus grows, the mods lowering a goal stat, whose loss the added mod may make up for, and the
+        mods raising a goal stat the added mod lowers.
+        Every candidate may rise with archon shard offsets, as the best offset may change, with goal stats below
+        their floor, and with overshoot weights on capped stats. The score of the other candidates can only fall.
 
-        if not remaining_mods or remaining_capacity == 0:
-            return current_build, highest_score, best_builds
+        Args:
+        - build: the build before the mod is added.
+        - added: the mod added.
+        - ids: the ids of the mods the candidates index.
 
-        remaining_mods = self.update_mod_pool(current_build, remaining_mods)
-        remaining_mods.sort(key=lambda mod: mod["score"], reverse=True)
+        Returns:
+        - A boolean array telling whether the score of each mod may rise.
+        """
+        objective, matrix = self.config.OBJECTIVE, self.config.MOD_MATRIX
+        weighted = (objective.hard_weights + objective.soft_weights + objective.overshoot_weights) > 0
+        below_floor = (build.stat_vector < objective.floors)[weighted].any()
+        capped_overshoot = (np.isfinite(objective.caps) & (objective.overshoot_weights > 0)).any()
+        if objective.offsets is not None or below_floor or capped_overshoot:
+            return np.ones(len(ids), dtype=bool)
+        set_id = matrix.set_ids[added["id"]]
+        lowered = weighted & (matrix.stats[added["id"]] < 0)
+        stats = matrix.stats[ids]
+        return ((stats[:, weighted] < 0).any(axis=1) | (stats[:, lowered] > 0).any(axis=1)
+                | ((set_id != -1) & (matrix.set_ids[ids] == set_id)))
+
+    def rescore_candidates(self, build, mods, candidates, move, risen):
+        """
+        Scores the given candidates again against a build and puts them back in the candidate heap.
 
-        for mod in remaining_mods:
-            if current_build.can_add_mod(mod):
-                new_build = GreedyBuild(config=self.config)
-                [new_build.add_mod(modx) for modx in current_build.used_mods]
-                new_build.add_mod(mod)
-                new_mods = remaining_mods.copy()
-                new_mods.remove(mod)
-                result, highest_score, best_builds = self.backtrack(new_build, new_mods, self.config.MAX_CAPACITY - new_build.capacity, highest_score, best_builds, min_score)
-                if result:
-                    return result, highest_score, best_builds
+        Args:
+        - build: the current build.
+        - mods: the mods the candidates index.
+        - candidates: the heap of (negated score, mod index, move scored at) of the remaining mods.
+        - move: the number of mods added so far.
+        - risen: a boolean array telling which mods to score again.
+        """
+        stale = [entry for entry in candidates if risen[entry[1]]]
+        if not stale:
+            return
+        candidates[:] = [entry for entry in candidates if not risen[entry[1]]]
+        for (_, index, _), score in zip(stale, self.score_mods(build, [mods[index] for _, index, _ in stale]).tolist()):
+            candidates.append((-score, index, move))
+        heapq.heapify(candidates)
+
+    def add_best_mod(self, build, mods, candidates, move):
+        """
+        Adds the best scored candidate that fits to a copy of a build, removing it from the candidate heap along with
+        the candidates that do not fit, as adding mods never frees capacity or slots.
 
-        return current_build, highest_score, best_builds
+        Args:
+        - build: the current build.
+        - mods: the mods the candidates index.
+        - candidates: the heap of (negated score, mod index, move scored at) of the remaining mods.
+        - move: the number of mods added so far, the candidates scored at it being up to date.
+
+        Returns:
+        - The new build, or None if no candidate fits.
+        """
+        while candidates:
+            if candidates[0][2] < move:
+                stale = [heapq.heappop(candidates) for _ in range(min(RESCORE_BATCH, len(candidates)))]
+                stale_mods = [mods[index] for _, index, _ in stale]
+                for (_, index, _), score in zip(stale, self.score_mods(build, stale_mods).tolist()):
+                    heapq.heappush(candidates, (-score, index, move))
+                continue
+            _, index, _ = heapq.heappop(candidates)
+            if not build.can_add_mod(mods[index]):
+                continue
+            new_build = build.copy()
+            new_build.add_mod(mods[index])
+            if len(new_build.used_mods) > len(build.used_mods):
+                return new_build
+        return None
 
     def find_best_builds(self):
         """
@@ -68,47 +156,26 @@ class GreedyAlgorithm:
         result, highest_score, best_builds = self.backtrack(initial_build, remaining_mods, self.config.MAX_CAPACITY - initial_build.capacity, self.config.BASE_STATS, self.config.GOAL_STATS, highest_score, best_builds)
         return best_builds
 
-    def update_mod_pool(self, build, mods):
+    def score_mods(self, build, mods):
         """
-        Updates the score of each mod in the pool.
+        Scores mods for a build: how much adding each one lowers the objective of the build, minus a small share of
+        its drain. Every mod is scored with a single objective call, and the mods themselves are left untouched.
 
         Args:
         - build: the current build being evaluated.
         - mods: the mods that can be added to the build.
 
         Returns:
-        - A list of the updated mods.
-        """
-        for mod in mods:
-            mod["score"] = self.update_mod_score(build, mod)
-
-        return mods
-
-    def update_mod_score(self, build, mod):
+        - An array with the score of each mod.
         """
-        Updates the score of a mod.
-
-        Args:
-        - build: the current build being evaluated.
-        - mod: the mod being evaluated.
-
-        Returns:
-        - The updated score of the mod.
-        """
-        if not build.can_add_mod(mod):
-            return 0
-
-        modded_stats = build.calculate_modded_stats(mod)
-
-        score = 0
-        for stat in self.config.GOAL_STATS:
-            if mod[stat] != 0.0:
-                score += mod[stat] if modded_stats[stat] < self.config.GOAL_STATS[stat] else mod[stat] - (modded_stats[stat] - self.config.GOAL_STATS[stat])
-
-        score -= mod["actualDrain"] * 0.005
-        if score < 0:
-            score = 0
-        return score
+        if not mods:
+            return np.zeros(0)
+        objective = self.config.OBJECTIVE
+        ids = [mod["id"] for mod in mods]
+        distance, penalty = objective.evaluate(build.stat_vector)
+        distances, penalties = objective.evaluate(build.stat_vector + build.sets.deltas(ids))
+        drains = np.array([mod["actualDrain"] for mod in mods], dtype=np.float64)
+        return np.maximum(0.0, distance + penalty - distances - penalties - drains * 0.005)
 
     def create_initial_build(self):
         """
@@ -143,7 +210,5 @@ class GreedyAlgorithm:
         Returns:
         - True if the build is valid, False otherwise.
         """
-        sc = sum([max(0, self.config.GOAL_STATS[stat] - build.stats[stat]) for stat in self.config.GOAL_STATS])
-        if not sc:
-            return True
-        return False
\ No newline at end of file
+        distance, _ = self.config.OBJECTIVE.evaluate(build.stat_vector)
+        return not distance
\ No newline at end of file
@@ -1,3 +1,6 @@
+import copy
+
+from Config.modmatrix import SetState
 from .greedyslot import GreedySlot
 
 class GreedyBuild:
@@ -16,6 +19,10 @@ class GreedyBuild:
             self.slots.append(GreedySlot(None, 0, id))
             sl += 1
             id += 1
+        for slot_type, free in [(1, self.config.AURA_SLOT_FREE), (2, self.config.EXILUS_SLOT_FREE)]:
+            if free and not any(slot.type == slot_type for slot in self.slots):
+                self.slots.append(GreedySlot(None, slot_type, id))
+                id += 1
                      
         self.used_aura = not self.config.AURA_SLOT_FREE
         self.used_exilus = not self.config.EXILUS_SLOT_FREE
@@ -24,38 +31,52 @@ class GreedyBuild:
         self.used_mods = []
         self.sdnumber = 0
         self.capacity = 0
-        self.stats = self.config.BASE_STATS.copy()      
+        self.stat_vector = self.config.OBJECTIVE.base
+        self.sets = SetState(self.config.MOD_MATRIX)
+        self.stats = self.config.BASE_STATS.copy()
         
+    def copy(self):
+        """
+        Returns an independent copy of this build, without placing its mods again.
+        """
+        build = GreedyBuild.__new__(GreedyBuild)
+        build.__dict__.update(self.__dict__)
+        build.slots = [copy.copy(slot) for slot in self.slots]
+        build.unique_mod_names_used = self.unique_mod_names_used.copy()
+        build.mod_names = self.mod_names.copy()
+        build.used_mods = self.used_mods.copy()
+        build.sets = self.sets.copy()
+        build.stats = self.stats.copy()
+        return build
+
     def can_add_mod(self, mod):
         """
         Simple fast calculation to see if mod would fit if there was a free polarity slot.
         """
-        if mod["type"] != 1:
-            return (self.config.MAX_CAPACITY - self.calculate_capacity() - mod['actualDrain'] / 2 >= 0)
-        return (self.config.MAX_CAPACITY - self.calculate_capacity() - mod['actualDrain'] * 2 >= 0)
+        return self.config.MAX_CAPACITY - self.calculate_capacity() - self.config.MOD_MATRIX.min_costs[mod["id"]] >= 0
     
     
     def add_mod(self, mod):
         """
         Adds a given mod to this build and returns the updated build.
         """
-        if mod["type"] == 1 and self.used_aura or mod["type"] == 2 and self.used_exilus or self.sdnumber == self.config.MAX_MODS:
+        if mod["type"] == 1 and self.used_aura or mod["type"] == 2 and self.used_exilus or mod["type"] == 0 and self.sdnumber == self.config.MAX_MODS:
             return
         if mod['name'] in self.mod_names or not self.can_add_mod(mod):
             return
-        for word in mod["name"].split(" "):
-            if word.capitalize() in self.unique_mod_names_used:
-                if self.unique_mod_names_used[word.capitalize()]:
-                    return
-                else: 
-                    self.unique_mod_names_used[word.capitalize()] = True
+        families = [word.capitalize() for word in mod["name"].split(" ") if word.capitalize() in self.unique_mod_names_used]
+        if any(self.unique_mod_names_used[family] for family in families):
+            return
         sl = self.optimize_capacity(mod)
         if not sl:
             return
+        for family in families:
+            self.unique_mod_names_used[family] = True
 
         self.used_mods.append(mod)
         self.mod_names.append(mod['name'])
         self.slots = sl
+        self.stat_vector = self.stat_vector + self.sets.apply(added=mod["id"])
         self.stats = self.calculate_modded_stats()
         self.capacity = self.calculate_capacity()
         if mod["type"] == 1:
@@ -69,7 +90,7 @@ class GreedyBuild:
         """
         Removes the given mod from this build and returns the updated build.
         """
-        if mod["type"] == 1 and self.calculate_capacity() - mod["actualDrain"] * 2 < 0:
+        if mod["type"] == 1 and self.calculate_capacity() - self.aura_cost(mod) > self.config.MAX_CAPACITY:
             return
         sl = self.optimize_capacity(mod, True)
         if not sl:
@@ -77,6 +98,7 @@ class GreedyBuild:
         self.used_mods.remove(mod)
         self.mod_names.remove(mod['name'])
         self.slots = sl
+        self.stat_vector = self.stat_vector + self.sets.apply(removed=mod["id"])
         self.stats = self.calculate_modded_stats()
         self.capacity = self.calculate_capacity()
         if mod["type"] == 1:
@@ -91,25 +113,27 @@ class GreedyBuild:
         """
         if index < 0 or index >= len(self.used_mods):
             return
-        if self.used_mods[index]["type"] == 1 and self.calculate_capacity() - self.used_mods[index]["actualDrain"] * 2 < 0:
+        if self.used_mods[index]["type"] == 1 and self.calculate_capacity() - self.aura_cost(self.used_mods[index]) > self.config.MAX_CAPACITY:
             return
         sl = self.optimize_capacity(self.used_mods[index], True)
         if not sl:
             return
-        self.used_mods.pop(index)
+        removed = self.used_mods.pop(index)
         self.mod_names.pop(index)
         self.slots = sl
+        self.stat_vector = self.stat_vector + self.sets.apply(removed=removed["id"])
         self.stats = self.calculate_modded_stats()
         self.capacity = self.calculate_capacity()
-        if self.used_mods[index]["type"] == 1:
+        if removed["type"] == 1:
             self.used_aura = False
-        elif self.used_mods[index]["type"] == 2:
+        elif removed["type"] == 2:
             self.used_exilus = False
         else:
             self.sdnumber -= 1
             
     def calculate_score(self):
-        sc = sum([max(0, self.config.GOAL_STATS[stat] - self.stats[stat]) for stat in self.config.GOAL_STATS])
+        distance, penalty = self.config.OBJECTIVE.evaluate(self.stat_vector)
+        sc = float(distance + penalty)
         if sc != 0:
             return 1/sc
         else:
@@ -118,6 +142,12 @@ class GreedyBuild:
     def calculate_capacity(self):
         return sum(slot.cost for slot in self.slots)
 
+    def aura_cost(self, mod):
+        """
+        Returns the capacity cost of an aura mod on the aura slot, from the shared cost table.
+        """
+        return self.config.MOD_MATRIX.slot_cost(mod, self.config.MOD_MATRIX.slot_polarity(self.config.POLARITIES, 1))
+
     
     def reset_slots(self, slots):
         """
@@ -127,82 +157,35 @@ class GreedyBuild:
             slot.mod = None
             slot.cost = 0
 
-    def add_aura_and_exilus_mods(self, slots, aura_mods, exilus_mods):
-        """
-        Adds the aura and exilus mods to the appropriate slots, based on their polarities and the slots' polarities.
-        """
-        available_slots = slots.copy()
-        aura_slot, exilus_slot = (next((s for s in slots if s.type == t), None) for t in [1, 2])
-        for mod_type, mod_list, slot in [(1, aura_mods, aura_slot), (2, exilus_mods, exilus_slot)]:
-            if slot:
-                if mod_list:
-                    mod = mod_list[0]
-                    slot.mod = mod
-                    available_slots.remove(slot)
-                    if mod_type == 1:
-                        slot.cost = mod["actualDrain"] * 2 if slot.polarity == mod["polarity"] else mod["actualDrain"] if slot.polarity == "None" else mod["actualDrain"] / 2
-                    else: slot.cost = mod["actualDrain"] / 2 if slot.polarity == mod["polarity"] else mod["actualDrain"] if slot.polarity == "None" else mod["actualDrain"] * 2
-                else:
-                    available_slots.remove(slot)
-        return available_slots
-
-
-    def add_standard_mods(self, slots, standard_mods):
-        """
-        Adds the standard mods to the available slots, based on their polarities and the slots' polarities.
-        """
-        # get only slots of type 0
-        slots = [slot for slot in slots if slot.type == 0]
-        slots_by_polarity = {polarity: [slot for slot in slots if slot.polarity == polarity] for polarity in self.config.POLARITIES[0]}
-        slots_by_polarity["None"] = [slot for slot in slots if not slot.polarity]
-        available_slots = slots.copy()
-        for mod in standard_mods:
-            # good polarity
-            slot = next((s for s in slots_by_polarity[mod["polarity"]] if s in available_slots), None)
-            if not slot:
-                # no polarity
-                slot = next((s for s in slots_by_polarity["None"] if s in available_slots), None)
-            if not slot:
-                # bad polarity
-                slot = next((s for s in slots if s.polarity != mod["polarity"] and s in available_slots), None)
-            # if we found a slot, add the mod to it
-            if slot:
-                slot.mod = mod
-                slot.cost = mod["actualDrain"] / (2 if slot.polarity == mod["polarity"] else 1 if slot.polarity == None else 0.5)
-                available_slots.remove(slot)
-        return available_slots
-
-
     def optimize_capacity(self, mod=None, remove=False):
         """
         Optimizes the capacity of this build by reordering the mods efficiently based on their polarities and the slots polarities.
         """
-        slots = self.slots.copy()
-        slots = [slot for slot in slots]
-        self.reset_slots(slots)
         mods = self.used_mods.copy()
         if mod:
             if remove:
                 mods.remove(mod)
             else:
                 mods.append(mod)
-        standard_mods, aura_mods, exilus_mods = [mod for mod in mods if mod["type"] == 0], [mod for mod in mods if mod["type"] == 1], [mod for mod in mods if mod["type"] == 2]
-        available_slots = self.add_aura_and_exilus_mods(slots, aura_mods, exilus_mods)
-        available_slots = self.add_standard_mods(available_slots, standard_mods)
-        
-        if (self.calculate_capacity()) > self.config.MAX_CAPACITY:
+        placement = self.config.MOD_MATRIX.place(mods, self.config.POLARITIES, self.config.MAX_MODS)
+        if self.config.MOD_MATRIX.cost(placement) > self.config.MAX_CAPACITY:
             return None
-        else:
-            return slots
+
+        slots = self.slots.copy()
+        self.reset_slots(slots)
+        available_slots = slots.copy()
+        for placed_mod, slot_type, polarity in placement:
+            slot = next(s for s in available_slots if s.type == slot_type and s.polarity == polarity)
+            slot.mod = placed_mod
+            slot.cost = self.config.MOD_MATRIX.slot_cost(placed_mod, polarity)
+            available_slots.remove(slot)
+        return slots
     
-    def calculate_modded_stats(self, modx=None):
+    def calculate_modded_stats(self):
         """
-        Calculates the modded stats of this build based on its stats and the used mods multiplier.
+        Returns the modded stats of this build by stat name, from its stat vector.
         """
-        modded_stats = {stat: self.config.BASE_STATS[stat] for stat in self.config.BASE_STATS}
-        for mod in self.used_mods if modx == None else self.used_mods + [modx]:
-            modded_stats = {stat: modded_stats[stat] + mod[stat] for stat in self.config.BASE_STATS}
-        return modded_stats
+        return dict(zip(self.config.OBJECTIVE.stats, self.stat_vector.tolist()))
 
                 
     
@@ -1,4 +1,7 @@
 import cProfile
+
+from Config.feasibility import InfeasibleGoalsError, check
+from .enumeration import BuildEnumerator
 from .greedy import GreedyAlgorithm
 from .greedybuild import GreedyBuild
 
@@ -6,31 +9,43 @@ class GreedyCalculator:
     """
     A class that calculates the best build for a given configuration using the Greedy Algorithm.
     """
-    def __init__(self, loader=None, config=None):
+    def __init__(self, loader=None, config=None, store=None):
         """
         Initializes the GreedyCalculator with a mod loader and a configuration.
 
         Args:
         - loader: a loader for the mods to be used in the build
         - config: a configuration object with the build parameters
+        - store: an optional BuildStore used to reuse and save solved builds
         """
         self.loader = loader
         self.config = config
+        self.store = store
         
-    def optimize_build(self):
+    def find_builds(self):
         """
-        Calculates the best build for the given configuration using the Greedy Algorithm.
+        Searches the best builds for the given configuration using the Greedy Algorithm, unless the same request
+        was already solved.
 
         Returns:
-        - The best build found
+        - The builds found, sorted by number of standard mods
+        - Whether the builds reach the goal stats, otherwise the list only holds the closest build found
+
+        Raises:
+        - InfeasibleGoalsError: if a goal stat is out of reach of every build, checked before searching
         """
+        check(self.config)
         best_builds = None
         best_build = None
         best_score = 0
         stuck = 0
+        stored_mods = self.store.get(self.config) if self.store else None
+        seeds = self.store.near(self.config, limit=1) if self.store and not stored_mods else []
+        if stored_mods:
+            best_builds = [self.create_build(stored_mods)]
         while not best_builds and stuck < 100:
             greedy_algorithm = GreedyAlgorithm(config=self.config)
-            initial_build = greedy_algorithm.create_initial_build()
+            initial_build = self.create_build(seeds[0]) if seeds and not stuck else greedy_algorithm.create_initial_build()
             remaining_mods = [mod for mod in self.config.MOD_DATABASE if mod['type'] == 0]
             last_build, best_result, best_builds = greedy_algorithm.backtrack(initial_build, remaining_mods, self.config.MAX_CAPACITY - initial_build.capacity, 0, [], 0.1)
             best_builds = [build for build in best_builds if greedy_algorithm.is_build_valid(build)]
@@ -43,9 +58,51 @@ class GreedyCalculator:
         
         if stuck == 100:
             best_builds = [best_build]
-            print(f" Unable to find a build with the desired stats, here is the best build I could find:")
     
         best_builds = sorted(best_builds, key=lambda build: build.sdnumber, reverse=False)
+        if self.store and not stored_mods and stuck < 100:
+            self.store.put(self.config, best_builds[0].used_mods, best_builds[0].stats, best_builds[0].capacity, 0, "greedy")
+        return best_builds, stuck < 100
+
+    def find_top_builds(self, k=None, min_difference=None, banned=()):
+        """
+        Enumerates the k best distinct builds for the given configuration, best first.
+
+        Args:
+        - k: the number of builds, config.TOP_BUILDS by default
+        - min_difference: the number of mods each build must have that every other build does not,
+          config.TOP_BUILDS_MIN_DIFFERENCE by default
+        - banned: the names of the mods no build may use
+
+        Returns:
+        - The builds found, from the best to the worst
+        - Whether the best build reaches the goal stats
+
+        Raises:
+        - InfeasibleGoalsError: if a goal stat is out of reach of every build, checked before searching
+        """
+        check(self.config)
+        k = self.config.TOP_BUILDS if k is None else k
+        min_difference = self.config.TOP_BUILDS_MIN_DIFFERENCE if min_difference is None else min_difference
+        best_builds = BuildEnumerator(self.config).enumerate(k, min_difference, banned)
+        found = bool(best_builds) and GreedyAlgorithm(config=self.config).is_build_valid(best_builds[0])
+        return best_builds, found
+
+    def optimize_build(self):
+        """
+        Calculates the best builds for the given configuration using the Greedy Algorithm and prints them, the
+        config.TOP_BUILDS best distinct ones when it is above 1.
+
+        Returns:
+        - The score of the best build found
+        """
+        try:
+            best_builds, found = self.find_top_builds() if self.config.TOP_BUILDS > 1 else self.find_builds()
+        except InfeasibleGoalsError as error:
+            print(error)
+            return None
+        if not found:
+            print(f" Unable to find a build with the desired stats, here is the best build I could find:")
         print(f"Best builds:")
         for i, build in enumerate(best_builds):
             print(f"GreedyBuild {i+1}:")
@@ -64,10 +121,29 @@ class GreedyCalculator:
                 print(f"    {slot.mod['name']} ({slot.cost} capacity on a{polarity} slot)")  
             print(f"  Capacity with polarities: {build.capacity}")
             print(f"  Stats: {build.stats}")
+            if self.config.PLACED_MODS:
+                print(f"  Required Mods: {[mod['name'] for mod, _, _, _ in self.config.PLACED_MODS]}")
+            if self.config.ARCHON_SHARD_SLOTS:
+                print(f"  Archon Shards: {list(self.config.OBJECTIVE.best_offset_name(build.stat_vector))}")
             print(f"  Mods used: {build.sdnumber}")
             print(f"  Score: {build.calculate_score()}")
             print()
-            return build.calculate_score()
+        return best_builds[0].calculate_score()
+
+    def create_build(self, mods):
+        """
+        Creates a build with the given mods.
+
+        Args:
+        - mods: the mods to add to the build, in order
+
+        Returns:
+        - The build with every mod that fits added
+        """
+        build = GreedyBuild(config=self.config)
+        for mod in mods:
+            build.add_mod(mod)
+        return build
             
 if __name__ == "__main__":
     profiler = cProfile.Profile()
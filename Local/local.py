@@ -0,0 +1,205 @@
+import numpy as np
+
+from Config.modmatrix import SetState
+from Genetic.build import Build
+from Greedy.greedybuild import GreedyBuild
+
+
+class LocalSearch:
+    """
+    A steepest-descent local search polishing a build of any engine.
+
+    Every removal, addition and single-mod swap of a build is scored at once as array operations against the stats
+    and capacity tables of the mod matrix, and scored by the objective of the config in one call. Moves are ranked
+    like builds: reaching the goal stats first, then the distance to them, the penalty, the number of mods and the
+    used capacity. The best ranked moves are checked exactly, the
+    first one improving the build is applied, and the search stops at a local optimum.
+
+    Attributes:
+    - config: the configuration object.
+    - max_moves: the maximum number of moves applied.
+    - pool: the mods that can be added or swapped in.
+    - moves: the number of moves applied by the last search.
+    """
+
+    def __init__(self, config=None, max_moves=100):
+        """
+        Precomputes the tables of the mod pool.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        - max_moves: the maximum number of moves applied.
+        """
+        self.config = config
+        self.max_moves = max_moves
+        self.moves = 0
+        matrix = config.MOD_MATRIX
+        self.objective = config.OBJECTIVE
+        self.pool = list(config.MOD_DATABASE)
+        self.pool_ids = np.array([mod["id"] for mod in self.pool], dtype=np.int64)
+        self.pool_types = np.array([mod["type"] for mod in self.pool], dtype=np.int64)
+        self.slot_limits = {0: config.MAX_MODS, 1: int(config.AURA_SLOT_FREE), 2: int(config.EXILUS_SLOT_FREE)}
+
+    def rank(self, distance, penalty, mods, capacity):
+        """
+        Returns the key used to compare builds, lower is better.
+
+        Args:
+        - distance: the distance of the build to the goal stats.
+        - penalty: the penalty of the build in the objective.
+        - mods: the number of mods of the build.
+        - capacity: the capacity used by the build.
+
+        Returns:
+        - The rank of the build as a tuple.
+        """
+        solved = distance < 0.001
+        return not solved, 0 if solved else round(float(distance), 9), round(float(penalty), 9), int(mods), int(capacity)
+
+    def is_valid(self, mods):
+        """
+        Returns whether a list of mods can be equipped together: no repeated mod or unique mod family, no more mods of
+        a type than slots for it, and within the capacity.
+        """
+        names = [mod["uniqueName"] for mod in mods]
+        if len(set(names)) != len(names):
+            return False
+        families = [word.capitalize() for mod in mods for word in mod["name"].split(" ")
+                    if word.capitalize() in self.config.UNIQUE_MOD_NAMES]
+        if len(set(families)) != len(families):
+            return False
+        if any(sum(mod["type"] == slot_type for mod in mods) > limit for slot_type, limit in self.slot_limits.items()):
+            return False
+        return self.config.MOD_MATRIX.capacity(mods, self.config.POLARITIES, self.config.MAX_MODS) <= self.config.MAX_CAPACITY
+
+    def exact_rank(self, mods):
+        """
+        Returns the rank of a list of mods, computing its stats and capacity exactly.
+        """
+        stats = self.objective.base + self.config.MOD_MATRIX.set_stats([mod["id"] for mod in mods])
+        capacity = self.config.MOD_MATRIX.capacity(mods, self.config.POLARITIES, self.config.MAX_MODS)
+        return self.rank(*self.objective.evaluate(stats), len(mods), capacity)
+
+    def candidate_moves(self, mods):
+        """
+        Scores every removal, addition and swap of a list of mods at once.
+
+        The capacity of a move is estimated from the current placement: a removed mod frees its slot, a swapped in
+        mod takes the slot of the mod it replaces, and an added mod takes its cheapest free slot.
+
+        Args:
+        - mods: the mods of the build.
+
+        Returns:
+        - A list of (rank, removed index, added pool index) moves, from the best ranked to the worst, an index being
+          None when the move does not remove or add a mod.
+        """
+        matrix = self.config.MOD_MATRIX
+        placement = matrix.place(mods, self.config.POLARITIES, self.config.MAX_MODS)
+        mods = [mod for mod, _, _ in placement]
+        ids = np.array([mod["id"] for mod in mods], dtype=np.int64)
+        mod_columns = np.array([matrix.columns.get(polarity, matrix.columns[None]) for _, _, polarity in placement], dtype=np.int64)
+        mod_costs = matrix.costs[ids, mod_columns] if len(mods) else np.zeros(0, dtype=np.int32)
+        mod_types = np.array([mod["type"] for mod in mods], dtype=np.int64)
+        sets = SetState(matrix)
+        stats = self.objective.base + sum((sets.apply(added=mod) for mod in ids.tolist()), np.zeros(matrix.stats.shape[1]))
+        capacity = int(mod_costs.sum())
+        in_build = np.isin(self.pool_ids, ids)
+
+        # Free slots of the layout, by their cost table column
+        free_columns = []
+        free = self.config.POLARITIES[0].copy()
+        for _, slot_type, polarity in placement:
+            if slot_type == 0 and polarity is not None:
+                free[polarity] -= 1
+        neutral = self.config.MAX_MODS - sum(self.config.POLARITIES[0].values()) - sum(
+            1 for _, slot_type, polarity in placement if slot_type == 0 and polarity is None)
+        free_columns += [matrix.columns[polarity] for polarity in free if free[polarity] > 0]
+        free_columns += [matrix.columns[None]] if neutral > 0 else []
+        pool_costs = matrix.costs[self.pool_ids]
+        add_costs = np.full(len(self.pool), np.iinfo(np.int32).max, dtype=np.int64)
+        if free_columns:
+            add_costs[self.pool_types == 0] = pool_costs[self.pool_types == 0][:, free_columns].min(axis=1)
+        for slot_type in [1, 2]:
+            column = matrix.columns.get(matrix.slot_polarity(self.config.POLARITIES, slot_type), matrix.columns[None])
+            add_costs[self.pool_types == slot_type] = pool_costs[self.pool_types == slot_type, column]
+        used = {slot_type: int((mod_types == slot_type).sum()) for slot_type in self.slot_limits}
+        can_add = ~in_build & np.array([used[slot_type] < self.slot_limits[slot_type] for slot_type in self.pool_types], dtype=bool)
+        if len(self.pool):
+            can_add &= add_costs != np.iinfo(np.int32).max
+
+        # Stat changes, set bonuses included: a swap removes a mod, then adds another to the remaining sets
+        removal_deltas = np.array([sets.delta(removed=mod) for mod in ids.tolist()]).reshape(len(mods), -1)
+        swap_deltas = np.empty((len(mods), len(self.pool), matrix.stats.shape[1]))
+        for i, mod in enumerate(ids.tolist()):
+            remaining = sets.copy()
+            remaining.apply(removed=mod)
+            swap_deltas[i] = removal_deltas[i] + remaining.deltas(self.pool_ids)
+
+        removal_distances, removal_penalties = self.objective.evaluate(stats + removal_deltas)
+        removal_capacities = capacity - mod_costs
+        addition_distances, addition_penalties = self.objective.evaluate(stats + sets.deltas(self.pool_ids))
+        addition_capacities = capacity + add_costs
+        swap_distances, swap_penalties = self.objective.evaluate(stats + swap_deltas)
+        swap_capacities = capacity - mod_costs[:, None] + pool_costs[:, mod_columns].T
+        can_swap = (mod_types[:, None] == self.pool_types[None, :]) & ~in_build[None, :]
+
+        moves = [(self.rank(removal_distances[i], removal_penalties[i], len(mods) - 1, removal_capacities[i]), i, None) for i in range(len(mods))]
+        moves += [(self.rank(addition_distances[j], addition_penalties[j], len(mods) + 1, addition_capacities[j]), None, j)
+                  for j in np.flatnonzero(can_add & (addition_capacities <= self.config.MAX_CAPACITY))]
+        for i, j in zip(*np.nonzero(can_swap & (swap_capacities <= self.config.MAX_CAPACITY))):
+            moves.append((self.rank(swap_distances[i, j], swap_penalties[i, j], len(mods), swap_capacities[i, j]), i, j))
+        moves.sort(key=lambda move: move[0])
+        return mods, moves
+
+    def improve_mods(self, mods):
+        """
+        Applies the best improving move to a list of mods until none improves it.
+
+        Args:
+        - mods: the mods of the build.
+
+        Returns:
+        - The improved list of mods.
+        """
+        mods = list(mods)
+        current = self.exact_rank(mods)
+        self.moves = 0
+        while self.moves < self.max_moves:
+            placed_mods, moves = self.candidate_moves(mods)
+            improved = None
+            for estimate, removed, added in moves:
+                if estimate >= current:
+                    break
+                candidate = [mod for i, mod in enumerate(placed_mods) if i != removed]
+                if added is not None:
+                    candidate.append(self.pool[added])
+                if not self.is_valid(candidate):
+                    continue
+                rank = self.exact_rank(candidate)
+                if rank < current:
+                    improved, current = candidate, rank
+                    break
+            if improved is None:
+                break
+            mods = improved
+            self.moves += 1
+        return mods
+
+    def improve(self, build):
+        """
+        Polishes a Build or a GreedyBuild.
+
+        Args:
+        - build: the build to polish, left unchanged.
+
+        Returns:
+        - A new build of the same class holding the improved mods.
+        """
+        if isinstance(build.used_mods, list):
+            mods, improved = build.used_mods, GreedyBuild(config=self.config)
+        else:
+            mods, improved = build.mods, Build(self.config, build.fitness_cache)
+        for mod in sorted(self.improve_mods(mods), key=lambda mod: (mod["type"] == 0, mod["type"] != 1)):
+            improved.add_mod(mod)
+        return improved
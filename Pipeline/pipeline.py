@@ -0,0 +1,243 @@
+import cProfile
+import time
+
+from Config.feasibility import InfeasibleGoalsError, check
+from Genetic.build import Build
+from Genetic.calculator import GeneticCalculator
+from Genetic.fitness import FitnessCache
+from Greedy.greedycalc import GreedyCalculator
+from Local.local import LocalSearch
+
+
+def build_rank(build):
+    """
+    Returns the key used to compare builds of the pipeline, lower is better: solved builds first, then the closest
+    to the goal stats, the lowest penalty, the fewest mods and the least capacity.
+
+    Args:
+    - build: the Build to rank.
+
+    Returns:
+    - The rank of the build as a tuple.
+    """
+    solved = build.stat_distance < 0.001
+    return not solved, 0 if solved else build.stat_distance, build.stat_penalty, build.total_used_mods, build.used_capacity
+
+
+class PipelineState:
+    """
+    The state passed from one stage of the pipeline to the next.
+
+    Attributes:
+    - config: the configuration object, whose precomputed mod database and capacity model every stage shares.
+    - fitness_cache: the FitnessCache shared by every stage evaluating Build objects.
+    - candidates: the mod lists found so far, used to seed the next stages.
+    - genomes: the canonical genomes of the candidates.
+    - best_build: the best Build found so far, None before any stage ran.
+    - timings: the (stage name, seconds) of every stage that ran.
+    - generations: the number of genetic generations run.
+    - population: the mod lists of the archive and the last population of the genetic stage.
+    """
+
+    def __init__(self, config, fitness_cache, candidates=None):
+        """
+        Initializes the state of a pipeline run.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        - fitness_cache: the FitnessCache shared by the stages.
+        - candidates: an optional list of mod lists to start from.
+        """
+        self.config = config
+        self.fitness_cache = fitness_cache
+        self.candidates = []
+        self.genomes = set()
+        self.best_build = None
+        self.timings = []
+        self.generations = 0
+        self.population = []
+        for mods in candidates or []:
+            self.offer(self.create_build(mods))
+
+    def create_build(self, mods):
+        """
+        Creates a Build from a list of mods, aura first so its capacity is available to the others, then the exilus.
+
+        Args:
+        - mods: the mods of the build.
+
+        Returns:
+        - The Build with every mod that fits added.
+        """
+        build = Build(self.config, self.fitness_cache)
+        for mod in sorted(mods, key=lambda mod: (mod["type"] == 0, mod["type"] != 1)):
+            build.add_mod(mod)
+        return build
+
+    def offer(self, build):
+        """
+        Adds a build to the candidates, and keeps it as the best build if it ranks better.
+
+        Args:
+        - build: the Build found by a stage.
+        """
+        if build.mods and build.genome() not in self.genomes:
+            self.genomes.add(build.genome())
+            self.candidates.append(tuple(build.mods))
+        if self.best_build is None or build_rank(build) < build_rank(self.best_build):
+            self.best_build = build
+
+
+class GreedyStage:
+    """
+    Runs the greedy algorithm and passes its builds on, including the closest build when none is solved.
+    """
+    name = "greedy"
+
+    def run(self, state):
+        """
+        Runs the stage.
+
+        Args:
+        - state: the PipelineState of the run.
+        """
+        best_builds, _ = GreedyCalculator(config=state.config).find_builds()
+        for greedy_build in best_builds:
+            state.offer(state.create_build(greedy_build.used_mods))
+
+
+class GeneticStage:
+    """
+    Runs the genetic algorithm, its initial population holding the candidates of the previous stages and random
+    builds for the rest. The stage is skipped when a previous stage already reached the goal stats.
+    """
+    name = "genetic"
+
+    def run(self, state):
+        """
+        Runs the stage.
+
+        Args:
+        - state: the PipelineState of the run.
+        """
+        if state.best_build is not None and state.best_build.stat_distance < 0.001:
+            return
+        calculator = GeneticCalculator(config=state.config, fitness_cache=state.fitness_cache)
+        state.offer(calculator.find_build(state.candidates))
+        state.generations += calculator.generations
+        state.population = calculator.population
+
+
+class LocalStage:
+    """
+    Polishes the best build with the local search, removing, adding and swapping mods while it improves.
+    """
+    name = "local"
+
+    def run(self, state):
+        """
+        Runs the stage.
+
+        Args:
+        - state: the PipelineState of the run.
+        """
+        if state.best_build is not None:
+            state.offer(LocalSearch(state.config).improve(state.best_build))
+
+
+class Pipeline:
+    """
+    Runs a sequence of optimization stages, each starting from the candidate builds and the shared precomputation
+    of the previous ones: the greedy algorithm, the genetic algorithm seeded with its builds, and a final local
+    improvement of the best build.
+    """
+
+    def __init__(self, loader=None, config=None, store=None, stages=None, fitness_cache=None):
+        """
+        Initializes the pipeline.
+
+        Args:
+        - loader: a loader for the mods to be used in the build.
+        - config: a configuration object with the build parameters.
+        - store: an optional BuildStore used to reuse and save solved builds.
+        - stages: the stages to run in order, the greedy, genetic and local stages by default.
+        - fitness_cache: an optional FitnessCache kept between runs, a new one by default.
+        """
+        self.loader = loader
+        self.config = config
+        self.store = store
+        self.stages = stages if stages is not None else [GreedyStage(), GeneticStage(), LocalStage()]
+        self.fitness_cache = fitness_cache if fitness_cache is not None else FitnessCache(config.FITNESS_CACHE_SIZE)
+
+    def run(self, seeds=None):
+        """
+        Runs every stage, unless the same request was already solved.
+
+        Args:
+        - seeds: an optional list of mod lists the stages start from, along with the stored near builds.
+
+        Returns:
+        - The PipelineState of the run, whose best_build is the result.
+
+        Raises:
+        - InfeasibleGoalsError: if a goal stat is out of reach of every build, checked before any stage runs.
+        """
+        check(self.config)
+        stored_mods = self.store.get(self.config) if self.store else None
+        if stored_mods:
+            return PipelineState(self.config, self.fitness_cache, [stored_mods])
+
+        seeds = list(seeds or []) + (self.store.near(self.config) if self.store else [])
+        state = PipelineState(self.config, self.fitness_cache, seeds)
+        for stage in self.stages:
+            start = time.perf_counter()
+            stage.run(state)
+            state.timings.append((stage.name, time.perf_counter() - start))
+
+        best_build = state.best_build
+        if self.store and best_build is not None and best_build.stat_distance < 0.001:
+            self.store.put(self.config, best_build.mods, best_build.modded_stats, best_build.used_capacity, best_build.stat_distance, "pipeline")
+        return state
+
+    def optimize_build(self):
+        """
+        Runs the pipeline and prints the best build along with the time spent in each stage.
+
+        Returns:
+        - The best Build found.
+        """
+        try:
+            state = self.run()
+        except InfeasibleGoalsError as error:
+            print(error)
+            return None
+        best_build = state.best_build
+        for name, dominating in self.config.PRUNED_MODS:
+            print(f"Pruned {name}, dominated by {dominating}")
+        for name, seconds in state.timings:
+            print(f"Stage {name}: {seconds:.2f}s")
+        print(f"Genetic generations: {state.generations}")
+        if best_build is None or best_build.stat_distance >= 0.001:
+            print(f"Unable to find a build with the desired stats, here is the best build I could find:")
+        if best_build is None:
+            return None
+        print(f"Modded Stats: {best_build.modded_stats}")
+        print(f"Mods: {[mod['name'] for mod in best_build.mods]}")
+        if self.config.PLACED_MODS:
+            print(f"Required Mods: {[mod['name'] for mod, _, _, _ in self.config.PLACED_MODS]}")
+        if self.config.ARCHON_SHARD_SLOTS:
+            print(f"Archon Shards: {list(self.config.OBJECTIVE.best_offset_name(best_build.stat_vector))}")
+        print(f"Used Capacity: {best_build.used_capacity}")
+        return best_build
+
+
+if __name__ == "__main__":
+    from Config import config, loader
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    pipeline = Pipeline(loader=loader, config=config)
+    pipeline.optimize_build()
+    profiler.disable()
+    profiler.print_stats(sort='cumtime')
+    profiler.dump_stats("profile.prof")
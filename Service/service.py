@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Config import config, feasibility, inventory, request
+from Config.snapshot import SnapshotManager
+from Genetic.calculator import GeneticCalculator
+from Greedy.greedycalc import GreedyCalculator
+from Store.store import BuildStore, fingerprint
+
+ENGINES = ["auto", "greedy", "genetic"]
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+               503: "Service Unavailable"}
+
+# Build store of the current worker process, opened by worker_init
+worker_store = None
+
+# Mod database snapshots of the current worker process, reloaded in the background
+worker_snapshots = None
+
+
+class SnapshotMismatchError(Exception):
+    """
+    Raised when a worker cannot load the mod database version a request was validated against.
+    """
+
+
+def worker_init(store_path):
+    """
+    Initializes a worker process, which loads the mod database once through the config import, reloads it when the
+    mods file changes and keeps its own connection to the build store.
+
+    Args:
+    - store_path: the path of the build store, or None to disable it.
+    """
+    global worker_store, worker_snapshots
+    worker_store = BuildStore(store_path) if store_path else None
+    worker_snapshots = SnapshotManager(config)
+    worker_snapshots.start()
+
+
+def describe(build, engine, found):
+    """
+    Returns the JSON representation of a build of any engine.
+
+    Args:
+    - build: a Build or GreedyBuild.
+    - engine: the name of the engine that found the build.
+    - found: whether the build reaches the goal stats.
+
+    Returns:
+    - A dictionary with the mods, stats and capacity of the build, including the mods placed before the search,
+      and the version of the mod database used.
+    """
+    if isinstance(build.used_mods, list):
+        mods, stats, capacity = build.used_mods, build.stats, build.capacity
+    else:
+        mods, stats, capacity = build.mods, build.modded_stats, build.used_capacity
+    mods = [mod for mod, _, _, _ in build.config.PLACED_MODS] + list(mods)
+    capacity += sum(cost for _, _, _, cost in build.config.PLACED_MODS)
+    return {
+        "engine": engine,
+        "found": found,
+        "aura": next((mod["name"] for mod in mods if mod["type"] == 1), None),
+        "exilus": next((mod["name"] for mod in mods if mod["type"] == 2), None),
+        "mods": [mod["name"] for mod in mods if mod["type"] == 0],
+        "stats": {stat: round(float(value), 4) for stat, value in stats.items()},
+        "capacity": float(capacity),
+        "version": build.config.MOD_DATABASE_VERSION,
+    }
+
+
+def solve(request_config, engine, store=None):
+    """
+    Solves a request with the given engine, auto running the greedy algorithm first and the genetic algorithm
+    only when the greedy build is close to the goal stats. The genetic algorithm is run at most
+    config.SERVICE_GENETIC_RESTARTS times, and its best build is returned as not found when none reaches the goals.
+
+    Args:
+    - request_config: the configuration of the request.
+    - engine: one of ENGINES.
+    - store: an optional BuildStore.
+
+    Returns:
+    - The JSON representation of the best build found.
+    """
+    if engine in ["auto", "greedy"]:
+        best_builds, found = GreedyCalculator(config=request_config, store=store).find_builds()
+        score = best_builds[0].calculate_score()
+        if engine == "greedy" or found or score <= 1.0:
+            return describe(best_builds[0], "greedy", found)
+    best_build = GeneticCalculator(config=request_config, store=store).find_build(max_restarts=request_config.SERVICE_GENETIC_RESTARTS)
+    return describe(best_build, "genetic", best_build.stat_distance < 0.001)
+
+
+def solve_request(overrides, engine, version):
+    """
+    Solves a validated request inside a worker process, with the mod database version it was validated against, so
+    its result matches the key it was coalesced and stored under.
+
+    Args:
+    - overrides: the configuration values of the request, from request.parse_request.
+    - engine: one of ENGINES.
+    - version: the mod database version the request was validated against.
+
+    Returns:
+    - The JSON representation of the best build found.
+
+    Raises:
+    - SnapshotMismatchError: if the worker cannot load that version, once its mods file is checked again.
+    """
+    snapshot = worker_snapshots.current
+    if snapshot.version != version:
+        worker_snapshots.poll()
+        snapshot = worker_snapshots.current
+    if snapshot.version != version:
+        raise SnapshotMismatchError(f"Mod database version {version} is no longer loaded, the worker uses {snapshot.version}")
+    return solve(inventory.apply(request.derive(snapshot.config, **overrides)), engine, worker_store)
+
+
+class OptimizerService:
+    """
+    A long-lived HTTP/JSON optimizer service.
+
+    The service keeps the mod database loaded, sends solves to a pool of worker processes and coalesces identical
+    concurrent requests onto a single computation. The service and every worker reload the mods file when it
+    changes: solves in flight finish on the version they started with, and a worker solves a new request with the
+    version the service validated it against, or rejects it when it cannot load that version.
+
+    Endpoints:
+    - POST /solve: solves the JSON request in the body.
+    - GET /health: reports whether the service is up and the loaded mod database version.
+    - GET /queue: reports the number of computations in flight and of requests waiting on them.
+    - GET /latency: reports solve latency statistics over the most recent requests.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, workers=2, store_path=None):
+        """
+        Initializes the service, without starting it.
+
+        Args:
+        - host: the address to listen on.
+        - port: the port to listen on, 0 to pick a free one.
+        - workers: the number of worker processes.
+        - store_path: the path of the build store shared by the workers, or None to disable it.
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.store_path = store_path
+        self.pool = None
+        self.server = None
+        self.in_flight = {}
+        self.waiting = 0
+        self.latencies = deque(maxlen=1000)
+        self.started = time.time()
+        self.snapshots = SnapshotManager(config)
+
+    async def start(self):
+        """
+        Starts the worker pool and begins listening.
+        """
+        # Spawned workers do not inherit the client sockets, which would otherwise stay open after a response
+        context = multiprocessing.get_context("spawn")
+        self.pool = ProcessPoolExecutor(self.workers, context, initializer=worker_init, initargs=(self.store_path,))
+        self.snapshots.start()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stops listening and shuts the worker pool down.
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self.pool.shutdown(cancel_futures=True)
+        self.snapshots.stop()
+
+    async def serve_forever(self):
+        """
+        Starts the service and serves requests until cancelled.
+        """
+        await self.start()
+        print(f"Optimizer service listening on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def request_key(self, payload):
+        """
+        Validates a request and returns the key identifying identical requests, along with the job solving it.
+
+        Args:
+        - payload: the JSON request.
+
+        Returns:
+        - The key: the fingerprint of the request configuration and the engine.
+        - The job: the arguments of solve_request, holding the mod database version the request was validated against.
+
+        Raises:
+        - ValueError: if the request is invalid, or has goal stats out of reach of every build.
+        """
+        engine = payload.get("engine", "auto")
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}")
+        snapshot = self.snapshots.current
+        overrides = request.parse_request(snapshot.config, payload)
+        request_config = inventory.apply(request.derive(snapshot.config, **overrides))
+        feasibility.check(request_config)
+        return (fingerprint(request_config), engine), (overrides, engine, snapshot.version)
+
+    async def solve(self, job, key):
+        """
+        Solves a request, joining the computation of an identical request already in flight.
+
+        Args:
+        - job: the job of the request, from request_key.
+        - key: the key of the request, from request_key.
+
+        Returns:
+        - The JSON representation of the best build found.
+        """
+        future = self.in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = asyncio.ensure_future(loop.run_in_executor(self.pool, solve_request, *job))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self.waiting -= 1
+            self.latencies.append(time.perf_counter() - start)
+
+    def latency(self):
+        """
+        Returns statistics over the most recent solve latencies, in seconds.
+        """
+        if not self.latencies:
+            return {"count": 0}
+        latencies = sorted(self.latencies)
+        return {
+            "count": len(latencies),
+            "mean": statistics.fmean(latencies),
+            "p50": latencies[len(latencies) // 2],
+            "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "max": latencies[-1],
+        }
+
+    async def route(self, method, path, body):
+        """
+        Dispatches a request to its endpoint.
+
+        Args:
+        - method: the HTTP method.
+        - path: the HTTP path.
+        - body: the raw request body.
+
+        Returns:
+        - The HTTP status and the JSON payload of the response.
+        """
+        if path == "/solve":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                payload = json.loads(body or b"{}")
+                # Validating a request prunes its mods and bounds its goals, which would stall the other endpoints
+                key, job = await asyncio.get_running_loop().run_in_executor(None, self.request_key, payload)
+            except (ValueError, TypeError, AttributeError) as error:
+                return 400, {"error": str(error)}
+            try:
+                return 200, await self.solve(job, key)
+            except SnapshotMismatchError as error:
+                return 503, {"error": str(error)}
+        if method != "GET":
+            return 405, {"error": "use GET"}
+        if path == "/health":
+            snapshot = self.snapshots.current
+            return 200, {"status": "ok", "version": snapshot.version, "loaded": snapshot.loaded, "reload_error": self.snapshots.error,
+                         "uptime": time.time() - self.started}
+        if path == "/queue":
+            return 200, {"in_flight": len(self.in_flight), "waiting": self.waiting}
+        if path == "/latency":
+            return 200, self.latency()
+        return 404, {"error": f"unknown path {path}"}
+
+    async def handle(self, reader, writer):
+        """
+        Reads one HTTP request from a connection, answers it and closes the connection.
+        """
+        try:
+            method, path, _ = (await reader.readline()).decode().split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            status, payload = await self.route(method, path.split("?")[0], body)
+        except (ValueError, asyncio.IncompleteReadError) as error:
+            status, payload = 400, {"error": str(error)}
+        except Exception as error:
+            status, payload = 500, {"error": repr(error)}
+
+        content = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode() + content
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the optimizer as a local HTTP/JSON service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--store", default=config.STORE_PATH, help="path of the build store, empty to disable it")
+    arguments = parser.parse_args()
+    service = OptimizerService(arguments.host, arguments.port, arguments.workers, arguments.store or None)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,154 @@
+import cProfile
+import time
+
+from Config import request
+from Genetic.fitness import FitnessCache
+from Pipeline.pipeline import LocalStage, Pipeline
+
+
+class Session:
+    """
+    Keeps the search state of a request between small edits, so a resubmitted request starts from the last one.
+
+    The session keeps the fitness cache, the candidate builds of every stage and the archive and last population
+    of the genetic algorithm. After an edit of the goal stats, the base stats or the maximum capacity, only what the
+    edit invalidates is thrown away: cached evaluations keep their capacity and are rescored with the new objective,
+    and the kept builds are rebuilt under the new request, dropping the mods that no longer fit. The kept builds are
+    first polished with the local search, and the full pipeline, seeded with them, only runs if that does not solve
+    the edited request. With snapshots, a new version of the mod database replaces the fitness cache, which is keyed
+    by mods, and keeps only the seeds whose mods are still in the database.
+
+    Attributes:
+    - loader: the loader for the mods to be used in the build.
+    - base: the configuration the edits are applied to.
+    - config: the configuration of the current request.
+    - store: an optional BuildStore used to reuse and save solved builds.
+    - snapshots: an optional SnapshotManager whose current snapshot the base configuration follows.
+    - request: the request fields changed by the edits so far.
+    - fitness_cache: the FitnessCache kept between runs.
+    - seeds: the mod lists of the last run, best builds first.
+    - best_build: the best Build of the last run, None before the first run.
+    - timings: the (step name, seconds) of the last run.
+    """
+
+    def __init__(self, loader=None, config=None, store=None, snapshots=None):
+        """
+        Initializes a session, without running any search yet.
+
+        Args:
+        - loader: a loader for the mods to be used in the build.
+        - config: a configuration object with the build parameters.
+        - store: an optional BuildStore used to reuse and save solved builds.
+        - snapshots: an optional SnapshotManager, whose current snapshot replaces config as the base configuration.
+        """
+        self.loader = loader
+        self.base = snapshots.current.config if snapshots else config
+        self.config = self.base
+        self.store = store
+        self.snapshots = snapshots
+        self.request = {}
+        self.fitness_cache = FitnessCache(self.config.FITNESS_CACHE_SIZE)
+        self.seeds = []
+        self.best_build = None
+        self.timings = []
+
+    def solve(self):
+        """
+        Solves the current request, starting from the state of the last run if any.
+
+        Returns:
+        - The best Build found.
+        """
+        self.timings = []
+        if self.snapshots and self.snapshots.current.version != self.base.MOD_DATABASE_VERSION:
+            self.follow(self.snapshots.current)
+        state = None
+        if self.seeds:
+            state = self.run("local", [LocalStage()], self.seeds)
+        if state is None or state.best_build is None or state.best_build.stat_distance >= 0.001:
+            state = self.run("pipeline", None, state.candidates if state else self.seeds)
+        self.seeds = list(state.candidates) + list(state.population)
+        self.best_build = state.best_build
+        return self.best_build
+
+    def follow(self, snapshot):
+        """
+        Moves the session to a new snapshot of the mod database, keeping the edits of the request.
+
+        Args:
+        - snapshot: the Snapshot to use.
+        """
+        self.base = snapshot.config
+        self.config = request.from_request(self.base, self.request)
+        self.fitness_cache = FitnessCache(self.config.FITNESS_CACHE_SIZE)
+        mods = {mod["uniqueName"]: mod for mod in self.config.LOADED_MODS}
+        self.seeds = [[mods[mod["uniqueName"]] for mod in seed] for seed in self.seeds if all(mod["uniqueName"] in mods for mod in seed)]
+        self.best_build = None
+
+    def run(self, name, stages, seeds):
+        """
+        Runs a pipeline sharing the fitness cache of the session and times it.
+
+        Args:
+        - name: the name of the step in the timings.
+        - stages: the stages of the pipeline, None for the default ones.
+        - seeds: the mod lists the stages start from.
+
+        Returns:
+        - The PipelineState of the run.
+        """
+        start = time.perf_counter()
+        pipeline = Pipeline(loader=self.loader, config=self.config, store=self.store, stages=stages, fitness_cache=self.fitness_cache)
+        state = pipeline.run(seeds)
+        self.timings.append((name, time.perf_counter() - start))
+        return state
+
+    def update(self, goal_stats=None, base_stats=None, max_capacity=None):
+        """
+        Applies an edit to the request and solves it again from the state of the last run.
+
+        Args:
+        - goal_stats: the goal stats to change, merged into the current ones.
+        - base_stats: the base stats to change, merged into the current ones.
+        - max_capacity: the new maximum capacity.
+
+        Returns:
+        - The best Build found for the edited request.
+
+        Raises:
+        - ValueError: if the edit names unknown stats or an invalid capacity.
+        - InfeasibleGoalsError: if the edited goal stats are out of reach of every build.
+        """
+        edited = dict(self.request)
+        if goal_stats is not None:
+            edited["goal_stats"] = {**self.config.GOAL_STATS, **goal_stats}
+        if base_stats is not None:
+            edited["base_stats"] = {**self.config.BASE_STATS, **base_stats}
+        if max_capacity is not None:
+            edited["max_capacity"] = max_capacity
+        config = request.from_request(self.base, edited)
+        changed = [name for name in ["GOAL_STATS", "BASE_STATS", "MAX_CAPACITY"] if getattr(config, name) != getattr(self.config, name)]
+        if not changed and self.best_build is not None:
+            return self.best_build
+
+        previous, self.config, self.request = self.config, config, edited
+        if "GOAL_STATS" in changed or "BASE_STATS" in changed:
+            self.fitness_cache.rescore(config.OBJECTIVE, config.OBJECTIVE.base - previous.OBJECTIVE.base)
+        return self.solve()
+
+
+if __name__ == "__main__":
+    from Config import config, loader
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    session = Session(loader=loader, config=config)
+    session.solve()
+    print(f"First run: {session.timings}")
+    strength = config.GOAL_STATS.get("Strength", 1.0) + 0.1
+    best_build = session.update(goal_stats={"Strength": strength})
+    print(f"Strength {strength:.2f}: {session.timings}")
+    print(f"Mods: {[mod['name'] for mod in best_build.mods]}")
+    profiler.disable()
+    profiler.print_stats(sort='cumtime')
+    profiler.dump_stats("profile.prof")
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+
+def normalize(stats):
+    """
+    Returns a stat dictionary with sorted keys and rounded values, so equal requests serialize identically.
+
+    Args:
+    - stats: a dictionary of stat values.
+
+    Returns:
+    - The normalized dictionary.
+    """
+    return {stat: round(float(stats[stat]), 4) for stat in sorted(stats)}
+
+
+def layout_key(config):
+    """
+    Returns the key of the parts of a request that a stored build must share to be reused as a seed: polarities,
+    capacity, slots and mod database version.
+
+    Args:
+    - config: a configuration object with the build parameters.
+
+    Returns:
+    - The layout key as a hexadecimal string.
+    """
+    layout = {
+        "polarities": {str(slot_type): config.POLARITIES[slot_type] for slot_type in config.POLARITIES},
+        "capacity": config.MAX_CAPACITY,
+        "max_mods": config.MAX_MODS,
+        "aura": config.AURA_SLOT_FREE,
+        "exilus": config.EXILUS_SLOT_FREE,
+        "version": config.MOD_DATABASE_VERSION,
+    }
+    return hashlib.sha1(json.dumps(layout, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint(config):
+    """
+    Returns the fingerprint of a request, identical for every request that must produce the same builds.
+
+    Args:
+    - config: a configuration object with the build parameters.
+
+    Returns:
+    - The fingerprint as a hexadecimal string.
+    """
+    request = {
+        "layout": layout_key(config),
+        "goals": normalize(config.GOAL_STATS),
+        "base": normalize(config.BASE_STATS),
+        "objective": {
+            "weights": normalize(config.GOAL_WEIGHTS),
+            "soft": sorted(config.SOFT_GOALS),
+            "overshoot": normalize(config.OVERSHOOT_WEIGHTS),
+            "caps": normalize(config.STAT_CAPS),
+            "floors": normalize(config.STAT_FLOORS),
+        },
+        "shards": {
+            "slots": config.ARCHON_SHARD_SLOTS,
+            "options": {name: normalize(stats) for name, stats in config.ARCHON_SHARD_OPTIONS.items()} if config.ARCHON_SHARD_SLOTS else {},
+        },
+    }
+    return hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+class BuildStore:
+    """
+    A local SQLite store of solved builds, keyed by request fingerprint.
+
+    Exact hits let a calculator return a stored build without searching, and builds solved for the same layout
+    with slightly different goals are returned as seeds for a new search.
+    """
+
+    def __init__(self, path="builds.db"):
+        """
+        Opens the store, creating its table if needed.
+
+        Args:
+        - path: the path of the SQLite database file.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS builds ("
+                "fingerprint TEXT NOT NULL, layout TEXT NOT NULL, goals TEXT NOT NULL, mods TEXT NOT NULL, "
+                "stats TEXT NOT NULL, used_mods INTEGER NOT NULL, capacity REAL NOT NULL, distance REAL NOT NULL, "
+                "engine TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (fingerprint, mods))"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS builds_layout ON builds (layout)")
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(builds)")]
+            if "version" not in columns:
+                self.connection.execute("ALTER TABLE builds ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+
+    def get(self, config):
+        """
+        Returns the best build stored for exactly this request.
+
+        Args:
+        - config: a configuration object with the build parameters.
+
+        Returns:
+        - The list of mods of the stored build, or None if the request was never solved.
+        """
+        row = self.connection.execute(
+            "SELECT mods FROM builds WHERE fingerprint = ? ORDER BY used_mods, capacity LIMIT 1",
+            (fingerprint(config),),
+        ).fetchone()
+        if not row:
+            return None
+        return self.resolve(config, json.loads(row[0]))
+
+    def near(self, config, limit=10):
+        """
+        Returns builds solved for the same layout with goals close to the ones of this request.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        - limit: the maximum number of builds returned.
+
+        Returns:
+        - A list of mod lists, from the closest goals to the furthest.
+        """
+        goals = normalize(config.GOAL_STATS)
+        candidates = []
+        rows = self.connection.execute("SELECT goals, mods FROM builds WHERE layout = ?", (layout_key(config),))
+        for stored_goals, mods in rows:
+            stored_goals = json.loads(stored_goals)
+            if stored_goals.keys() != goals.keys():
+                continue
+            difference = max(abs(goals[stat] - stored_goals[stat]) for stat in goals)
+            if difference <= config.STORE_NEAR_DISTANCE:
+                candidates.append((difference, mods))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        builds = [self.resolve(config, json.loads(mods)) for _, mods in candidates[:limit]]
+        return [build for build in builds if build]
+
+    def put(self, config, mods, stats, capacity, distance, engine):
+        """
+        Stores a solved build for this request.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        - mods: the mods used in the build.
+        - stats: the modded stats of the build.
+        - capacity: the capacity used by the build.
+        - distance: the distance between the build stats and the goal stats.
+        - engine: the name of the engine that found the build.
+        """
+        names = sorted(mod["uniqueName"] for mod in mods)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO builds (fingerprint, layout, goals, mods, stats, used_mods, capacity, distance, engine, "
+                "created, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (fingerprint(config), layout_key(config), json.dumps(normalize(config.GOAL_STATS)), json.dumps(names),
+                 json.dumps(normalize(stats)), len(mods), float(capacity), float(distance), engine, time.time(),
+                 config.MOD_DATABASE_VERSION),
+            )
+
+    def resolve(self, config, names):
+        """
+        Maps stored unique names back to the mods of the configuration.
+
+        Args:
+        - config: a configuration object with the build parameters.
+        - names: the unique names of the stored mods.
+
+        Returns:
+        - The list of mods, aura first so its capacity is available to the others, or None if any of them is no
+          longer in the mod database.
+        """
+        mods_by_name = {mod["uniqueName"]: mod for mod in config.MOD_DATABASE}
+        if any(name not in mods_by_name for name in names):
+            return None
+        return sorted([mods_by_name[name] for name in names], key=lambda mod: (mod["type"] == 0, mod["type"] != 1))
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        self.connection.close()
@@ -0,0 +1,248 @@
+import argparse
+import cProfile
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Config import feasibility, request
+from Genetic.fitness import FitnessCache
+from Genetic.genetics import GeneticAlgorithm
+from Pipeline.pipeline import GreedyStage, LocalStage, Pipeline
+
+# Configuration and stat bounds of the sweep a worker process solves rows of
+worker_sweep = None
+
+
+class GeneticRunStage:
+    """
+    Runs the genetic algorithm once, its initial population holding the candidates of the previous stages, instead
+    of restarting it until the goals are reached, so a point past the frontier ends.
+    """
+    name = "genetic"
+
+    def run(self, state):
+        """
+        Runs the stage.
+
+        Args:
+        - state: the PipelineState of the run.
+        """
+        genetic_algorithm = GeneticAlgorithm(state.config, state.fitness_cache, state.candidates)
+        state.offer(genetic_algorithm.run_genetic_algorithm())
+        state.generations += genetic_algorithm.generations
+        state.population = [tuple(build.mods) for build in genetic_algorithm.best_builds]
+        state.population += [tuple(build.mods) for build in genetic_algorithm.population if build.mods]
+
+
+class GoalSweep:
+    """
+    Sweeps one or two goal stats over a grid, finding the best build of every point and the frontier of the goals
+    that can be reached together.
+
+    The grid is split in rows, one per value of the first stat, each sweeping the last stat upwards. A row keeps one
+    fitness cache, rescored at every point, and starts every point from the builds of the previous one: they often
+    already reach the new goals, or only need the local search, and the full search, seeded with them, only runs
+    otherwise. The upper bound of every stat is computed once for the whole sweep, and the points above it are
+    reported as infeasible without searching. Once a point of a row is not solved, the harder points after it are
+    reported as unsolved without searching either. Rows are spread across processes.
+
+    Attributes:
+    - config: the configuration the goal stats are swept from.
+    - axes (dict): the values of each swept stat, in the order of the axes.
+    - bounds (dict): the highest reachable value of every goal stat, for the goals alone.
+    """
+
+    def __init__(self, config=None, axes=None):
+        """
+        Initializes the sweep.
+
+        Args:
+        - config: a configuration object with the build parameters, whose other goal stats stay fixed.
+        - axes: the values of each swept stat, one or two stats.
+
+        Raises:
+        - ValueError: if there are no axes or more than two, or an axis is not a stat.
+        - InfeasibleGoalsError: if a goal stat that is not swept is out of reach of every build.
+        """
+        if not axes or len(axes) > 2 or any(stat not in config.BASE_STATS for stat in axes):
+            raise ValueError(f"A sweep varies one or two stats among {list(config.BASE_STATS)}")
+        self.axes = {stat: sorted(values) for stat, values in axes.items()}
+        self.config = request.derive(config, GOAL_STATS={**config.GOAL_STATS, **{stat: values[0] for stat, values in self.axes.items()}})
+        self.bounds = feasibility.stat_bounds(self.config)
+        # Swept stats above their bound are infeasible points, only the fixed goal stats fail the whole sweep
+        objective = self.config.OBJECTIVE
+        shortfalls = {stat: goal - self.bounds[stat] for stat, goal in self.config.GOAL_STATS.items()
+                      if stat not in self.axes and objective.hard_weights[objective.stats.index(stat)] > 0 and goal > self.bounds[stat] + 1e-9}
+        if shortfalls:
+            raise feasibility.InfeasibleGoalsError(shortfalls, self.bounds)
+
+    def rows(self):
+        """
+        Returns the goal stats of every point, one list per value of the first stat, sorted by the last stat.
+        """
+        stats = list(self.axes)
+        firsts = [{stats[0]: value} for value in self.axes[stats[0]]] if len(stats) == 2 else [{}]
+        return [[{**self.config.GOAL_STATS, **first, stats[-1]: value} for value in self.axes[stats[-1]]] for first in firsts]
+
+    def solve_row(self, points, seeds=()):
+        """
+        Solves the points of a row, from the lowest goals to the highest.
+
+        Args:
+        - points: the goal stats of each point.
+        - seeds: an optional list of mod lists the first point starts from.
+
+        Returns:
+        - The result of every point, as returned by describe_point.
+        - The mods of the build of the lowest solved point, to start the next row from, None if no point was solved.
+        """
+        fitness_cache = FitnessCache(self.config.FITNESS_CACHE_SIZE)
+        seeds = list(seeds)
+        results = []
+        first_solved = None
+        searching = True
+        for goals in points:
+            start = time.perf_counter()
+            if any(goals[stat] > self.bounds[stat] + 1e-9 for stat in self.axes):
+                results.append(self.describe_point(goals, "infeasible", None, start))
+                continue
+            if not searching:
+                results.append(self.describe_point(goals, "unsolved", None, start))
+                continue
+            config = request.derive(self.config, GOAL_STATS=goals)
+            fitness_cache.rescore(config.OBJECTIVE)
+            state = Pipeline(config=config, stages=[LocalStage()], fitness_cache=fitness_cache).run(seeds)
+            if state.best_build is None or state.best_build.stat_distance >= 0.001:
+                stages = [GreedyStage(), GeneticRunStage(), LocalStage()]
+                state = Pipeline(config=config, stages=stages, fitness_cache=fitness_cache).run(state.candidates)
+            searching = state.best_build is not None and state.best_build.stat_distance < 0.001
+            seeds = list(state.candidates) + list(state.population)
+            if searching and first_solved is None:
+                first_solved = list(state.best_build.mods)
+            results.append(self.describe_point(goals, "solved" if searching else "unsolved", state.best_build, start))
+        return results, first_solved
+
+    def describe_point(self, goals, status, build, start):
+        """
+        Returns the result of a point.
+
+        Args:
+        - goals: the goal stats of the point.
+        - status: "solved", "unsolved" when no build reaching the goals was found, or "infeasible" when a goal
+          stat is above its bound.
+        - build: the best Build found, None if the point was not searched.
+        - start: the time the point started at, from time.perf_counter.
+
+        Returns:
+        - A dictionary with the swept goal stats, the status, the mods, stats and capacity of the build, and the
+          seconds spent.
+        """
+        return {
+            "goals": {stat: goals[stat] for stat in self.axes},
+            "status": status,
+            "mods": [mod["name"] for mod in build.mods] if build is not None else None,
+            "stats": {stat: round(float(value), 4) for stat, value in build.modded_stats.items()} if build is not None else None,
+            "capacity": build.used_capacity if build is not None else None,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def run(self, processes=None):
+        """
+        Solves every point of the grid.
+
+        Args:
+        - processes: the number of processes the rows are spread across, config.SWEEP_PROCESSES by default. With
+          a single process, each row also starts from the builds of the previous row.
+
+        Returns:
+        - The result of every point, row by row.
+        """
+        rows = self.rows()
+        processes = min(processes or self.config.SWEEP_PROCESSES, len(rows))
+        if processes > 1:
+            matrix = self.config.MOD_MATRIX.share()
+            try:
+                sweep = GoalSweep.__new__(GoalSweep)
+                sweep.axes, sweep.bounds = self.axes, self.bounds
+                sweep.config = request.derive(self.config, MOD_MATRIX=matrix)
+                with ProcessPoolExecutor(processes, initializer=worker_init, initargs=(sweep,)) as pool:
+                    return [row_results for row_results, _ in pool.map(run_worker_row, rows)]
+            finally:
+                matrix.release()
+        results = []
+        seeds = []
+        for row in rows:
+            row_results, first_solved = self.solve_row(row, seeds)
+            results.append(row_results)
+            seeds = [first_solved] if first_solved else seeds
+        return results
+
+    def frontier(self, results):
+        """
+        Returns the feasibility frontier of a sweep: the highest value of the last stat solved in every row.
+
+        Args:
+        - results: the result of every point, as returned by run.
+
+        Returns:
+        - A list of (swept goal stats, solved build) pairs, one per row with a solved point.
+        """
+        frontier = []
+        for row in results:
+            solved = [result for result in row if result["status"] == "solved"]
+            if solved:
+                highest = max(solved, key=lambda result: result["goals"][list(self.axes)[-1]])
+                frontier.append((highest["goals"], highest))
+        return frontier
+
+
+def worker_init(sweep):
+    """
+    Initializes a worker process with the sweep whose rows it solves.
+    """
+    global worker_sweep
+    worker_sweep = sweep
+
+
+def run_worker_row(points):
+    """
+    Solves a row of the sweep of the worker process.
+    """
+    return worker_sweep.solve_row(points)
+
+
+def axis(text):
+    """
+    Parses a sweep axis of the command line, STAT=START:STOP:COUNT.
+    """
+    stat, values = text.split("=")
+    start, stop, count = values.split(":")
+    return stat, np.linspace(float(start), float(stop), int(count)).round(6).tolist()
+
+
+if __name__ == "__main__":
+    from Config import config, inventory
+
+    parser = argparse.ArgumentParser(description="Sweeps one or two goal stats and prints the reachable frontier.")
+    parser.add_argument("axes", type=axis, nargs="+", help="STAT=START:STOP:COUNT, one or two of them")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--profile", action="store_true")
+    arguments = parser.parse_args()
+    profiler = cProfile.Profile()
+    if arguments.profile:
+        profiler.enable()
+    start = time.perf_counter()
+    sweep = GoalSweep(inventory.apply(config), dict(arguments.axes))
+    results = sweep.run(arguments.processes)
+    for row in results:
+        for result in row:
+            print(f"{result['goals']}: {result['status']} in {result['seconds']:.2f}s {result['mods'] or ''}")
+    for goals, result in sweep.frontier(results):
+        print(f"Frontier {goals}: {result['mods']}")
+    print(f"Sweep time: {time.perf_counter() - start:.2f}s")
+    if arguments.profile:
+        profiler.disable()
+        profiler.print_stats(sort='cumtime')
+        profiler.dump_stats("profile.prof")
@@ -1,10 +1,9 @@
-from Genetic import calculator
-from Greedy import greedycalc
-from Config import loader, config
+from Config import loader, config, inventory
+from Pipeline.pipeline import Pipeline
+from Store.store import BuildStore
 
 if __name__ == "__main__":
-    gc = greedycalc.GreedyCalculator(loader=loader, config=config)
-    rs = gc.optimize_build()
-    if rs > 1.0 and rs != 9999:
-        gc2 = calculator.GeneticCalculator(loader=loader, config=config)
-        gc2.optimize_build()
\ No newline at end of file
+    store = BuildStore(config.STORE_PATH)
+    pipeline = Pipeline(loader=loader, config=inventory.apply(config), store=store)
+    pipeline.optimize_build()
+    store.close()
\ No newline at end of file
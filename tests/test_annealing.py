@@ -0,0 +1,26 @@
+from Config import request
+from Annealing.annealing import SimulatedAnnealing
+from Local.local import LocalSearch
+
+
+def test_chain_is_deterministic_for_a_seed_and_valid(config):
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    annealing = SimulatedAnnealing(derived, steps=2000)
+    energy, ids = annealing.run(seed=5)
+    assert annealing.run(seed=5) == (energy, ids)
+    assert LocalSearch(derived).is_valid([derived.LOADED_MODS[mod] for mod in ids])
+
+
+def test_find_build_keeps_a_chain_that_fills_every_slot(config, monkeypatch):
+    from Annealing.calculator import AnnealingCalculator
+
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    mods_by_name = {mod["name"]: mod for mod in derived.MOD_DATABASE}
+    names = ["Augur Message", "Augur Reach", "Augur Secrets", "Blind Rage", "Continuity", "Intensify",
+             "Overextended", "Stretch", "Power Drift", "Growing Power"]
+    ids = [mods_by_name[name]["id"] for name in names]
+    calculator = AnnealingCalculator(config=derived)
+    monkeypatch.setattr(calculator, "run_chains", lambda seeds: [(0.0, ids)])
+    build = calculator.find_build()
+    assert sorted(mod["name"] for mod in build.mods) == sorted(names)
+    assert (build.used_mods, build.used_aura, build.used_exilus) == (8, True, True)
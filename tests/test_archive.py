@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from Genetic.archive import EliteArchive
+
+
+def build(genome, used_mods, used_capacity):
+    return SimpleNamespace(genome=lambda: genome, total_used_mods=used_mods, used_capacity=used_capacity)
+
+
+def test_builds_are_stored_once_per_genome():
+    archive = EliteArchive(4)
+    assert archive.add(build(("a", "b"), 2, 10))
+    assert not archive.add(build(("a", "b"), 2, 10))
+    assert len(archive) == 1
+    assert build(("a", "b"), 2, 10) in archive
+
+
+def test_full_archive_evicts_its_worst_build_for_a_better_one():
+    archive = EliteArchive(2)
+    archive.add(build(("a",), 3, 10))
+    archive.add(build(("b",), 2, 20))
+    assert not archive.add(build(("c",), 3, 15))
+    assert archive.add(build(("d",), 2, 5))
+    assert sorted(archive.builds) == [("b",), ("d",)]
+    assert [stored.genome() for stored in archive.top(2)] == [("d",), ("b",)]
+    assert archive.minimum_used_mods == 2
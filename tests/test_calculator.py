@@ -0,0 +1,23 @@
+from Config import feasibility, request
+from Genetic.calculator import GeneticCalculator
+
+
+def test_goals_unreachable_together_end_after_the_restarts(config):
+    bounds = feasibility.stat_bounds(config)
+    goals = {"Range": bounds["Range"], "Strength": bounds["Strength"], "Duration": bounds["Duration"]}
+    derived = request.derive(config, GOAL_STATS=goals, GENETIC_POPULATION_SIZE=30, GENETIC_MAX_GENERATIONS=5)
+    calculator = GeneticCalculator(config=derived)
+    build = calculator.find_build(max_restarts=2)
+    assert build.stat_distance > 0.1
+    assert calculator.generations <= 10
+
+
+def test_restarts_are_bounded_by_default(config):
+    bounds = feasibility.stat_bounds(config)
+    goals = {"Range": bounds["Range"], "Strength": bounds["Strength"], "Duration": bounds["Duration"]}
+    derived = request.derive(config, GOAL_STATS=goals, GENETIC_POPULATION_SIZE=30, GENETIC_MAX_GENERATIONS=5, GENETIC_MAX_RESTARTS=2)
+    calculator = GeneticCalculator(config=derived)
+    build = calculator.find_build()
+    assert build.stat_distance > 0.1
+    assert calculator.generations <= 10
+    assert config.GENETIC_MAX_RESTARTS is not None
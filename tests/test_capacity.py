@@ -0,0 +1,27 @@
+from Config import request
+from Genetic.build import Build
+from Greedy.greedybuild import GreedyBuild
+
+
+def test_both_engines_keep_an_aura_whose_removal_exceeds_the_capacity(config):
+    aura = next(mod for mod in config.LOADED_MODS if mod["name"] == "Physique")
+    mismatch = next(polarity for polarity in config.POLARITIES[1] if polarity != aura["polarity"])
+    polarities = {slot_type: config.POLARITIES[slot_type].copy() for slot_type in config.POLARITIES}
+    polarities[1] = {polarity: int(polarity == mismatch) for polarity in config.POLARITIES[1]}
+    standard = next(mod for mod in config.LOADED_MODS if mod["name"] == "Stretch")
+    aura_cost = config.MOD_MATRIX.slot_cost(aura, mismatch)
+    standard_cost = config.MOD_MATRIX.capacity([standard], polarities, config.MAX_MODS)
+    derived = request.derive(config, POLARITIES=polarities, MAX_CAPACITY=standard_cost + aura_cost // 2)
+
+    greedy_build = GreedyBuild(derived)
+    greedy_build.add_mod(aura)
+    greedy_build.add_mod(standard)
+    greedy_build.remove_mod_mod(aura)
+    build = Build(derived)
+    build.add_mod(aura)
+    build.add_mod(standard)
+    build.remove_mod(aura)
+
+    assert [mod["name"] for mod in greedy_build.used_mods] == ["Physique", "Stretch"]
+    assert [mod["name"] for mod in build.mods] == ["Physique", "Stretch"]
+    assert greedy_build.capacity == build.used_capacity == standard_cost + aura_cost
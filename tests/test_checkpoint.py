@@ -0,0 +1,53 @@
+import random
+import shutil
+
+import numpy as np
+import pytest
+
+from Config import request
+from Genetic import checkpoint
+from Genetic.genetics import GeneticAlgorithm
+
+GOALS = {"Range": 2.0, "Strength": 1.6, "Duration": 1.3, "Efficiency": 0.8, "Sprint Speed": 1.0}
+
+
+def state(genetic_algorithm):
+    return [build.genome() for build in genetic_algorithm.population], sorted(genetic_algorithm.best_builds.builds), genetic_algorithm.generations
+
+
+def test_genomes_round_trip():
+    genomes = [(3, 1, 4), (), (1, 5, 9, 2, 6)]
+    assert [tuple(genome) for genome in checkpoint.unpack_genomes(*checkpoint.pack_genomes(genomes))] == genomes
+
+
+def test_resumed_run_matches_the_uninterrupted_run(config, tmp_path):
+    derived = request.derive(config, GOAL_STATS=GOALS)
+    parameters = {"population_size": 40, "max_generations": 8, "stall_generations": 40, "archive_target": 1000}
+    random.seed(3)
+    np.random.seed(3)
+    genetic_algorithm = GeneticAlgorithm(derived, **parameters)
+    save_checkpoint = genetic_algorithm.save_checkpoint
+
+    def save(path):
+        save_checkpoint(path)
+        if genetic_algorithm.generations == 4:
+            shutil.copy(path, tmp_path / "generation4.npz")
+
+    genetic_algorithm.save_checkpoint = save
+    best_build = genetic_algorithm.run_genetic_algorithm(str(tmp_path / "run.npz"), 2)
+
+    random.seed(99)
+    np.random.seed(99)
+    resumed = GeneticAlgorithm(derived, checkpoint_path=str(tmp_path / "generation4.npz"), **parameters)
+    assert resumed.generations == 4
+    resumed_best_build = resumed.run_genetic_algorithm()
+    assert state(resumed) == state(genetic_algorithm)
+    assert resumed_best_build.genome() == best_build.genome()
+
+
+def test_checkpoint_of_another_population_size_is_rejected(config, tmp_path):
+    derived = request.derive(config, GOAL_STATS=GOALS)
+    genetic_algorithm = GeneticAlgorithm(derived, population_size=40, max_generations=1)
+    genetic_algorithm.save_checkpoint(str(tmp_path / "run.npz"))
+    with pytest.raises(ValueError):
+        GeneticAlgorithm(derived, population_size=50, checkpoint_path=str(tmp_path / "run.npz"))
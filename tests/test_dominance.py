@@ -0,0 +1,33 @@
+from Config import dominance, feasibility, request
+
+
+def mod(name, drain, polarity="naramon", mod_type=0, **stats):
+    values = {stat: 0.0 for stat in ["Range", "Duration", "Efficiency", "Strength"]}
+    values.update(stats)
+    return {"name": name, "actualDrain": drain, "polarity": polarity, "type": mod_type, **values}
+
+
+def test_mod_dominated_by_fewer_mods_than_slots_is_kept():
+    mods = [mod("Streamline", 9, Efficiency=0.3), mod("Fleeting Expertise", 9, Efficiency=0.6, Duration=-0.6)]
+    kept, pruned = dominance.prune_dominated(mods, {"Efficiency": 1.85}, [], max_mods=8)
+    assert kept == mods
+    assert pruned == []
+
+
+def test_mod_dominated_by_enough_mods_is_pruned():
+    mods = [mod("Weak", 9, Efficiency=0.1), mod("Strong", 9, Efficiency=0.3), mod("Stronger", 8, Efficiency=0.3)]
+    kept, pruned = dominance.prune_dominated(mods, {"Efficiency": 1.85}, [], max_mods=2)
+    assert [kept_mod["name"] for kept_mod in kept] == ["Strong", "Stronger"]
+    assert pruned == [("Weak", "Strong")]
+
+
+def test_single_slot_mod_is_pruned_by_one_mod():
+    auras = [mod("Growing Power", -7, "madurai", 1, Strength=0.25), mod("Physique", -9, "madurai", 1)]
+    kept, pruned = dominance.prune_dominated(auras, {"Efficiency": 1.85}, [], max_mods=8)
+    assert pruned == [("Growing Power", "Physique")]
+
+
+def test_mods_equipped_together_stay_reachable(config):
+    derived = request.derive(config, GOAL_STATS={"Efficiency": 1.85}, STAT_CAPS={})
+    assert ("Streamline", "Fleeting Expertise") not in derived.PRUNED_MODS
+    assert feasibility.check(derived)["Efficiency"] >= 1.85
@@ -0,0 +1,13 @@
+from Config import request
+from Greedy.enumeration import BuildEnumerator
+
+
+def test_builds_are_distinct_and_best_first(config):
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    enumerator = BuildEnumerator(derived)
+    builds = enumerator.enumerate(5, min_difference=1)
+    genomes = [frozenset(build.mod_names) for build in builds]
+    ranks = [enumerator.rank(build) for build in builds]
+    assert len(builds) == 5
+    assert ranks == sorted(ranks)
+    assert all(len(first - second) >= 1 and len(second - first) >= 1 for i, first in enumerate(genomes) for second in genomes[i + 1:])
@@ -0,0 +1,42 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from Config import feasibility, inventory, request
+
+
+def test_knapsack_matches_exhaustive_picks():
+    rng = random.Random(0)
+    for _ in range(20):
+        groups = [[(rng.randint(0, 6), rng.random()) for _ in range(rng.randint(1, 3))] for _ in range(5)]
+        slots, capacity = rng.randint(1, 4), rng.randint(0, 12)
+        best = feasibility.knapsack(groups, slots, capacity)
+        for budget in range(capacity + 1):
+            expected = 0.0
+            for picks in itertools.product(*[[None] + items for items in groups]):
+                picked = [item for item in picks if item is not None]
+                if len(picked) <= slots and sum(cost for cost, _ in picked) <= budget:
+                    expected = max(expected, sum(value for _, value in picked))
+            assert best[budget] == pytest.approx(expected)
+
+
+def test_bound_is_the_best_build_on_unpolarized_slots(config):
+    polarities = {slot_type: {polarity: 0 for polarity in config.POLARITIES[slot_type]} for slot_type in config.POLARITIES}
+    owned = {name: None for name in ["Streamline", "Fleeting Expertise", "Flawed Streamline", "Stretch", "Intensify"]}
+    derived = request.derive(config, GOAL_STATS={"Efficiency": 2.5}, STAT_CAPS={}, POLARITIES=polarities, MAX_MODS=2,
+                             MAX_CAPACITY=16, AURA_SLOT_FREE=False, EXILUS_SLOT_FREE=False, PRUNE_DOMINATED_MODS=False)
+    derived = inventory.apply(derived, owned=owned)
+    best = max(sum(mod["Efficiency"] for mod in mods) for count in range(3) for mods in itertools.combinations(derived.LOADED_MODS, count)
+               if sum(mod["actualDrain"] for mod in mods) <= 16)
+    assert feasibility.stat_bounds(derived)["Efficiency"] == pytest.approx(1.0 + best)
+
+
+def test_goal_above_its_bound_is_rejected_with_the_shortfall(config):
+    bound = feasibility.stat_bounds(config)["Range"]
+    derived = request.derive(config, GOAL_STATS={**config.GOAL_STATS, "Range": bound + 0.5})
+    with pytest.raises(feasibility.InfeasibleGoalsError) as error:
+        feasibility.check(derived)
+    assert error.value.shortfalls["Range"] == pytest.approx(0.5)
+    assert np.isclose(feasibility.check(request.derive(config, GOAL_STATS={"Range": bound}))["Range"], bound)
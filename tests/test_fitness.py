@@ -0,0 +1,13 @@
+from Genetic.fitness import FitnessCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FitnessCache(2)
+    cache.put(("a",), (1,))
+    cache.put(("b",), (2,))
+    assert cache.get(("a",)) == (1,)
+    cache.put(("c",), (3,))
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == (1,)
+    assert len(cache) == 2
+    assert cache.hit_rate() == 2 / 3
@@ -0,0 +1,18 @@
+from Forma.forma import FormaSearch
+
+
+def layout(config, aura_polarity):
+    polarities = {slot_type: config.POLARITIES[slot_type].copy() for slot_type in config.POLARITIES}
+    polarities[1] = {polarity: int(polarity == aura_polarity) for polarity in config.POLARITIES[1]}
+    return polarities
+
+
+def test_unpolarized_and_mismatching_aura_slots_are_costed_apart(config):
+    search = FormaSearch(config)
+    aura = next(mod for mod in config.LOADED_MODS if mod["type"] == 1)
+    mismatch = next(polarity for polarity in config.POLARITIES[1] if polarity != aura["polarity"])
+    for polarity in [None, mismatch, aura["polarity"], None]:
+        polarities = layout(config, polarity)
+        expected = config.MOD_MATRIX.capacity([aura], polarities, config.MAX_MODS)
+        assert search.set_capacity("aura", [aura], polarities) == expected
+    assert len(search.cost_cache) == 3
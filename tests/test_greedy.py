@@ -0,0 +1,28 @@
+import random
+
+import numpy as np
+import pytest
+
+from Config import request
+from Greedy.greedy import GreedyAlgorithm
+from Greedy.greedycalc import GreedyCalculator
+
+GOALS = [
+    {"Health": 1.6, "Efficiency": 1.62, "Duration": 0.85, "Sprint Speed": 1.4, "Strength": 1.66},
+    {"Range": 2.0, "Strength": 1.6, "Duration": 1.3},
+    {"Strength": 2.2, "Efficiency": 1.4, "Health": 2.0},
+]
+
+
+def greedy_mods(config, goals):
+    random.seed(0)
+    np.random.seed(0)
+    best_builds, _ = GreedyCalculator(config=request.derive(config, GOAL_STATS=goals)).find_builds()
+    return sorted(mod["name"] for mod in best_builds[0].used_mods)
+
+
+@pytest.mark.parametrize("goals", GOALS)
+def test_lazy_rescoring_picks_the_mods_of_eager_rescoring(config, goals, monkeypatch):
+    lazy = greedy_mods(config, goals)
+    monkeypatch.setattr(GreedyAlgorithm, "risen_candidates", lambda self, build, added, ids: np.ones(len(ids), dtype=bool))
+    assert lazy == greedy_mods(config, goals)
@@ -0,0 +1,33 @@
+import pytest
+
+from Config import inventory, request
+
+
+def layout(config, **counts):
+    polarities = {slot_type: config.POLARITIES[slot_type].copy() for slot_type in config.POLARITIES}
+    polarities[0] = {polarity: counts.get(polarity, 0) for polarity in config.POLARITIES[0]}
+    return polarities
+
+
+def test_required_mods_take_the_cheapest_assignment(config):
+    # Placing Primed Continuity first on the vazarin slot would leave Vitality mismatched, for 42 capacity instead of 30
+    derived = request.derive(config, POLARITIES=layout(config, vazarin=1, zenurik=1), MAX_MODS=2, MAX_CAPACITY=30)
+    applied = inventory.apply(derived, required=["Primed Continuity", "Vitality"])
+    slots = {mod["name"]: polarity for mod, _, polarity, _ in applied.PLACED_MODS}
+    assert slots == {"Primed Continuity": "zenurik", "Vitality": "vazarin"}
+    assert applied.MAX_CAPACITY == 0
+    assert applied.MAX_MODS == 0
+    assert sum(applied.POLARITIES[0].values()) == 0
+
+
+def test_required_mods_over_the_capacity_are_rejected(config):
+    derived = request.derive(config, POLARITIES=layout(config, vazarin=1, zenurik=1), MAX_MODS=2, MAX_CAPACITY=29)
+    with pytest.raises(ValueError):
+        inventory.apply(derived, required=["Primed Continuity", "Vitality"])
+
+
+def test_applying_an_inventory_twice_changes_nothing(config):
+    applied = inventory.apply(config, owned={"Streamline": 3, "Stretch": None, "Intensify": None}, required=["Intensify"])
+    assert inventory.apply(applied) is applied
+    assert [mod["name"] for mod in applied.LOADED_MODS] == ["Stretch", "Streamline"]
+    assert applied.MAX_MODS == config.MAX_MODS - 1
@@ -0,0 +1,38 @@
+import random
+
+from Config import request
+from Genetic.build import Build
+from Local.local import LocalSearch
+
+
+def test_improved_build_is_valid_and_never_worse(config):
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    search = LocalSearch(derived)
+    rng = random.Random(0)
+    for _ in range(5):
+        build = Build(derived)
+        for mod in rng.sample(list(derived.MOD_DATABASE), 6):
+            build.add_mod(mod)
+        improved = search.improve(build)
+        assert search.is_valid(improved.mods)
+        assert search.exact_rank(improved.mods) <= search.exact_rank(build.mods)
+
+
+def test_improve_returns_the_mods_it_validated(config):
+    from Greedy.greedybuild import GreedyBuild
+
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    search = LocalSearch(derived)
+    mods_by_name = {mod["name"]: mod for mod in derived.MOD_DATABASE}
+    names = ["Augur Message", "Augur Reach", "Augur Secrets", "Blind Rage", "Continuity", "Intensify",
+             "Overextended", "Stretch", "Power Drift", "Growing Power"]
+    for build in (Build(derived), GreedyBuild(config=derived)):
+        for name in sorted(names, key=lambda name: mods_by_name[name]["type"] != 1):
+            build.add_mod(mods_by_name[name])
+        mods = build.used_mods if isinstance(build.used_mods, list) else build.mods
+        assert len(mods) == len(names)
+        validated = search.improve_mods(mods)
+        assert search.is_valid(validated)
+        improved = search.improve(build)
+        improved_mods = improved.used_mods if isinstance(improved.used_mods, list) else improved.mods
+        assert sorted(mod["name"] for mod in improved_mods) == sorted(mod["name"] for mod in validated)
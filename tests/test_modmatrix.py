@@ -0,0 +1,32 @@
+import itertools
+import random
+
+
+def brute_force(matrix, mods, polarities, max_mods):
+    slots = [polarity for polarity in polarities for _ in range(polarities[polarity])]
+    slots += [None] * (max_mods - len(slots))
+    return min(sum(matrix.slot_cost(mod, polarity) for mod, polarity in zip(mods, permutation))
+               for permutation in set(itertools.permutations(slots, len(mods))))
+
+
+def test_assignment_is_the_cheapest_permutation(config):
+    matrix = config.MOD_MATRIX
+    standard = [mod for mod in config.LOADED_MODS if mod["type"] == 0]
+    rng = random.Random(1)
+    for _ in range(60):
+        counts = {polarity: 0 for polarity in config.POLARITIES[0]}
+        for polarity in rng.choices(list(counts), k=rng.randint(0, 6)):
+            counts[polarity] += 1
+        mods = sorted(rng.sample(standard, rng.randint(1, 6)), key=lambda mod: (str(mod["polarity"]), mod["actualDrain"]))
+        assignment, cost = matrix.assign(mods, counts, 6)
+        assert cost == brute_force(matrix, mods, counts, 6)
+        assert cost == sum(matrix.slot_cost(mod, polarity) for mod, polarity in zip(mods, assignment))
+        assert all(assignment.count(polarity) <= counts[polarity] for polarity in counts)
+
+
+def test_placement_and_capacity_agree(config):
+    matrix = config.MOD_MATRIX
+    mods = [mod for mod in config.LOADED_MODS if mod["name"] in ["Primed Continuity", "Vitality", "Stretch", "Growing Power"]]
+    placement = matrix.place(mods, config.POLARITIES, config.MAX_MODS)
+    assert sorted(mod["name"] for mod, _, _ in placement) == sorted(mod["name"] for mod in mods)
+    assert matrix.cost(placement) == matrix.capacity(mods, config.POLARITIES, config.MAX_MODS)
@@ -0,0 +1,43 @@
+from Config import request
+from Genetic.build import Build
+
+
+def list_pool(build):
+    """
+    Returns the mod pool of a build as the list filtering of the mod database computed it, every mod before the
+    first one is added.
+    """
+    if build.stat_vector is None:
+        return sorted(mod["uniqueName"] for mod in build.config.MOD_DATABASE)
+    mod_pool = []
+    for stat in build.config.GOAL_STATS:
+        if build.modded_stats[stat] < build.config.GOAL_STATS[stat]:
+            mod_pool.extend([mod for mod in build.config.MOD_DATABASE if mod[stat] != 0.0 or mod["type"] == 1])
+    for mod in build.mods:
+        mod_pool = [m for m in mod_pool if m["uniqueName"] != mod["uniqueName"]]
+    if build.used_aura:
+        mod_pool = [m for m in mod_pool if m["type"] != 1]
+    return sorted({mod["uniqueName"] for mod in mod_pool})
+
+
+def pool_names(build):
+    assert len({mod["uniqueName"] for mod in build.mod_pool}) == len(build.mod_pool)
+    return sorted(mod["uniqueName"] for mod in build.mod_pool)
+
+
+def test_pool_view_matches_the_list_filtering_through_a_family(config):
+    derived = request.derive(config, GOAL_STATS={"Range": 1.6, "Strength": 1.6, "Duration": 1.3}, PRUNE_DOMINATED_MODS=False)
+    mods_by_name = {mod["name"]: mod for mod in derived.MOD_DATABASE}
+    build = Build(derived)
+    assert pool_names(build) == list_pool(build)
+    steps = [("add", "Growing Power"), ("add", "Umbral Intensify"), ("add", "Intensify"), ("add", "Stretch"),
+             ("add", "Overextended"), ("remove", "Umbral Intensify"), ("add", "Intensify"), ("add", "Blind Rage"),
+             ("remove", "Stretch"), ("remove", "Growing Power"), ("add", "Physique")]
+    for action, name in steps:
+        if action == "add":
+            build.add_mod(mods_by_name[name])
+        else:
+            build.remove_mod(mods_by_name[name])
+        assert pool_names(build) == list_pool(build), (action, name)
+        if action == "remove" and name == "Umbral Intensify":
+            assert mods_by_name[name]["uniqueName"] in pool_names(build)
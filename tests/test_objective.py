@@ -0,0 +1,14 @@
+import numpy as np
+
+from Config.objective import Objective
+
+STATS = ["Range", "Duration", "Strength"]
+
+
+def test_matrix_evaluation_matches_each_row():
+    objective = Objective(STATS, {"Range": 2.0, "Strength": 1.5}, {stat: 1.0 for stat in STATS}, weights={"Range": 2.0},
+                          caps={"Strength": 1.8}, floors={"Range": 0.34}, overshoot={"Strength": 0.5})
+    rows = np.random.default_rng(0).uniform(0.0, 3.0, (50, len(STATS)))
+    distances, penalties = objective.evaluate(rows)
+    for row, distance, penalty in zip(rows, distances, penalties):
+        assert np.allclose(objective.evaluate(row), (distance, penalty))
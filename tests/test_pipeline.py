@@ -0,0 +1,23 @@
+from Config import request
+from Pipeline.pipeline import Pipeline
+
+
+def test_genetic_stage_is_skipped_once_the_goals_are_reached(config):
+    derived = request.derive(config, GOAL_STATS={"Range": 1.5, "Strength": 1.3})
+    state = Pipeline(config=derived).run()
+    assert state.best_build.stat_distance < 0.001
+    assert state.generations == 0
+    assert [name for name, _ in state.timings] == ["greedy", "genetic", "local"]
+
+
+def test_create_build_keeps_an_exilus_listed_after_every_standard_mod(config):
+    from Genetic.fitness import FitnessCache
+    from Pipeline.pipeline import PipelineState
+
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    mods_by_name = {mod["name"]: mod for mod in derived.MOD_DATABASE}
+    names = ["Augur Message", "Augur Reach", "Augur Secrets", "Blind Rage", "Continuity", "Intensify",
+             "Overextended", "Stretch", "Power Drift", "Growing Power"]
+    state = PipelineState(derived, FitnessCache(derived.FITNESS_CACHE_SIZE), [[mods_by_name[name] for name in names]])
+    assert sorted(mod["name"] for mod in state.best_build.mods) == sorted(names)
+    assert [len(mods) for mods in state.candidates] == [len(names)]
@@ -0,0 +1,24 @@
+import pytest
+
+from Config import request
+
+
+def test_request_fields_override_the_configuration(config):
+    derived = request.from_request(config, {"goal_stats": {"Range": 2}, "max_capacity": "60", "polarities": {"0": {"madurai": 2}, "1": {}, "2": {}}})
+    assert derived.GOAL_STATS == {"Range": 2.0}
+    assert derived.MAX_CAPACITY == 60
+    assert derived.POLARITIES[0] == {polarity: int(polarity == "madurai") * 2 for polarity in config.POLARITIES[0]}
+    assert derived.OBJECTIVE.targets[derived.OBJECTIVE.stats.index("Range")] == 2.0
+
+
+@pytest.mark.parametrize("payload", [
+    {"unknown": 1},
+    {"goal_stats": {"Speed": 1.0}},
+    {"goal_stats": [1.0]},
+    {"max_mods": -1},
+    {"polarities": {"0": {"madurai": 1}}},
+    {"required_mods": ["Not A Mod"]},
+])
+def test_invalid_requests_are_rejected(config, payload):
+    with pytest.raises(ValueError):
+        request.from_request(config, payload)
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def test_invalid_request_is_rejected_off_the_event_loop(config):
+    from Service.service import OptimizerService
+
+    service = OptimizerService()
+    status, payload = asyncio.run(service.route("POST", "/solve", b'{"engine": "other"}'))
+    assert status == 400
+    assert "engine" in payload["error"]
+    status, payload = asyncio.run(service.route("POST", "/solve", b'{"goal_stats": {"Range": 99.0}}'))
+    assert status == 400
+    assert "Range" in payload["error"]
+
+
+def test_genetic_solve_of_goals_unreachable_together_ends(config):
+    from Config import feasibility, request
+    from Service.service import solve
+
+    bounds = feasibility.stat_bounds(config)
+    goals = {"Range": bounds["Range"], "Strength": bounds["Strength"], "Duration": bounds["Duration"]}
+    derived = request.derive(config, GOAL_STATS=goals, GENETIC_POPULATION_SIZE=30, GENETIC_MAX_GENERATIONS=5, SERVICE_GENETIC_RESTARTS=1)
+    result = solve(derived, "genetic")
+    assert result["engine"] == "genetic"
+    assert not result["found"]
+
+
+def test_identical_concurrent_requests_share_one_computation(config, monkeypatch):
+    from Service import service as service_module
+
+    calls = []
+    lock = threading.Lock()
+
+    def solve_request(overrides, engine, version):
+        with lock:
+            calls.append((overrides, engine, version))
+        time.sleep(0.2)
+        return {"found": True}
+
+    async def run():
+        service = service_module.OptimizerService()
+        service.pool = ThreadPoolExecutor(2)
+        key, job = service.request_key({})
+        results = await asyncio.gather(*[service.solve(job, key) for _ in range(3)])
+        service.pool.shutdown()
+        return results, service
+
+    monkeypatch.setattr(service_module, "solve_request", solve_request)
+    results, service = asyncio.run(run())
+    assert results == [{"found": True}] * 3
+    assert len(calls) == 1
+    assert service.in_flight == {}
+
+
+def test_worker_solves_with_the_version_the_request_was_validated_against(config, monkeypatch):
+    from Config.snapshot import SnapshotManager
+    from Service import service as service_module
+
+    monkeypatch.setattr(service_module, "worker_snapshots", SnapshotManager(config))
+    service = service_module.OptimizerService()
+    key, job = service.request_key({"goal_stats": {"Range": 1.5}, "engine": "greedy"})
+    overrides, engine, version = job
+    assert version == service.snapshots.current.version == config.MOD_DATABASE_VERSION
+    assert service_module.solve_request(*job)["version"] == version
+    with pytest.raises(service_module.SnapshotMismatchError):
+        service_module.solve_request(overrides, engine, "other")
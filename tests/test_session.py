@@ -0,0 +1,9 @@
+from Config.snapshot import SnapshotManager
+from Session.session import Session
+
+
+def test_session_follows_snapshots_without_a_config(config):
+    snapshots = SnapshotManager(config)
+    session = Session(snapshots=snapshots)
+    assert session.config is snapshots.current.config
+    assert session.fitness_cache.size == config.FITNESS_CACHE_SIZE
@@ -0,0 +1,22 @@
+import random
+
+import numpy as np
+
+from Config.modmatrix import SetState
+
+
+def test_incremental_set_bonuses_match_the_final_mods(config):
+    matrix = config.MOD_MATRIX
+    rng = random.Random(2)
+    ids = [mod["id"] for mod in config.LOADED_MODS if mod["type"] == 0]
+    for _ in range(20):
+        state, stats, held = SetState(matrix), np.zeros(matrix.stats.shape[1]), []
+        for _ in range(12):
+            if held and rng.random() < 0.4:
+                removed = held.pop(rng.randrange(len(held)))
+                stats += state.apply(removed=removed)
+            else:
+                added = rng.choice([mod for mod in ids if mod not in held])
+                held.append(added)
+                stats += state.apply(added=added)
+        assert np.allclose(stats, matrix.set_stats(held))
@@ -0,0 +1,20 @@
+import numpy as np
+
+from Config.objective import Objective
+from Config.shards import shard_combinations
+
+STATS = ["Range", "Duration", "Strength"]
+
+
+def test_shard_combinations_are_distinct_multisets():
+    names, offsets = shard_combinations({"Strength": {"Strength": 0.1}, "Range": {"Range": 0.1}}, STATS, 2)
+    assert len(names) == len(offsets) == 6
+    assert len({tuple(offset) for offset in offsets}) == 6
+    assert shard_combinations({"Strength": {"Strength": 0.1}}, STATS, 0) == ([], None)
+
+
+def test_offsets_are_chosen_with_the_mods():
+    names, offsets = shard_combinations({"Strength": {"Strength": 0.5}, "Range": {"Range": 0.5}}, STATS, 1)
+    objective = Objective(STATS, {"Range": 1.5, "Strength": 1.0}, {stat: 1.0 for stat in STATS}, offsets=offsets, offset_names=names)
+    assert objective.evaluate(np.ones(len(STATS)))[0] == 0.0
+    assert objective.best_offset_name(np.ones(len(STATS))) == ("Range",)
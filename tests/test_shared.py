@@ -0,0 +1,19 @@
+import pickle
+
+import numpy as np
+
+from Config.modmatrix import SHARED_ARRAYS
+
+
+def test_shared_matrix_pickles_as_a_handle_to_the_same_tables(config):
+    matrix = config.MOD_MATRIX.share()
+    try:
+        payload = pickle.dumps(matrix)
+        assert len(payload) < 4096
+        attached = pickle.loads(payload)
+        for name in SHARED_ARRAYS:
+            assert np.array_equal(getattr(attached, name), getattr(config.MOD_MATRIX, name))
+        assert attached.capacity(config.LOADED_MODS[:4], config.POLARITIES, config.MAX_MODS) == \
+            config.MOD_MATRIX.capacity(config.LOADED_MODS[:4], config.POLARITIES, config.MAX_MODS)
+    finally:
+        matrix.release()
@@ -0,0 +1,63 @@
+import json
+import os
+
+from Config.snapshot import SnapshotManager
+
+MODS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Mods.json")
+
+
+def write_mods(path, mods, mtime):
+    """
+    Writes a mods file and sets its modification time, so every write changes its signature.
+    """
+    with open(path, "w") as file:
+        json.dump(mods, file)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def load_raw_mods():
+    with open(MODS_PATH) as file:
+        return json.load(file)
+
+
+def test_corrupt_or_invalid_file_keeps_the_current_snapshot(config, tmp_path):
+    path = str(tmp_path / "Mods.json")
+    write_mods(path, load_raw_mods(), 1_000_000_000)
+    manager = SnapshotManager(config, path=path, interval=0)
+    current = manager.current
+    with open(path, "w") as file:
+        file.write('[{"name": "Intensify", ')
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert not manager.poll()
+    assert manager.error is not None
+    assert manager.current is current
+    write_mods(path, [{**mod, "uniqueName": "/Lotus/Upgrades/Mods/Same"} for mod in load_raw_mods()], 3_000_000_000)
+    assert not manager.poll()
+    assert "duplicated" in manager.error
+    assert manager.current is current
+
+
+def test_changed_file_publishes_a_new_version_and_old_readers_keep_theirs(config, tmp_path):
+    path = str(tmp_path / "Mods.json")
+    mods = load_raw_mods()
+    write_mods(path, mods, 1_000_000_000)
+    manager = SnapshotManager(config, path=path, interval=0)
+    assert not manager.poll()
+    old = manager.current
+    old_version, old_names = old.version, [mod["name"] for mod in old.config.LOADED_MODS]
+    old_strength = [mod for mod in old.config.LOADED_MODS if mod["name"] == "Intensify"][0]["Strength"]
+
+    intensify = [mod for mod in mods if mod["name"] == "Intensify"][0]
+    intensify["levelStats"] = [{"stats": ["+40% Ability Strength"]} for _ in intensify["levelStats"]]
+    write_mods(path, [mod for mod in mods if mod["name"] != "Stretch"], 2_000_000_000)
+    assert manager.poll()
+    assert manager.error is None
+    assert manager.current is not old
+    assert manager.current.version != old_version
+    assert "Stretch" not in [mod["name"] for mod in manager.current.config.LOADED_MODS]
+
+    assert old.version == old.config.MOD_DATABASE_VERSION == old_version
+    assert [mod["name"] for mod in old.config.LOADED_MODS] == old_names
+    assert [mod for mod in old.config.LOADED_MODS if mod["name"] == "Intensify"][0]["Strength"] == old_strength
+    assert not manager.poll()
+    assert not manager.reload()
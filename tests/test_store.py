@@ -0,0 +1,41 @@
+from Config import request
+from Store.store import BuildStore, fingerprint
+
+
+def test_fingerprint_ignores_goal_order_and_rounding(config):
+    goals = {"Range": 2.0, "Strength": 1.6}
+    same = request.derive(config, GOAL_STATS={"Strength": 1.60000001, "Range": 2.0})
+    assert fingerprint(request.derive(config, GOAL_STATS=goals)) == fingerprint(same)
+    assert fingerprint(request.derive(config, GOAL_STATS=goals)) != fingerprint(request.derive(config, GOAL_STATS={**goals, "Range": 2.1}))
+    assert fingerprint(request.derive(config, GOAL_STATS=goals)) != fingerprint(request.derive(config, GOAL_STATS=goals, MAX_CAPACITY=60))
+
+
+def test_solved_build_is_found_again_and_seeds_near_requests(config, tmp_path):
+    store = BuildStore(str(tmp_path / "builds.db"))
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6})
+    mods = [mod for mod in derived.MOD_DATABASE if mod["name"] in ["Stretch", "Intensify", "Growing Power"]]
+    store.put(derived, mods, derived.BASE_STATS, 30, 0.0, "greedy")
+    assert sorted(mod["name"] for mod in store.get(derived)) == ["Growing Power", "Intensify", "Stretch"]
+    assert store.get(derived)[0]["name"] == "Growing Power"
+    near = request.derive(config, GOAL_STATS={"Range": 2.1, "Strength": 1.6})
+    assert store.get(near) is None
+    assert [sorted(mod["name"] for mod in seed) for seed in store.near(near)] == [["Growing Power", "Intensify", "Stretch"]]
+    store.close()
+
+
+def test_full_build_round_trips_with_its_exilus(config, tmp_path):
+    from Genetic.build import Build
+
+    store = BuildStore(str(tmp_path / "builds.db"))
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    mods_by_name = {mod["name"]: mod for mod in derived.MOD_DATABASE}
+    names = ["Augur Message", "Augur Reach", "Augur Secrets", "Blind Rage", "Continuity", "Intensify",
+             "Overextended", "Stretch", "Power Drift", "Growing Power"]
+    store.put(derived, [mods_by_name[name] for name in names], derived.BASE_STATS, 77, 0.0, "annealing")
+    mods = store.get(derived)
+    assert [mod["type"] for mod in mods[:2]] == [1, 2]
+    build = Build(derived)
+    for mod in mods:
+        build.add_mod(mod)
+    assert sorted(mod["name"] for mod in build.mods) == sorted(names)
+    store.close()
@@ -0,0 +1,27 @@
+import pytest
+
+from Config import feasibility, request
+from Sweep.sweep import GoalSweep
+
+GOALS = {"Range": 2.0, "Strength": 1.6, "Duration": 1.3, "Efficiency": 0.8, "Sprint Speed": 1.0}
+
+
+def test_points_above_the_bound_are_infeasible(config):
+    base = request.derive(config, GOAL_STATS=GOALS)
+    bound = feasibility.stat_bounds(base)["Range"]
+    sweep = GoalSweep(base, {"Range": [bound + 1.0, bound + 2.0]})
+    results = sweep.run()
+    assert [result["status"] for result in results[0]] == ["infeasible", "infeasible"]
+    assert sweep.frontier(results) == []
+
+
+def test_points_are_solved_up_to_the_frontier(config):
+    sweep = GoalSweep(request.derive(config, GOAL_STATS=GOALS), {"Range": [2.0, 2.2, 99.0]})
+    results = sweep.run()
+    assert [result["status"] for result in results[0]] == ["solved", "solved", "infeasible"]
+    assert sweep.frontier(results)[0][0] == {"Range": 2.2}
+
+
+def test_unreachable_fixed_goal_fails_the_sweep(config):
+    with pytest.raises(feasibility.InfeasibleGoalsError):
+        GoalSweep(request.derive(config, GOAL_STATS={**GOALS, "Strength": 99.0}), {"Range": [2.0]})
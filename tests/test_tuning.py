@@ -0,0 +1,52 @@
+import math
+
+from Config import feasibility, request
+from Genetic import tuning
+
+
+def test_parameter_grid_covers_every_combination():
+    grid = tuning.parameter_grid(population_size=[20, 40], max_generations=[3])
+    assert grid == [{"population_size": 20, "max_generations": 3}, {"population_size": 40, "max_generations": 3}]
+
+
+def test_goal_profiles_drop_unreachable_goals(config):
+    bounds = feasibility.stat_bounds(config)
+    derived = request.derive(config, GOAL_STATS={"Range": bounds["Range"]})
+    assert [name for name, _ in tuning.goal_profiles(derived, (0.5, 1.0, 1.5))] == ["goals x0.5", "goals x1"]
+
+
+def test_slow_sets_are_dropped_only_after_the_minimum_instances(config, monkeypatch):
+    seconds = {"fast": 1.0, "slow": 2.0, "close": 1.4}
+    monkeypatch.setattr(tuning, "time_to_solution", lambda profile, parameters, seed: seconds[parameters["name"]])
+    sets = [{"name": name} for name in seconds]
+    dropped = []
+    profiles = [("goals x1", config)]
+    results = tuning.race(profiles, sets, seeds=(0, 1, 2, 3), minimum_instances=3, ratio=1.5, log=dropped.append)
+    assert [parameters["name"] for parameters, _ in results] == ["fast", "close"]
+    assert [len(times) for _, times in results] == [4, 4]
+    assert len(dropped) == 1 and "after 3 instances" in dropped[0]
+    assert len(tuning.race(profiles, sets, seeds=(0, 1), minimum_instances=3, ratio=1.5)) == 3
+
+
+def test_an_all_infinite_race_keeps_every_set(config, monkeypatch):
+    monkeypatch.setattr(tuning, "time_to_solution", lambda profile, parameters, seed: math.inf)
+    sets = [{"name": name} for name in ["a", "b", "c"]]
+    results = tuning.race([("goals x1", config)], sets, seeds=(0, 1, 2, 3), minimum_instances=1)
+    assert sorted(parameters["name"] for parameters, _ in results) == ["a", "b", "c"]
+
+
+def test_parameters_reach_the_genetic_run(config, monkeypatch):
+    runs = []
+
+    class RecordingGeneticAlgorithm(tuning.GeneticAlgorithm):
+        def run_genetic_algorithm(self, *args, **kwargs):
+            best_build = super().run_genetic_algorithm(*args, **kwargs)
+            runs.append((self.population_size, len(self.population), self.max_generations, self.generations))
+            return best_build
+
+    monkeypatch.setattr(tuning, "GeneticAlgorithm", RecordingGeneticAlgorithm)
+    derived = request.derive(config, GOAL_STATS={"Range": 2.0, "Strength": 1.6, "Duration": 1.3})
+    tuning.time_to_solution(derived, {"population_size": 12, "max_generations": 2, "stall_generations": 50}, 0)
+    population_size, population, max_generations, generations = runs[0]
+    assert (population_size, population, max_generations) == (12, 12, 2)
+    assert 1 <= generations <= 2